@@ -108,6 +108,7 @@
 # In[1]:
 
 
+import os
 import re
 import json
 import logging
@@ -125,9 +126,10 @@ from typing import Optional, Union, List, Dict, Any, Tuple
 
 
 class LocalDataLoader:
-    """Loads data from local CSV files"""
-    def __init__(self, file_path: str) -> None:
+    """Loads an ODS table from its partitioned Parquet dataset, or from the CSV export when there is none"""
+    def __init__(self, file_path: str, parquet_path: Optional[str] = None) -> None:
         self.file_path = file_path
+        self.parquet_path = parquet_path or os.path.splitext(file_path)[0]
 
     def get_csv_file(self) -> str:
         with open(self.file_path, 'r', encoding='utf-8') as f:
@@ -137,6 +139,20 @@ class LocalDataLoader:
         df = pd.read_csv(StringIO(csv_content))
         return df
 
+    def parquet_to_dataframe(self, columns=None, filters=None) -> pd.DataFrame:
+        """Reads a partitioned Parquet ODS directory, pushing down columns and partition filters"""
+        df = pd.read_parquet(self.parquet_path, engine='pyarrow', columns=columns, filters=filters)
+        for column in df.columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(object)
+        return df
+
+    def to_dataframe(self, columns=None) -> pd.DataFrame:
+        if os.path.isdir(self.parquet_path):
+            return self.parquet_to_dataframe(columns=columns)
+        df = self.csv_to_dataframe(self.get_csv_file())
+        return df if columns is None else df[columns]
+
 
 # In[3]:
 
@@ -184,9 +200,7 @@ YOUTUBE_CATEGORY_MAP = {
 
 loader = LocalDataLoader(file_path='db/ods/trending_videos.csv')
 
-trending_videos_content = loader.get_csv_file()
-
-trending_videos_df = loader.csv_to_dataframe(trending_videos_content)
+trending_videos_df = loader.to_dataframe()
 
 
 # In[5]:
@@ -417,11 +431,9 @@ trending_df_stage.groupby('video_id').agg(
 # In[14]:
 
 
-loader = LocalDataLoader(file_path="db/ods/merged_video_stats.csv")
-
-video_stats_content = loader.get_csv_file()
+loader = LocalDataLoader(file_path="db/ods/merged_video_stats.csv", parquet_path="db/ods/video_stats")
 
-video_statistics_df = loader.csv_to_dataframe(video_stats_content)
+video_statistics_df = loader.to_dataframe()
 
 
 # In[15]:
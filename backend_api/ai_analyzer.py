@@ -1,21 +1,216 @@
-
+import asyncio
+import json
 import os
-from typing import Dict, List, Optional
-from openai import OpenAI
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from openai import APITimeoutError, AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
+from llm_cache import LLMResponseCache, completion_key
+from single_flight import AsyncSingleFlight, SingleFlight
 
 load_dotenv()
 
+# Upper bound on concurrent upstream calls from the async path
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+# Seconds one upstream call may take once it holds a concurrency slot
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "30"))
+# Videos packed into one batch analysis request
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "10"))
+
+ANALYZE_SYSTEM_PROMPT = "You are a YouTube analytics expert. Provide concise, data-driven insights."
+
 class AIVideoAnalyzer:
-    def __init__(self, api_key: Optional[str] = None):
+    model = "gpt-4o-mini"
+    
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[LLMResponseCache] = None,
+                 max_concurrency: int = AI_MAX_CONCURRENCY, timeout: float = AI_TIMEOUT_SECONDS):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY in environment.")
         
+        # OPENAI_BASE_URL, when set, points the clients at another OpenAI-compatible server
         self.client = OpenAI(api_key=self.api_key)
-        self.model = "gpt-4o-mini"
+        self.cache = cache if cache is not None else LLMResponseCache()
+        self.flights = SingleFlight()
+        
+        # The async client keeps one pooled connection set for all async requests
+        self.timeout = timeout
+        self.async_client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout)
+        self.async_slots = asyncio.Semaphore(max_concurrency)
+        self.async_flights = AsyncSingleFlight()
+    
+    @classmethod
+    def _request_spec(cls, method: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                      use_cache: bool = True, **params: Any) -> Dict[str, Any]:
+        return {
+            'method': method,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'use_cache': use_cache,
+            **params
+        }
+    
+    @classmethod
+    def _cache_key(cls, method: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                   use_cache: bool = True, **params: Any) -> str:
+        return completion_key(method, cls.model, messages, temperature, max_tokens=max_tokens, **params)
+    
+    @classmethod
+    def video_request_key(cls, kind: str, video: Dict) -> str:
+        """Completion key of the per-video request for ``kind`` ('analysis' or 'explanation')."""
+        if kind == 'analysis':
+            return cls._cache_key(**cls._analyze_video_request(video))
+        if kind == 'explanation':
+            return cls._cache_key(**cls._explain_virality_score_request(video))
+        raise ValueError(f"Unknown AI text kind: {kind}")
+    
+    def _run(self, request: Dict[str, Any], build: Callable[[Dict[str, Any]], Dict[str, Any]],
+             fallback: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return build(self._complete(**request))
+        except Exception as e:
+            return {'success': False, 'error': str(e), **fallback}
+    
+    async def _run_async(self, request: Dict[str, Any], build: Callable[[Dict[str, Any]], Dict[str, Any]],
+                         fallback: Dict[str, Any]) -> Dict[str, Any]:
+        # Cancellation (the client went away) is not an Exception and propagates to the caller
+        try:
+            return build(await self._complete_async(**request))
+        except asyncio.TimeoutError:
+            return {'success': False, 'error': f"AI request timed out after {self.timeout:g}s", **fallback}
+        except Exception as e:
+            return {'success': False, 'error': str(e), **fallback}
+    
+    def _complete(self, method: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                  use_cache: bool = True, **params: Any) -> Dict[str, Any]:
+        """
+        Runs one chat completion and returns ``{'content', 'tokens_used', 'cached', 'total_tokens'}``.
+
+        Identical requests within the cache TTL are answered from the response cache, and identical
+        requests arriving while one is already in flight wait for it and share its answer; both
+        report zero tokens used since nothing was spent. Errors propagate and are never cached,
+        and neither are JSON-mode answers that do not parse to an object (e.g. truncated ones).
+        """
+        key = self._cache_key(method, messages, max_tokens, temperature, **params)
+        if not use_cache:
+            return self._request(messages, max_tokens, temperature, **params)
+        
+        cached = self.cache.get(key)
+        if cached is None:
+            completion, shared = self.flights.do(
+                key, lambda: self._cached_request(method, key, messages, max_tokens, temperature, **params)
+            )
+            return self._account(completion, shared)
+        return self._account({**cached, 'cached': True}, False)
+    
+    async def _complete_async(self, method: str, messages: List[Dict[str, str]], max_tokens: int,
+                              temperature: float, use_cache: bool = True, **params: Any) -> Dict[str, Any]:
+        """``_complete`` on the async client, without tying up a worker thread while the model runs."""
+        key = self._cache_key(method, messages, max_tokens, temperature, **params)
+        if not use_cache:
+            return await self._request_async(messages, max_tokens, temperature, **params)
+        
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is None:
+            completion, shared = await self.async_flights.do(
+                key, lambda: self._cached_request_async(method, key, messages, max_tokens, temperature, **params)
+            )
+            return self._account(completion, shared)
+        return self._account({**cached, 'cached': True}, False)
+    
+    def _account(self, completion: Dict[str, Any], shared: bool) -> Dict[str, Any]:
+        """Records a cache hit or miss; answers nobody paid for here report zero tokens used."""
+        if not shared and not completion['cached']:
+            self.cache.record(hit=False)
+            return completion
+        self.cache.record(hit=True, tokens_saved=completion['total_tokens'])
+        return {'content': completion['content'], 'tokens_used': 0, 'cached': True,
+                'total_tokens': completion['total_tokens']}
+    
+    def _cached_request(self, method: str, key: str, messages: List[Dict[str, str]], max_tokens: int,
+                        temperature: float, **params: Any) -> Dict[str, Any]:
+        # A call for the same key may have finished between the cache check and taking the flight
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        
+        completion = self._request(messages, max_tokens, temperature, **params)
+        self._check_content(completion['content'], params)
+        self.cache.put(key, method, self.model, completion['content'], completion['tokens_used'])
+        return completion
+    
+    async def _cached_request_async(self, method: str, key: str, messages: List[Dict[str, str]], max_tokens: int,
+                                    temperature: float, **params: Any) -> Dict[str, Any]:
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        
+        completion = await self._request_async(messages, max_tokens, temperature, **params)
+        self._check_content(completion['content'], params)
+        await asyncio.to_thread(self.cache.put, key, method, self.model, completion['content'],
+                                completion['tokens_used'])
+        return completion
+    
+    def _check_content(self, content: str, params: Dict[str, Any]) -> None:
+        """Raises if a JSON-mode answer is not a JSON object, so it is never cached."""
+        if params.get('response_format', {}).get('type') != 'json_object':
+            return
+        if not isinstance(json.loads(content), dict):
+            raise ValueError("JSON-mode answer is not a JSON object")
+    
+    def _request(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                 **params: Any) -> Dict[str, Any]:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **params
+        )
+        return self._completion(response)
+    
+    async def _request_async(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                             **params: Any) -> Dict[str, Any]:
+        # Queueing for a slot is not timed: only the call itself is, so a burst of requests does
+        # not time out before reaching the model
+        async with self.async_slots:
+            response = await asyncio.wait_for(
+                self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **params
+                ),
+                timeout=self.timeout
+            )
+        return self._completion(response)
+    
+    def _completion(self, response: Any) -> Dict[str, Any]:
+        tokens_used = response.usage.total_tokens
+        return {
+            'content': response.choices[0].message.content,
+            'tokens_used': tokens_used,
+            'cached': False,
+            'total_tokens': tokens_used
+        }
     
     def analyze_video(self, video: Dict) -> Dict[str, any]:
+        return self._run(
+            self._analyze_video_request(video),
+            self._analyze_video_result,
+            {'analysis': 'AI analysis unavailable'}
+        )
+    
+    async def analyze_video_async(self, video: Dict) -> Dict[str, any]:
+        return await self._run_async(
+            self._analyze_video_request(video),
+            self._analyze_video_result,
+            {'analysis': 'AI analysis unavailable'}
+        )
+    
+    @classmethod
+    def _analyze_video_request(cls, video: Dict) -> Dict[str, Any]:
         prompt = f"""Analyze this YouTube video and provide insights:
 
 Title: {video.get('title', 'Unknown')}
@@ -32,33 +227,174 @@ Provide a brief analysis (2-3 sentences) covering:
 
 Be concise, actionable, and data-driven."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a YouTube analytics expert. Provide concise, data-driven insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
+        return cls._request_spec(
+            'analyze_video',
+            [
+                {"role": "system", "content": ANALYZE_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=200,
+            temperature=0.7
+        )
+    
+    def _analyze_video_result(self, completion: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = completion['content']
+        
+        return {
+            'success': True,
+            'analysis': analysis,
+            'tokens_used': completion['tokens_used'],
+            'cached': completion['cached']
+        }
+    
+    def analyze_videos_batch(self, videos: List[Dict], batch_size: int = AI_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        ``analyze_video`` for many videos, packing ``batch_size`` videos into each JSON-mode request.
+
+        Returns videoId -> the result ``analyze_video`` would give. Videos already in the response
+        cache are not sent again; batched answers are written to the cache under each video's own
+        ``analyze_video`` key, so later single calls hit it. Videos the batch answer does not cover
+        (or an answer that does not parse) fall back to one ``analyze_video`` call each.
+        """
+        results, pending = self._cached_analyses(videos)
+        for chunk in self._chunks(pending, batch_size):
+            try:
+                results.update(self._split_batch(self._complete(**self._analyze_videos_batch_request(chunk)), chunk))
+            except APITimeoutError:
+                print(f"[AI] Batch analysis of {len(chunk)} videos timed out")
+                results.update(self._timed_out_analyses(chunk))
+            except Exception as e:
+                print(f"[AI] Batch analysis of {len(chunk)} videos failed, analyzing one by one: {e}")
+            for video in chunk:
+                if video['videoId'] not in results:
+                    results[video['videoId']] = self.analyze_video(video)
+        return results
+    
+    async def analyze_videos_batch_async(self, videos: List[Dict],
+                                         batch_size: int = AI_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        results, pending = await asyncio.to_thread(self._cached_analyses, videos)
+        
+        async def run_chunk(chunk: List[Dict]) -> None:
+            try:
+                completion = await self._complete_async(**self._analyze_videos_batch_request(chunk))
+                results.update(await asyncio.to_thread(self._split_batch, completion, chunk))
+            except (asyncio.TimeoutError, APITimeoutError):
+                # Per-video calls would queue behind the same slow upstream and time out as well
+                print(f"[AI] Batch analysis of {len(chunk)} videos timed out")
+                results.update(self._timed_out_analyses(chunk))
+            except Exception as e:
+                print(f"[AI] Batch analysis of {len(chunk)} videos failed, analyzing one by one: {e}")
+            missing = [video for video in chunk if video['videoId'] not in results]
+            for video, result in zip(missing, await asyncio.gather(*(self.analyze_video_async(v) for v in missing))):
+                results[video['videoId']] = result
+        
+        await asyncio.gather(*(run_chunk(chunk) for chunk in self._chunks(pending, batch_size)))
+        return results
+    
+    def _timed_out_analyses(self, videos: List[Dict]) -> Dict[str, Dict[str, Any]]:
+        error = f"AI request timed out after {self.timeout:g}s"
+        return {video['videoId']: {'success': False, 'error': error, 'analysis': 'AI analysis unavailable'}
+                for video in videos}
+    
+    def _chunks(self, videos: List[Dict], size: int) -> List[List[Dict]]:
+        return [videos[i:i + size] for i in range(0, len(videos), max(size, 1))]
+    
+    def _cached_analyses(self, videos: List[Dict]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict]]:
+        """Splits ``videos`` (deduplicated by id) into cached analyze_video results and videos still to analyze."""
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[Dict] = []
+        for video in {video['videoId']: video for video in videos}.values():
+            cached = self.cache.get(self._cache_key(**self._analyze_video_request(video)))
+            if cached is None:
+                pending.append(video)
+                continue
+            self.cache.record(hit=True, tokens_saved=cached['total_tokens'])
+            results[video['videoId']] = self._analyze_video_result(
+                {'content': cached['content'], 'tokens_used': 0, 'cached': True}
             )
-            
-            analysis = response.choices[0].message.content
-            
-            return {
-                'success': True,
-                'analysis': analysis,
-                'tokens_used': response.usage.total_tokens
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'analysis': 'AI analysis unavailable'
+        return results, pending
+    
+    def _analyze_videos_batch_request(self, videos: List[Dict]) -> Dict[str, Any]:
+        video_lines = '\n'.join(json.dumps({
+            'videoId': video.get('videoId'),
+            'title': video.get('title', 'Unknown'),
+            'views': video.get('views', 0),
+            'likes': video.get('likes', 0),
+            'comments': video.get('comments', 0),
+            'viralityScore': video.get('viralityScore', 0),
+            'country': video.get('country', 'Unknown'),
+        }, ensure_ascii=False) for video in videos)
+        
+        prompt = f"""Analyze each of these {len(videos)} YouTube videos and provide insights:
+
+{video_lines}
+
+For each video provide a brief analysis (2-3 sentences) covering:
+1. Why this video is performing well (or not)
+2. Key success factors
+3. One specific improvement suggestion
+
+Be concise, actionable, and data-driven.
+
+Format as JSON, with one entry per video and its videoId copied exactly:
+{{
+  "results": [
+    {{"videoId": "...", "analysis": "..."}},
+    ...
+  ]
+}}"""
+
+        return self._request_spec(
+            'analyze_videos_batch',
+            [
+                {"role": "system", "content": ANALYZE_SYSTEM_PROMPT + " Return valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=180 * len(videos),
+            temperature=0.7,
+            response_format={"type": "json_object"}
+        )
+    
+    def _split_batch(self, completion: Dict[str, Any], videos: List[Dict]) -> Dict[str, Dict[str, Any]]:
+        """Per-video analyze_video results from a batch answer, each also written to the response cache."""
+        entries = json.loads(completion['content']).get('results', [])
+        analyses = {
+            str(entry['videoId']): entry['analysis'] for entry in entries
+            if isinstance(entry, dict) and entry.get('videoId') and isinstance(entry.get('analysis'), str)
+        }
+        by_id = {video['videoId']: video for video in videos if video['videoId'] in analyses}
+        # The batch's cost is spread evenly over the videos it answered
+        share = completion['total_tokens'] // max(len(by_id), 1)
+        
+        results = {}
+        for video_id, video in by_id.items():
+            request = self._analyze_video_request(video)
+            self.cache.put(self._cache_key(**request), request['method'], self.model, analyses[video_id], share)
+            results[video_id] = {
+                **self._analyze_video_result({
+                    'content': analyses[video_id],
+                    'tokens_used': 0 if completion['cached'] else share,
+                    'cached': completion['cached']
+                }),
+                'batched': True
             }
+        return results
     
     def generate_title_suggestions(self, topic: str, count: int = 5) -> List[Dict]:
+        return self._run(
+            self._generate_title_suggestions_request(topic, count),
+            lambda completion: self._generate_title_suggestions_result(completion, topic),
+            {'suggestions': []}
+        )
+    
+    async def generate_title_suggestions_async(self, topic: str, count: int = 5) -> List[Dict]:
+        return await self._run_async(
+            self._generate_title_suggestions_request(topic, count),
+            lambda completion: self._generate_title_suggestions_result(completion, topic),
+            {'suggestions': []}
+        )
+    
+    def _generate_title_suggestions_request(self, topic: str, count: int = 5) -> Dict[str, Any]:
         prompt = f"""Generate {count} viral YouTube video title suggestions for the topic: "{topic}"
 
 Requirements:
@@ -79,81 +415,90 @@ Title | Score
 Example:
 I Survived 100 Days in Minecraft Hardcore | 88"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a viral content strategist specializing in YouTube optimization."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=400,
-                temperature=0.8
-            )
+        return self._request_spec(
+            'generate_title_suggestions',
+            [
+                {"role": "system", "content": "You are a viral content strategist specializing in YouTube optimization."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=400,
+            temperature=0.8,
+            use_cache=False
+        )
+    
+    def _generate_title_suggestions_result(self, completion: Dict[str, Any], topic: str) -> Dict[str, Any]:
+        content = completion['content']
+        print(f"[AI] Raw response: {content[:200]}...")
+        suggestions = []
+        
+        for line in content.strip().split('\n'):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
             
-            content = response.choices[0].message.content
-            print(f"[AI] Raw response: {content[:200]}...")
-            suggestions = []
+            import re
+            line = re.sub(r'^\d+[\.\)]\s*', '', line)
             
-            for line in content.strip().split('\n'):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                import re
-                line = re.sub(r'^\d+[\.\)]\s*', '', line)
-                
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 2:
-                        title = parts[0].strip()
-                        score_text = parts[1].strip()
-                        try:
-                            score = int(re.search(r'\d+', score_text).group())
-                            suggestions.append({'title': title, 'predicted_virality': score})
-                        except:
-                            continue
-                elif '-' in line and len(line.split('-')) >= 2:
-                    parts = line.rsplit('-', 1)  # Split from right
+            if '|' in line:
+                parts = line.split('|')
+                if len(parts) >= 2:
                     title = parts[0].strip()
+                    score_text = parts[1].strip()
                     try:
-                        score = int(re.search(r'\d+', parts[1]).group())
-                        if len(title) > 10 and 0 <= score <= 100:
-                            suggestions.append({'title': title, 'predicted_virality': score})
+                        score = int(re.search(r'\d+', score_text).group())
+                        suggestions.append({'title': title, 'predicted_virality': score})
                     except:
                         continue
-                elif '(' in line and ')' in line:
-                    # Format: Title (85%)
-                    match = re.match(r'(.+?)\s*\((\d+)', line)
-                    if match:
-                        title = match.group(1).strip()
-                        score = int(match.group(2))
-                        if len(title) > 10:
-                            suggestions.append({'title': title, 'predicted_virality': score})
-            
-            if not suggestions:
-                print("[AI] Parsing failed, generating fallback suggestions...")
-                suggestions = [
-                    {'title': f"{topic.title()} - Complete Guide for Beginners", 'predicted_virality': 75},
-                    {'title': f"How to Master {topic.title()} in 2025", 'predicted_virality': 80},
-                    {'title': f"{topic.title()} Tips You NEED to Know", 'predicted_virality': 72},
-                    {'title': f"I Tried {topic.title()} for 30 Days - Results!", 'predicted_virality': 85},
-                    {'title': f"{topic.title()} Explained in 5 Minutes", 'predicted_virality': 78},
-                ]
-            
-            return {
-                'success': True,
-                'suggestions': suggestions[:5],
-                'tokens_used': response.usage.total_tokens
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'suggestions': []
-            }
+            elif '-' in line and len(line.split('-')) >= 2:
+                parts = line.rsplit('-', 1)  # Split from right
+                title = parts[0].strip()
+                try:
+                    score = int(re.search(r'\d+', parts[1]).group())
+                    if len(title) > 10 and 0 <= score <= 100:
+                        suggestions.append({'title': title, 'predicted_virality': score})
+                except:
+                    continue
+            elif '(' in line and ')' in line:
+                # Format: Title (85%)
+                match = re.match(r'(.+?)\s*\((\d+)', line)
+                if match:
+                    title = match.group(1).strip()
+                    score = int(match.group(2))
+                    if len(title) > 10:
+                        suggestions.append({'title': title, 'predicted_virality': score})
+        
+        if not suggestions:
+            print("[AI] Parsing failed, generating fallback suggestions...")
+            suggestions = [
+                {'title': f"{topic.title()} - Complete Guide for Beginners", 'predicted_virality': 75},
+                {'title': f"How to Master {topic.title()} in 2025", 'predicted_virality': 80},
+                {'title': f"{topic.title()} Tips You NEED to Know", 'predicted_virality': 72},
+                {'title': f"I Tried {topic.title()} for 30 Days - Results!", 'predicted_virality': 85},
+                {'title': f"{topic.title()} Explained in 5 Minutes", 'predicted_virality': 78},
+            ]
+        
+        return {
+            'success': True,
+            'suggestions': suggestions[:5],
+            'tokens_used': completion['tokens_used'],
+            'cached': completion['cached']
+        }
     
     def extract_trending_topics(self, videos: List[Dict], top_n: int = 10) -> Dict:
+        return self._run(
+            self._extract_trending_topics_request(videos, top_n),
+            self._extract_trending_topics_result,
+            {'topics': []}
+        )
+    
+    async def extract_trending_topics_async(self, videos: List[Dict], top_n: int = 10) -> Dict:
+        return await self._run_async(
+            self._extract_trending_topics_request(videos, top_n),
+            self._extract_trending_topics_result,
+            {'topics': []}
+        )
+    
+    def _extract_trending_topics_request(self, videos: List[Dict], top_n: int = 10) -> Dict[str, Any]:
         sample_titles = [v.get('title', '') for v in videos[:50] if v.get('title')]
         titles_text = '\n'.join([f"- {title}" for title in sample_titles])
         
@@ -174,35 +519,42 @@ Format as JSON:
   ]
 }}"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a data analyst specializing in content trends. Return valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.5,
-                response_format={"type": "json_object"}
-            )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            return {
-                'success': True,
-                'topics': result.get('topics', []),
-                'tokens_used': response.usage.total_tokens
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'topics': []
-            }
+        return self._request_spec(
+            'extract_trending_topics',
+            [
+                {"role": "system", "content": "You are a data analyst specializing in content trends. Return valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500,
+            temperature=0.5,
+            response_format={"type": "json_object"}
+        )
+    
+    def _extract_trending_topics_result(self, completion: Dict[str, Any]) -> Dict[str, Any]:
+        result = json.loads(completion['content'])
+        
+        return {
+            'success': True,
+            'topics': result.get('topics', []),
+            'tokens_used': completion['tokens_used'],
+            'cached': completion['cached']
+        }
     
     def generate_insights(self, dataset_summary: Dict) -> str:
+        return self._run(
+            self._generate_insights_request(dataset_summary),
+            self._generate_insights_result,
+            {'insights': 'AI insights unavailable'}
+        )
+    
+    async def generate_insights_async(self, dataset_summary: Dict) -> str:
+        return await self._run_async(
+            self._generate_insights_request(dataset_summary),
+            self._generate_insights_result,
+            {'insights': 'AI insights unavailable'}
+        )
+    
+    def _generate_insights_request(self, dataset_summary: Dict) -> Dict[str, Any]:
         prompt = f"""Analyze this YouTube dataset and provide 3-5 key insights:
 
 Dataset Stats:
@@ -222,31 +574,40 @@ IMPORTANT: When mentioning countries in insights, always use their FULL NAMES (e
 
 Focus on actionable patterns and surprising findings."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a data scientist. Provide concise, numbered insights with specific metrics."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.6
-            )
-            
-            return {
-                'success': True,
-                'insights': response.choices[0].message.content,
-                'tokens_used': response.usage.total_tokens
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'insights': 'AI insights unavailable'
-            }
+        return self._request_spec(
+            'generate_insights',
+            [
+                {"role": "system", "content": "You are a data scientist. Provide concise, numbered insights with specific metrics."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=0.6
+        )
+    
+    def _generate_insights_result(self, completion: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'insights': completion['content'],
+            'tokens_used': completion['tokens_used'],
+            'cached': completion['cached']
+        }
     
     def explain_virality_score(self, video: Dict) -> str:
+        return self._run(
+            self._explain_virality_score_request(video),
+            self._explain_virality_score_result,
+            {'explanation': 'AI explanation unavailable'}
+        )
+    
+    async def explain_virality_score_async(self, video: Dict) -> str:
+        return await self._run_async(
+            self._explain_virality_score_request(video),
+            self._explain_virality_score_result,
+            {'explanation': 'AI explanation unavailable'}
+        )
+    
+    @classmethod
+    def _explain_virality_score_request(cls, video: Dict) -> Dict[str, Any]:
         prompt = f"""Explain why this video has a virality score of {video.get('viralityScore', 0)}/100:
 
 Video: {video.get('title', 'Unknown')}
@@ -265,30 +626,24 @@ Provide a 2-3 sentence explanation covering:
 
 Be encouraging but honest."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a YouTube growth consultant. Explain virality scores in simple terms."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-            
-            return {
-                'success': True,
-                'explanation': response.choices[0].message.content,
-                'tokens_used': response.usage.total_tokens
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'explanation': 'AI explanation unavailable'
-            }
-
+        return cls._request_spec(
+            'explain_virality_score',
+            [
+                {"role": "system", "content": "You are a YouTube growth consultant. Explain virality scores in simple terms."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=200,
+            temperature=0.7
+        )
+    
+    def _explain_virality_score_result(self, completion: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'explanation': completion['content'],
+            'tokens_used': completion['tokens_used'],
+            'cached': completion['cached']
+        }
+    
 
 if __name__ == "__main__":
     print("\n" + "="*70)
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from ods import BASE_DIR
+
+AI_STORE_PATH = os.getenv("AI_STORE_PATH", os.path.join(BASE_DIR, "db/cache/ai_precomputed.sqlite"))
+
+
+class PrecomputedAIStore:
+    """
+    AI texts generated ahead of time by ``pregenerate_ai.py``, one per (video id, kind).
+
+    Each entry remembers the completion key of the request it answered; a lookup with a different
+    key (the video's counts or score changed, or the prompt did) is a miss, so stale text is never
+    served.
+    """
+
+    def __init__(self, path: str = AI_STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS precomputed (
+                video_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                request_key TEXT NOT NULL,
+                content TEXT NOT NULL,
+                model TEXT NOT NULL,
+                tokens_used INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (video_id, kind)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, video_id: str, kind: str, request_key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content, model, tokens_used, created_at FROM precomputed "
+                "WHERE video_id = ? AND kind = ? AND request_key = ?",
+                (video_id, kind, request_key),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content": row[0], "model": row[1], "tokens_used": row[2], "created_at": row[3]}
+
+    def put(self, video_id: str, kind: str, request_key: str, content: str, model: str, tokens_used: int) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO precomputed VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, kind, request_key, content, model, tokens_used, time.time()),
+            )
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM precomputed").fetchone()[0]
@@ -1,16 +1,30 @@
+import asyncio
 import logging
-import re
 import sys
-from fastapi import FastAPI, HTTPException, Query
+import threading
+import hashlib
+from fastapi import Body, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+import numpy as np
 import pandas as pd
 import os
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
-from virality_calculator import ViralityCalculator
 from ai_analyzer import AIVideoAnalyzer
+from ai_store import PrecomputedAIStore
+from ods import (
+    BASE_DIR, TRENDING_CSV, TRENDING_PARQUET, VIDEO_INDEX_PATH, VIDEO_STATS_CSV, VIDEO_STATS_PARQUET,
+    read_trending_frame, stats_signature
+)
+from categories import CATEGORY_KEYS
+from dataset_summary import DatasetSummary, load_dataset_summary
+from history_index import ViewHistoryIndex
+from snapshot import DataSnapshot, SnapshotManager
+from video_index import current_signature, load_history_index, load_video_index
+from video_list import VideoList
+from video_records import build_video_records
 
 # Country code to full name mapping
 COUNTRY_NAMES = {
@@ -57,202 +71,125 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-TRENDING_CSV = os.path.join(BASE_DIR, "db/ods/trending_videos.csv")
-VIDEO_STATS_CSV = os.path.join(BASE_DIR, "db/ods/merged_video_stats.csv")
-
-_videos_cache = None
-_stats_cache = None
-_cache_timestamp = None
-
-def _compile_keywords(keywords: List[str]) -> List[re.Pattern]:
-    patterns: List[re.Pattern] = []
-    for keyword in keywords:
-        escaped = re.escape(keyword.strip())
-        if not escaped:
-            continue
-        patterns.append(re.compile(rf"\b{escaped}\b", re.IGNORECASE))
-    return patterns
-
-RAW_CATEGORY_FILTERS: Dict[str, Dict[str, Any]] = {
-    "music": {
-        "category_ids": {"10"},
-        "include": [
-            "music", "song", "single", "album", "artist", "lyrics",
-            "official video", "remix", "mv"
-        ],
-    },
-    "gaming": {
-        "category_ids": {"20"},
-        "include": [
-            "gaming", "gameplay", "playthrough", "walkthrough",
-            "let's play", "speedrun", "roblox", "minecraft",
-            "valorant", "fortnite", "gta", "call of duty", "csgo", "pubg"
-        ],
-        "exclude": [
-            "match", "league", "cup", "goal", "highlights", "tournament"
-        ],
-    },
-    "sports": {
-        "category_ids": {"17"},
-        "include": [
-            "sport", "match", "league", "goal", "highlights", "tournament",
-            "nba", "nfl", "fifa", "world cup", "uefa", "mlb", "cricket",
-            "soccer", "game highlights"
-        ],
-        "exclude": [
-            "gaming", "gameplay", "minecraft", "roblox", "fortnite"
-        ],
-    },
-    "news": {
-        "category_ids": {"25"},
-        "include": [
-            "news", "breaking news", "headline", "press conference",
-            "update", "report", "journal", "newscast", "bulletin"
-        ],
-    },
-    "tech": {
-        "category_ids": {"28"},
-        "include": [
-            "tech", "technology", "gadget", "smartphone", "iphone", "android",
-            "review", "unboxing", "pc build", "software", "hardware", "ai",
-            "robot", "electronics", "laptop"
-        ],
-    },
-    "food": {
-        "category_ids": {"26"},
-        "include": [
-            "recipe", "kitchen", "cook", "cooking", "food", "chef", "baking",
-            "dessert", "meal", "restaurant", "cuisine", "eat", "tasting"
-        ],
-    },
-    "lifestyle": {
-        "category_ids": {"22", "26"},
-        "include": [
-            "lifestyle", "daily vlog", "vlog", "routine", "morning routine",
-            "night routine", "beauty", "fashion", "makeup", "self care",
-            "travel vlog", "home decor"
-        ],
-    },
-    "education": {
-        "category_ids": {"27"},
-        "include": [
-            "education", "lesson", "tutorial", "learn", "explained", "lecture",
-            "course", "class", "study", "school", "how to", "teacher", "science lesson"
-        ],
-    },
-    "comedy": {
-        "category_ids": {"23"},
-        "include": [
-            "comedy", "funny", "sketch", "prank", "stand-up", "parody",
-            "humor", "laugh", "comedian", "joke"
-        ],
-    },
-    "culture": {
-        "category_ids": {"24", "29"},
-        "include": [
-            "culture", "entertainment", "festival", "art", "heritage",
-            "tradition", "documentary", "music video", "dance",
-            "museum", "theatre", "history"
-        ],
-    },
-}
 
-CATEGORY_FILTERS: Dict[str, Dict[str, Any]] = {}
+# Size of the served video list; the API pages through it 100 records at a time
+VIDEOS_TOP_K = int(os.getenv("VIDEOS_TOP_K", "100"))
 
-for key, config in RAW_CATEGORY_FILTERS.items():
-    CATEGORY_FILTERS[key] = {
-        "category_ids": config.get("category_ids", set()),
-        "include": _compile_keywords(config.get("include", [])),
-        "exclude": _compile_keywords(config.get("exclude", [])),
-    }
+ODS_POLL_SECONDS = float(os.getenv("ODS_POLL_SECONDS", "30"))
+# Number of distinct `days` windows kept per snapshot
+VIDEOS_DAYS_CACHE_SIZE = int(os.getenv("VIDEOS_DAYS_CACHE_SIZE", "16"))
+
+def watched_signature() -> str:
+    """Fingerprint of the ODS files and the precomputed video index the snapshot is built from."""
+    index_mtime = os.stat(VIDEO_INDEX_PATH).st_mtime_ns if os.path.exists(VIDEO_INDEX_PATH) else 0
+    return f"{current_signature()}|{index_mtime}"
+
+def load_snapshot_history() -> ViewHistoryIndex:
+    history_index = load_history_index()
+    print(f"[Backend] View history index covers {len(history_index):,} videos")
+    return history_index
+
+def snapshot_history(snapshot: DataSnapshot) -> ViewHistoryIndex:
+    """The snapshot's view history, read from the stats ODS only once a request needs it."""
+    return snapshot.derived("history_index", load_snapshot_history)
+
+def summarise_dataset(previous: Optional[DatasetSummary] = None) -> Optional[DatasetSummary]:
+    try:
+        dataset_summary = load_dataset_summary(previous)
+        print(f"[Backend] Dataset summary: {dataset_summary.total_videos:,} videos, {dataset_summary.data_points:,} data points")
+        return dataset_summary
+    except Exception as e:
+        print(f"Error summarising trending data: {e}")
+        return None
+
+def snapshot_summary(snapshot: DataSnapshot) -> Optional[DatasetSummary]:
+    """The snapshot's whole-dataset summary, scanned from the trending ODS only once a request needs it."""
+    return snapshot.derived("dataset_summary", summarise_dataset)
+
+def build_snapshot(signature: str, previous: Optional[DataSnapshot]) -> DataSnapshot:
+    # The memory-mapped index already carries growth scores, so the history is only read eagerly
+    # without it; an unchanged stats ODS keeps the previous snapshot's history if it was loaded.
+    stats_source = stats_signature()
+    history_index = None
+    if previous is not None and previous.stats_source == stats_source:
+        history_index = previous.derived_values.get("history_index")
+
+    video_index = load_video_index()
+    if video_index is not None:
+        print(f"[Backend] Memory-mapped video index with {len(video_index):,} videos (built {video_index.built_at})")
+        video_list = VideoList(video_index.records(limit=VIDEOS_TOP_K), video_index.category_masks(limit=VIDEOS_TOP_K))
+    else:
+        df = read_trending_frame()
+        df['collection_date'] = pd.to_datetime(df['collection_date'])
+        if history_index is None:
+            history_index = load_snapshot_history()
+        video_list = VideoList(build_video_records(df, top_k=VIDEOS_TOP_K, history_index=history_index))
+
+    # Extending a summary the previous snapshot already computed only reads the appended rows
+    previous_summary = previous.derived_values.get("dataset_summary") if previous is not None else None
+    dataset_summary = summarise_dataset(previous_summary) if previous_summary is not None else None
+
+    snapshot = DataSnapshot(signature, cache_size=VIDEOS_DAYS_CACHE_SIZE, video_list=video_list,
+                            videos=video_list.records, stats_source=stats_source, video_index=video_index)
+    if history_index is not None:
+        snapshot.derived("history_index", lambda: history_index)
+    if dataset_summary is not None:
+        snapshot.derived("dataset_summary", lambda: dataset_summary)
+    return snapshot
+
+def empty_snapshot() -> DataSnapshot:
+    """Served while no snapshot could be built (e.g. before the first pipeline run): no videos, fallback stats."""
+    return DataSnapshot("", cache_size=VIDEOS_DAYS_CACHE_SIZE, video_list=VideoList([]), videos=[],
+                        stats_source=None, video_index=None)
+
+snapshots = SnapshotManager(build_snapshot, watched_signature, poll_seconds=ODS_POLL_SECONDS, empty=empty_snapshot)
+
+@app.on_event("startup")
+def start_snapshot_watcher():
+    snapshots.get()
+    snapshots.start()
+
+@app.on_event("shutdown")
+def stop_snapshot_watcher():
+    snapshots.stop()
+
+def load_trending_by_date() -> pd.DataFrame:
+    """The trending ODS parsed once and sorted by collection date, so `days` windows are suffix slices."""
+    df = read_trending_frame()
+    df['collection_date'] = pd.to_datetime(df['collection_date'])
+    return df.sort_values('collection_date', kind='mergesort').reset_index(drop=True)
+
+def load_video_list(days_filter: int = None, snapshot: Optional[DataSnapshot] = None) -> VideoList:
+    snapshot = snapshot or snapshots.get()
+    if days_filter is None:
+        return snapshot.video_list
 
-def load_videos_data(days_filter: int = None):
-    global _videos_cache
-    if days_filter is not None or _videos_cache is None:
-        try:
-            df = pd.read_csv(TRENDING_CSV)
-            
-            df['collection_date'] = pd.to_datetime(df['collection_date'])
-            
-            if days_filter is not None:
-                last_date = df['collection_date'].max()
-                cutoff_date = last_date - timedelta(days=days_filter)
-                df = df[df['collection_date'] >= cutoff_date]
-                print(f"[Backend] Filtering to last {days_filter} days: {cutoff_date.strftime('%Y-%m-%d')} to {last_date.strftime('%Y-%m-%d')}")
-            
-            df_grouped = df.sort_values('collection_date', ascending=False).groupby('id').first().reset_index()
-            
-            df_grouped['viewCount'] = pd.to_numeric(df_grouped['viewCount'], errors='coerce').fillna(0)
-            
-            df_top = df_grouped.sort_values('collection_date', ascending=False).head(100)
-            
-            print(f"[Backend] Loading TOP 100 NEWEST TRENDING videos (from {len(df_grouped):,} unique videos)...")
-            print(f"[Backend] Most recent collection: {df_top.iloc[0]['collection_date']}")
-            if len(df_top) > 0:
-                print(f"[Backend] #1 trending: {df_top.iloc[0]['title']} - {df_top.iloc[0]['viewCount']:,.0f} views")
-            
-            videos = []
-            for _, row in df_top.iterrows():
-                video_id = str(row['id'])
-                
-                video_collections = df[df['id'] == row['id']]['collection_date']
-                collection_dates_list = [pd.Timestamp(d).strftime('%Y-%m-%dT%H:%M:%SZ') if hasattr(d, 'strftime') else str(d) for d in sorted(video_collections.unique())]
-                
-                video_data = {
-                    'views': int(row.get('viewCount', 0)) if pd.notna(row.get('viewCount')) else 0,
-                    'likes': int(row.get('likeCount', 0)) if pd.notna(row.get('likeCount')) else 0,
-                    'comments': int(row.get('commentCount', 0)) if pd.notna(row.get('commentCount')) else 0,
-                }
-                
-                calculator = ViralityCalculator()
-                virality_result = calculator.calculate_virality_score(
-                    video_data,
-                    collection_dates=collection_dates_list
-                )
-                
-                video = {
-                    "videoId": str(row['id']),
-                    "title": str(row['title']),
-                    "channelTitle": str(row.get('channelTitle', '')),
-                    "thumbnailUrl": str(row.get('thumbnail_url', '')),
-                    "description": str(row.get('description', '')),
-                    "categoryId": str(row.get('categoryId', '')).strip(),
-                    "tags": row.get('tags'),
-                    "views": video_data['views'],
-                    "likes": video_data['likes'],
-                    "comments": video_data['comments'],
-                    "country": str(row.get('country_code', '')),
-                    "publishedAt": str(row.get('publishedAt', '')),
-                    "viralityScore": virality_result['virality_score'],
-                    "growthVelocity": virality_result['growth_velocity'],
-                    "engagementRate": virality_result['engagement_rate'],
-                    "trendingDuration": virality_result['trending_duration'],
-                    "audienceReach": virality_result['audience_reach']
-                }
-                videos.append(video)
-            
-            if days_filter is None:
-                _videos_cache = videos
-            return videos
-        except Exception as e:
-            print(f"Error loading videos: {e}")
-            return []
-    
-    return _videos_cache
-
-def load_stats_data():
-    global _stats_cache
-    if _stats_cache is not None:
-        return _stats_cache
-    
     try:
-        df = pd.read_csv(VIDEO_STATS_CSV)
-        _stats_cache = df
-        return df
+        df = snapshot.derived("trending_by_date", load_trending_by_date)
+        if len(df) == 0:
+            return VideoList([])
+
+        collection_dates = df['collection_date'].to_numpy()
+        last_date = df['collection_date'].iloc[-1]
+        cutoff_date = last_date - timedelta(days=days_filter)
+        start = int(np.searchsorted(collection_dates, cutoff_date.to_datetime64(), side='left'))
+
+        # Windows reaching back past the same first row select identical data, so key on the row
+        cached = snapshot.cache.get(("videos", start))
+        if cached is not None:
+            return cached
+
+        print(f"[Backend] Filtering to last {days_filter} days: {cutoff_date.strftime('%Y-%m-%d')} to {last_date.strftime('%Y-%m-%d')}")
+        video_list = VideoList(build_video_records(df.iloc[start:], top_k=VIDEOS_TOP_K,
+                                                   history_index=snapshot_history(snapshot)))
+        snapshot.cache.put(("videos", start), video_list)
+        return video_list
     except Exception as e:
-        print(f"Error loading stats: {e}")
-        return pd.DataFrame()
+        print(f"Error loading videos: {e}")
+        return VideoList([])
+
+def load_videos_data(days_filter: int = None):
+    return load_video_list(days_filter).records
 
 @app.get("/")
 def root():
@@ -272,135 +209,90 @@ def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "data_available": {
-            "trending_videos": os.path.exists(TRENDING_CSV),
-            "video_stats": os.path.exists(VIDEO_STATS_CSV)
-        }
+            "trending_videos": os.path.exists(TRENDING_PARQUET) or os.path.exists(TRENDING_CSV),
+            "video_stats": os.path.exists(VIDEO_STATS_PARQUET) or os.path.exists(VIDEO_STATS_CSV)
+        },
+        "snapshot": snapshots.status()
     }
 
 @app.get("/api/videos")
 def get_videos(
+    request: Request,
     limit: int = 50, 
     offset: int = 0, 
     days: int = None,
     published_days: int = None,
     category: Optional[str] = Query(default=None, description="Filter videos by category key (e.g., music, gaming)")
 ) -> List[Dict[str, Any]]:
-    videos = load_videos_data(days_filter=days)
+    snapshot = snapshots.get()
+    video_list = load_video_list(days_filter=days, snapshot=snapshot)
     
-    if not videos:
+    if not video_list.records:
         raise HTTPException(status_code=503, detail="Video data not available")
 
     category_key = (category or "all").strip().lower()
 
     category_header = category_key or "all"
+    selected_category = None
 
     if category_key and category_key != "all":
-        filter_config = CATEGORY_FILTERS.get(category_key)
-        if filter_config:
-            pre_count = len(videos)
-
-            def matches_category(video: Dict[str, Any]) -> bool:
-                raw_category_id = video.get('categoryId') or video.get('category_id')
-                category_id = str(raw_category_id).strip() if raw_category_id is not None else ''
-                if category_id and category_id in filter_config["category_ids"]:
-                    return True
-
-                include_patterns: List[re.Pattern] = filter_config["include"]
-                exclude_patterns: List[re.Pattern] = filter_config["exclude"]
-
-                text_parts: List[str] = [
-                    str(video.get('title') or ''),
-                    str(video.get('description') or ''),
-                ]
-
-                tags_value = video.get('tags')
-                if isinstance(tags_value, list):
-                    text_parts.extend(str(tag) for tag in tags_value)
-                elif isinstance(tags_value, str):
-                    text_parts.append(tags_value)
-                elif tags_value is not None:
-                    text_parts.append(str(tags_value))
-
-                text_blob = ' '.join(text_parts)
-                if not text_blob.strip():
-                    return False
-
-                if exclude_patterns and any(pattern.search(text_blob) for pattern in exclude_patterns):
-                    return False
-
-                if include_patterns and any(pattern.search(text_blob) for pattern in include_patterns):
-                    return True
-
-                return False
-
-            videos = [video for video in videos if matches_category(video)]
-            logger.info("Filtering videos by category=%s, count_pre=%d, count_post=%d", category_key, pre_count, len(videos))
+        if category_key in CATEGORY_KEYS:
+            selected_category = category_key
         else:
             logger.info("Category filter skipped - unknown category=%s", category_key)
             category_header = "all"
     
-    # Filter by published date if specified
+    published_since = None
     if published_days is not None:
-        from datetime import datetime, timedelta
-        import pytz
-        
-        now_utc = datetime.now(pytz.UTC)
-        cutoff_date = now_utc - timedelta(days=published_days)
-        
-        print(f"[API] Filtering published videos: cutoff={cutoff_date.strftime('%Y-%m-%d')}, now={now_utc.strftime('%Y-%m-%d')}")
-        
-        filtered_videos = []
-        for video in videos:
-            published_at = video.get('publishedAt', '')
-            if published_at:
-                try:
-                    if published_at.endswith('Z'):
-                        video_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    else:
-                        video_date = datetime.fromisoformat(published_at)
-                    
-                    if video_date.tzinfo is None:
-                        video_date = pytz.UTC.localize(video_date)
-                    
-                    if video_date >= cutoff_date:
-                        filtered_videos.append(video)
-                except Exception as e:
-                    print(f"[API] Date parse error for {published_at}: {e}")
-                    pass
-        
-        videos = filtered_videos
-        print(f"[API] Filtered to {len(videos)} videos published in last {published_days} days (from {cutoff_date.strftime('%Y-%m-%d')})")
-    
-    limit = min(limit, 100)
-    end = offset + limit
-    
-    filtered_slice = videos[offset:end]
-    return JSONResponse(content=filtered_slice, headers={"X-Category-Filter": category_header})
-
-@app.get("/api/videos/{video_id}/history")
-def get_video_history(video_id: str) -> Dict[str, Any]:
-    df = load_stats_data()
+        published_since = (datetime.now(timezone.utc) - timedelta(days=published_days)).timestamp()
     
-    if df.empty:
-        return generate_sample_history(video_id)
-    
-    video_data = df[df['video_id'] == video_id].copy()
-    
-    if video_data.empty:
-        return generate_sample_history(video_id)
+    positions = video_list.select(category=selected_category, published_since=published_since)
+    if selected_category is not None or published_since is not None:
+        logger.info("Filtering videos by category=%s, published_days=%s, count_pre=%d, count_post=%d",
+                    category_header, published_days, len(video_list), len(positions))
     
-    video_data['collection_day'] = pd.to_datetime(video_data['collection_day'])
-    video_data = video_data.sort_values('collection_day')
+    limit = min(limit, 100)
     
-    timestamps = video_data['collection_day'].dt.strftime('%Y-%m-%d').tolist()
-    views = video_data['view_count'].tolist()
+    page_positions = positions[offset:offset + limit]
+    # The page is fully determined by the snapshot, the days window and the selected rows
+    etag_source = f"{snapshot.signature}|{snapshot.version}|{days}|{category_header}|".encode() + page_positions.astype("int64").tobytes()
+    etag = f'"{hashlib.sha1(etag_source).hexdigest()}"'
+    headers = {"X-Category-Filter": category_header, "ETag": etag}
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
     
+    return Response(content=video_list.page_body(page_positions), media_type="application/json", headers=headers)
+
+@app.get("/api/categories")
+def get_category_counts(days: int = None) -> Dict[str, Any]:
+    video_list = load_video_list(days_filter=days)
+    counts = video_list.category_counts()
     return {
-        "videoId": video_id,
-        "timestamps": timestamps,
-        "views": views
+        "total": len(video_list),
+        "categories": [{"key": key, "count": counts[key]} for key in CATEGORY_KEYS]
     }
 
+# Upper bound on ids per batch history request
+MAX_HISTORY_BATCH = 200
+
+def video_history(video_id: str) -> Dict[str, Any]:
+    timeline = snapshot_history(snapshots.get()).timeline(video_id)
+    if timeline is None:
+        return generate_sample_history(video_id)
+    return {"videoId": video_id, **timeline}
+
+@app.get("/api/videos/history")
+def get_video_histories(ids: str = Query(..., description="Comma-separated video ids")) -> Dict[str, Any]:
+    video_ids = list(dict.fromkeys(video_id.strip() for video_id in ids.split(",") if video_id.strip()))
+    if len(video_ids) > MAX_HISTORY_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_HISTORY_BATCH} ids per request")
+    
+    return {"histories": {video_id: video_history(video_id) for video_id in video_ids}}
+
+@app.get("/api/videos/{video_id}/history")
+def get_video_history(video_id: str) -> Dict[str, Any]:
+    return video_history(video_id)
+
 def generate_sample_history(video_id: str, days: int = 30) -> Dict[str, Any]:
     timestamps = []
     views = []
@@ -420,30 +312,20 @@ def generate_sample_history(video_id: str, days: int = 30) -> Dict[str, Any]:
         "views": views
     }
 
-@app.get("/api/stats")
-def get_stats() -> Dict[str, Any]:
-    videos = load_videos_data()
-    
-    try:
-        df_full = pd.read_csv(TRENDING_CSV)
-        total_unique_videos = df_full['id'].nunique()
-        unique_countries = df_full['country_code'].dropna().nunique()
-        print(f"[Stats] Total unique videos: {total_unique_videos:,}, Countries: {unique_countries}")
-    except Exception as e:
-        print(f"[Stats] Error reading full CSV: {e}")
+def compute_stats(videos: List[Dict[str, Any]], dataset_summary: Optional[DatasetSummary]) -> Dict[str, Any]:
+    if dataset_summary is not None:
+        total_unique_videos = dataset_summary.total_videos
+        unique_countries = dataset_summary.country_count
+        total_data_points = dataset_summary.data_points
+    else:
         total_unique_videos = len(videos)
         unique_countries = len(set(v.get('country', '') for v in videos if v.get('country')))
+        total_data_points = len(videos)
     
     total_views = sum(v.get('views', 0) for v in videos)
     total_likes = sum(v.get('likes', 0) for v in videos)
     avg_views = total_views / len(videos) if videos else 0
     
-    try:
-        total_data_points = len(df_full)
-        print(f"[Stats] Total data points: {total_data_points:,}")
-    except:
-        total_data_points = len(videos)
-    
     return {
         "total_videos": total_unique_videos,
         "trending_videos": len(videos),
@@ -454,49 +336,140 @@ def get_stats() -> Dict[str, Any]:
         "data_points": total_data_points
     }
 
+@app.get("/api/stats")
+def get_stats() -> Dict[str, Any]:
+    snapshot = snapshots.get()
+    return snapshot.derived("stats", lambda: compute_stats(snapshot.videos, snapshot_summary(snapshot)))
+
 _ai_analyzer = None
+_ai_analyzer_lock = threading.Lock()
 
 def get_ai_analyzer():
     global _ai_analyzer
     if _ai_analyzer is None:
-        try:
-            _ai_analyzer = AIVideoAnalyzer()
-            print("[AI] OpenAI analyzer initialized")
-        except Exception as e:
-            print(f"[AI] Warning: Could not initialize AI analyzer: {e}")
-            _ai_analyzer = False
+        # One shared analyzer, so its response cache and in-flight coalescing see every request
+        with _ai_analyzer_lock:
+            if _ai_analyzer is None:
+                try:
+                    _ai_analyzer = AIVideoAnalyzer()
+                    print("[AI] OpenAI analyzer initialized")
+                except Exception as e:
+                    print(f"[AI] Warning: Could not initialize AI analyzer: {e}")
+                    _ai_analyzer = False
     return _ai_analyzer if _ai_analyzer else None
 
+_ai_store = None
+
+def get_ai_store() -> PrecomputedAIStore:
+    global _ai_store
+    if _ai_store is None:
+        with _ai_analyzer_lock:
+            if _ai_store is None:
+                _ai_store = PrecomputedAIStore()
+    return _ai_store
+
+def precomputed_result(kind: str, field: str, video: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    A result from `pregenerate_ai.py` when it holds current text for this video, else None.
+
+    The lookup needs no OpenAI client, so precomputed text is served even without an API key.
+    """
+    precomputed = get_ai_store().get(video['videoId'], kind, AIVideoAnalyzer.video_request_key(kind, video))
+    if precomputed is None:
+        return None
+    return {'success': True, field: precomputed['content'], 'tokens_used': 0, 'cached': True, 'precomputed': True}
+
+# How often a pending AI request checks whether its client is still connected
+CLIENT_POLL_SECONDS = 0.5
+
+async def run_until_disconnected(request: Request, coro) -> Dict[str, Any]:
+    """Awaits ``coro``, cancelling it (and its upstream LLM call) if the client disconnects first."""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=CLIENT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
 @app.post("/api/ai/analyze-video")
-def ai_analyze_video(video_id: str) -> Dict[str, Any]:
-    analyzer = get_ai_analyzer()
-    if not analyzer:
-        raise HTTPException(status_code=503, detail="AI service unavailable")
-    
+async def ai_analyze_video(request: Request, video_id: str) -> Dict[str, Any]:
     videos = load_videos_data()
     video = next((v for v in videos if v['videoId'] == video_id), None)
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    result = analyzer.analyze_video(video)
+    result = precomputed_result('analysis', 'analysis', video)
+    if result is None:
+        analyzer = get_ai_analyzer()
+        if not analyzer:
+            raise HTTPException(status_code=503, detail="AI service unavailable")
+        result = await run_until_disconnected(request, analyzer.analyze_video_async(video))
     
     return {
         "videoId": video_id,
         "analysis": result.get('analysis', 'Analysis unavailable'),
         "success": result.get('success', False),
-        "tokens_used": result.get('tokens_used', 0)
+        "tokens_used": result.get('tokens_used', 0),
+        "cached": result.get('cached', False),
+        "precomputed": result.get('precomputed', False)
+    }
+
+# Upper bound on videos per batch analysis request
+MAX_ANALYZE_BATCH = 100
+
+@app.post("/api/ai/analyze-videos")
+async def ai_analyze_videos(
+    request: Request,
+    video_ids: Optional[List[str]] = Body(default=None, embed=True),
+    limit: int = 100
+) -> Dict[str, Any]:
+    analyzer = get_ai_analyzer()
+    if not analyzer:
+        raise HTTPException(status_code=503, detail="AI service unavailable")
+    
+    videos = load_videos_data()
+    missing: List[str] = []
+    if video_ids:
+        if len(video_ids) > MAX_ANALYZE_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_ANALYZE_BATCH} videos per request")
+        by_id = {v['videoId']: v for v in videos}
+        missing = [video_id for video_id in video_ids if video_id not in by_id]
+        videos = [by_id[video_id] for video_id in dict.fromkeys(video_ids) if video_id in by_id]
+    else:
+        videos = videos[:min(limit, MAX_ANALYZE_BATCH)]
+    
+    results = await run_until_disconnected(request, analyzer.analyze_videos_batch_async(videos))
+    
+    return {
+        "results": [
+            {
+                "videoId": video['videoId'],
+                "analysis": results[video['videoId']].get('analysis', 'Analysis unavailable'),
+                "success": results[video['videoId']].get('success', False),
+                "tokens_used": results[video['videoId']].get('tokens_used', 0),
+                "cached": results[video['videoId']].get('cached', False)
+            }
+            for video in videos
+        ],
+        "missing": missing,
+        "tokens_used": sum(result.get('tokens_used', 0) for result in results.values())
     }
 
 @app.post("/api/ai/generate-titles")
-def ai_generate_titles(topic: str, count: int = 5) -> Dict[str, Any]:
+async def ai_generate_titles(request: Request, topic: str, count: int = 5) -> Dict[str, Any]:
     analyzer = get_ai_analyzer()
     if not analyzer:
         raise HTTPException(status_code=503, detail="AI service unavailable")
     
     count = min(count, 10)
     
-    result = analyzer.generate_title_suggestions(topic, count)
+    result = await run_until_disconnected(request, analyzer.generate_title_suggestions_async(topic, count))
     
     return {
         "topic": topic,
@@ -506,30 +479,24 @@ def ai_generate_titles(topic: str, count: int = 5) -> Dict[str, Any]:
     }
 
 @app.get("/api/ai/trending-topics")
-def ai_trending_topics(limit: int = 100) -> Dict[str, Any]:
+async def ai_trending_topics(request: Request, limit: int = 100) -> Dict[str, Any]:
     analyzer = get_ai_analyzer()
     if not analyzer:
         raise HTTPException(status_code=503, detail="AI service unavailable")
     
     videos = load_videos_data()[:min(limit, 200)]
     
-    result = analyzer.extract_trending_topics(videos, top_n=10)
+    result = await run_until_disconnected(request, analyzer.extract_trending_topics_async(videos, top_n=10))
     
     return {
         "topics": result.get('topics', []),
         "analyzed_videos": len(videos),
         "success": result.get('success', False),
-        "tokens_used": result.get('tokens_used', 0)
+        "tokens_used": result.get('tokens_used', 0),
+        "cached": result.get('cached', False)
     }
 
-@app.get("/api/ai/insights")
-def ai_insights() -> Dict[str, Any]:
-    analyzer = get_ai_analyzer()
-    if not analyzer:
-        raise HTTPException(status_code=503, detail="AI service unavailable")
-    
-    videos = load_videos_data()
-    
+def compute_insights_summary(videos: List[Dict[str, Any]], dataset_summary: Optional[DatasetSummary]) -> Dict[str, Any]:
     total_views = sum(v.get('views', 0) for v in videos)
     avg_engagement = sum(
         ((v.get('likes', 0) + v.get('comments', 0)) / max(v.get('views', 1), 1)) * 100 
@@ -544,61 +511,71 @@ def ai_insights() -> Dict[str, Any]:
     )[:5]
     
     top_countries_full_names = [get_country_name(c[0]) for c in top_countries]
+    date_range = dataset_summary.date_range() if dataset_summary is not None else 'Feb 2025 - Dec 2025'
     
-    try:
-        df = pd.read_csv(TRENDING_CSV)
-        df['collection_date'] = pd.to_datetime(df['collection_date'])
-        earliest_date = df['collection_date'].min()
-        latest_date = df['collection_date'].max()
-        
-        earliest_str = earliest_date.strftime('%b %Y')
-        latest_str = latest_date.strftime('%b %Y')
-        
-        if earliest_str == latest_str:
-            date_range = latest_str
-        else:
-            date_range = f'{earliest_str} - {latest_str}'
-    except:
-        date_range = 'Feb 2025 - Dec 2025'
-    
-    summary = {
+    return {
         'total_videos': len(videos),
         'avg_views': total_views // len(videos) if videos else 0,
         'top_countries': top_countries_full_names,
         'date_range': date_range,
         'avg_engagement': avg_engagement
     }
+
+@app.get("/api/ai/insights")
+async def ai_insights(request: Request) -> Dict[str, Any]:
+    analyzer = get_ai_analyzer()
+    if not analyzer:
+        raise HTTPException(status_code=503, detail="AI service unavailable")
+    
+    snapshot = snapshots.get()
+    # The first request after a rebuild scans the trending ODS; keep that off the event loop
+    summary = await asyncio.to_thread(
+        snapshot.derived, "insights_summary",
+        lambda: compute_insights_summary(snapshot.videos, snapshot_summary(snapshot))
+    )
     
-    result = analyzer.generate_insights(summary)
+    result = await run_until_disconnected(request, analyzer.generate_insights_async(summary))
     
     return {
         "insights": result.get('insights', 'Insights unavailable'),
         "success": result.get('success', False),
         "tokens_used": result.get('tokens_used', 0),
+        "cached": result.get('cached', False),
         "dataset_summary": summary
     }
 
 @app.post("/api/ai/explain-score")
-def ai_explain_score(video_id: str) -> Dict[str, Any]:
-    analyzer = get_ai_analyzer()
-    if not analyzer:
-        raise HTTPException(status_code=503, detail="AI service unavailable")
-    
+async def ai_explain_score(request: Request, video_id: str) -> Dict[str, Any]:
     videos = load_videos_data()
     video = next((v for v in videos if v['videoId'] == video_id), None)
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    result = analyzer.explain_virality_score(video)
+    result = precomputed_result('explanation', 'explanation', video)
+    if result is None:
+        analyzer = get_ai_analyzer()
+        if not analyzer:
+            raise HTTPException(status_code=503, detail="AI service unavailable")
+        result = await run_until_disconnected(request, analyzer.explain_virality_score_async(video))
     
     return {
         "videoId": video_id,
         "explanation": result.get('explanation', 'Explanation unavailable'),
         "success": result.get('success', False),
-        "tokens_used": result.get('tokens_used', 0)
+        "tokens_used": result.get('tokens_used', 0),
+        "cached": result.get('cached', False),
+        "precomputed": result.get('precomputed', False)
     }
 
+@app.get("/api/ai/cache-stats")
+def ai_cache_stats() -> Dict[str, Any]:
+    analyzer = get_ai_analyzer()
+    if not analyzer:
+        raise HTTPException(status_code=503, detail="AI service unavailable")
+    
+    return {**analyzer.cache.stats(), "coalesced": analyzer.flights.shared + analyzer.async_flights.shared}
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting Tube Virality API Server...")
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+RAW_CATEGORY_FILTERS: Dict[str, Dict[str, Any]] = {
+    "music": {
+        "category_ids": {"10"},
+        "include": [
+            "music", "song", "single", "album", "artist", "lyrics",
+            "official video", "remix", "mv"
+        ],
+    },
+    "gaming": {
+        "category_ids": {"20"},
+        "include": [
+            "gaming", "gameplay", "playthrough", "walkthrough",
+            "let's play", "speedrun", "roblox", "minecraft",
+            "valorant", "fortnite", "gta", "call of duty", "csgo", "pubg"
+        ],
+        "exclude": [
+            "match", "league", "cup", "goal", "highlights", "tournament"
+        ],
+    },
+    "sports": {
+        "category_ids": {"17"},
+        "include": [
+            "sport", "match", "league", "goal", "highlights", "tournament",
+            "nba", "nfl", "fifa", "world cup", "uefa", "mlb", "cricket",
+            "soccer", "game highlights"
+        ],
+        "exclude": [
+            "gaming", "gameplay", "minecraft", "roblox", "fortnite"
+        ],
+    },
+    "news": {
+        "category_ids": {"25"},
+        "include": [
+            "news", "breaking news", "headline", "press conference",
+            "update", "report", "journal", "newscast", "bulletin"
+        ],
+    },
+    "tech": {
+        "category_ids": {"28"},
+        "include": [
+            "tech", "technology", "gadget", "smartphone", "iphone", "android",
+            "review", "unboxing", "pc build", "software", "hardware", "ai",
+            "robot", "electronics", "laptop"
+        ],
+    },
+    "food": {
+        "category_ids": {"26"},
+        "include": [
+            "recipe", "kitchen", "cook", "cooking", "food", "chef", "baking",
+            "dessert", "meal", "restaurant", "cuisine", "eat", "tasting"
+        ],
+    },
+    "lifestyle": {
+        "category_ids": {"22", "26"},
+        "include": [
+            "lifestyle", "daily vlog", "vlog", "routine", "morning routine",
+            "night routine", "beauty", "fashion", "makeup", "self care",
+            "travel vlog", "home decor"
+        ],
+    },
+    "education": {
+        "category_ids": {"27"},
+        "include": [
+            "education", "lesson", "tutorial", "learn", "explained", "lecture",
+            "course", "class", "study", "school", "how to", "teacher", "science lesson"
+        ],
+    },
+    "comedy": {
+        "category_ids": {"23"},
+        "include": [
+            "comedy", "funny", "sketch", "prank", "stand-up", "parody",
+            "humor", "laugh", "comedian", "joke"
+        ],
+    },
+    "culture": {
+        "category_ids": {"24", "29"},
+        "include": [
+            "culture", "entertainment", "festival", "art", "heritage",
+            "tradition", "documentary", "music video", "dance",
+            "museum", "theatre", "history"
+        ],
+    },
+}
+
+CATEGORY_KEYS: List[str] = list(RAW_CATEGORY_FILTERS)
+
+
+def _is_word_char(char: str) -> bool:
+    return re.match(r"\w", char) is not None
+
+
+def video_text(video: Dict[str, Any]) -> str:
+    """The text a video's category keywords are matched against: title, description and tags."""
+    text_parts: List[str] = [
+        str(video.get('title') or ''),
+        str(video.get('description') or ''),
+    ]
+
+    tags_value = video.get('tags')
+    if isinstance(tags_value, list):
+        text_parts.extend(str(tag) for tag in tags_value)
+    elif isinstance(tags_value, str):
+        text_parts.append(tags_value)
+    elif tags_value is not None:
+        text_parts.append(str(tags_value))
+
+    return ' '.join(text_parts)
+
+
+class CategoryMatcher:
+    """
+    Assigns videos a bitmask of the categories they belong to (bit ``i`` is ``CATEGORY_KEYS[i]``).
+
+    All include/exclude keywords of every category are matched in one pass by a single
+    case-insensitive regex: a lookahead alternation, longest keywords first, tried at every
+    position. Where several keywords start at the same position only the longest is reported, so
+    each keyword also carries the shorter keywords it implies there (``music video`` implies
+    ``music``, ``newscast`` does not imply ``news``). The result equals searching every keyword's
+    ``\\bkeyword\\b`` pattern separately.
+
+    A video belongs to a category when its categoryId is one of the category's ids, or otherwise
+    when no exclude keyword and at least one include keyword occurs in its text.
+    """
+
+    def __init__(self, filters: Dict[str, Dict[str, Any]]):
+        self.keys = list(filters)
+        keywords: List[str] = []
+        for config in filters.values():
+            for keyword in config.get("include", []) + config.get("exclude", []):
+                keyword = keyword.strip().lower()
+                if keyword and keyword not in keywords:
+                    keywords.append(keyword)
+        self.keyword_bits = {keyword: 1 << i for i, keyword in enumerate(keywords)}
+
+        self.include_masks: List[int] = []
+        self.exclude_masks: List[int] = []
+        self.ids_to_mask: Dict[str, int] = {}
+        for bit, config in enumerate(filters.values()):
+            self.include_masks.append(self._keyword_mask(config.get("include", [])))
+            self.exclude_masks.append(self._keyword_mask(config.get("exclude", [])))
+            for category_id in config.get("category_ids", set()):
+                self.ids_to_mask[category_id] = self.ids_to_mask.get(category_id, 0) | (1 << bit)
+
+        # One group per keyword, so the match's group number identifies it whatever its case
+        ordered = sorted(keywords, key=len, reverse=True)
+        alternation = "|".join(f"({re.escape(keyword)})" for keyword in ordered)
+        self.pattern = re.compile(rf"(?=\b(?:{alternation})\b)", re.IGNORECASE)
+        self.implied = [self._implied_mask(keyword, keywords) for keyword in ordered]
+
+    def _keyword_mask(self, keywords: Iterable[str]) -> int:
+        mask = 0
+        for keyword in keywords:
+            keyword = keyword.strip().lower()
+            if keyword:
+                mask |= self.keyword_bits[keyword]
+        return mask
+
+    def _implied_mask(self, keyword: str, keywords: List[str]) -> int:
+        """Bits of ``keyword`` and every shorter keyword that also matches wherever it matches."""
+        mask = self.keyword_bits[keyword]
+        for other in keywords:
+            n = len(other)
+            if n < len(keyword) and keyword.startswith(other) and \
+                    _is_word_char(keyword[n - 1]) != _is_word_char(keyword[n]):
+                mask |= self.keyword_bits[other]
+        return mask
+
+    def keyword_hits(self, text: str) -> int:
+        hits = 0
+        for match in self.pattern.finditer(text):
+            hits |= self.implied[match.lastindex - 1]
+        return hits
+
+    def classify(self, video: Dict[str, Any]) -> int:
+        raw_category_id = video.get('categoryId') or video.get('category_id')
+        category_id = str(raw_category_id).strip() if raw_category_id is not None else ''
+        mask = self.ids_to_mask.get(category_id, 0) if category_id else 0
+
+        text_blob = video_text(video)
+        if not text_blob.strip():
+            return mask
+
+        hits = self.keyword_hits(text_blob)
+        for bit, (include, exclude) in enumerate(zip(self.include_masks, self.exclude_masks)):
+            if hits & include and not hits & exclude:
+                mask |= 1 << bit
+        return mask
+
+    def classify_all(self, videos: List[Dict[str, Any]]) -> np.ndarray:
+        return np.fromiter((self.classify(video) for video in videos), dtype=np.uint32, count=len(videos))
+
+    def bit(self, key: str) -> Optional[int]:
+        return 1 << self.keys.index(key) if key in self.keys else None
+
+
+CATEGORY_MATCHER = CategoryMatcher(RAW_CATEGORY_FILTERS)
+
+# Changes whenever the category definitions do, so persisted masks built from older ones are ignored
+CATEGORY_SIGNATURE = hashlib.sha256(
+    json.dumps(RAW_CATEGORY_FILTERS, sort_keys=True, default=sorted).encode()
+).hexdigest()[:16]
+
+
+def category_counts(masks: np.ndarray) -> Dict[str, int]:
+    return {key: int(np.count_nonzero(masks & np.uint32(1 << bit))) for bit, key in enumerate(CATEGORY_KEYS)}
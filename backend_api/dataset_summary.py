@@ -0,0 +1,135 @@
+import hashlib
+import io
+import os
+from typing import Dict, Iterable, Optional, Tuple
+import pandas as pd
+import pyarrow.dataset as ds
+from ods import TRENDING_CSV, TRENDING_PARQUET
+
+SUMMARY_COLUMNS = ['id', 'country_code', 'collection_date']
+# Bytes before the previous end of the CSV that must be unchanged for an append to be assumed
+CSV_TAIL_BYTES = 4096
+
+
+class DatasetSummary:
+    """
+    Whole-dataset figures for the trending ODS (distinct videos and countries, row count, date span).
+
+    Built once from the full table, then extended with only the rows that later pipeline runs
+    appended: new Parquet partition files, or bytes added to the end of the CSV export. Each
+    extension returns a new summary so the one held by an older snapshot never changes.
+    """
+
+    def __init__(self, video_ids: set, countries: set, data_points: int,
+                 earliest: Optional[pd.Timestamp], latest: Optional[pd.Timestamp],
+                 sources: Dict[str, Tuple[int, int]], csv_tail_hash: Optional[str] = None):
+        self.video_ids = video_ids
+        self.countries = countries
+        self.data_points = data_points
+        self.earliest = earliest
+        self.latest = latest
+        self.sources = sources
+        self.csv_tail_hash = csv_tail_hash
+
+    @property
+    def total_videos(self) -> int:
+        return len(self.video_ids)
+
+    @property
+    def country_count(self) -> int:
+        return len(self.countries)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sources: Dict[str, Tuple[int, int]],
+                   csv_tail_hash: Optional[str] = None) -> "DatasetSummary":
+        empty = cls(set(), set(), 0, None, None, sources, csv_tail_hash)
+        return empty.extend(df, sources, csv_tail_hash)
+
+    def extend(self, df: pd.DataFrame, sources: Dict[str, Tuple[int, int]],
+               csv_tail_hash: Optional[str] = None) -> "DatasetSummary":
+        dates = pd.to_datetime(df['collection_date'])
+        earliest = min((d for d in (self.earliest, dates.min()) if pd.notna(d)), default=None)
+        latest = max((d for d in (self.latest, dates.max()) if pd.notna(d)), default=None)
+        return DatasetSummary(
+            self.video_ids | set(df['id'].dropna().astype(str)),
+            self.countries | set(df['country_code'].dropna().astype(str)),
+            self.data_points + len(df),
+            earliest,
+            latest,
+            sources,
+            csv_tail_hash,
+        )
+
+    def date_range(self, fallback: str = 'Feb 2025 - Dec 2025') -> str:
+        if self.earliest is None or self.latest is None:
+            return fallback
+        earliest_str = self.earliest.strftime('%b %Y')
+        latest_str = self.latest.strftime('%b %Y')
+        return latest_str if earliest_str == latest_str else f'{earliest_str} - {latest_str}'
+
+
+def _file_state(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _tail_hash(path: str, end: int) -> str:
+    with open(path, "rb") as f:
+        start = max(0, end - CSV_TAIL_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+def _parquet_sources(root: str) -> Dict[str, Tuple[int, int]]:
+    sources = {}
+    for directory, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(".parquet"):
+                path = os.path.join(directory, name)
+                sources[path] = _file_state(path)
+    return sources
+
+
+def _read_parquet_files(root: str, paths: Iterable[str]) -> pd.DataFrame:
+    dataset = ds.dataset(sorted(paths), format="parquet", partitioning="hive", partition_base_dir=root)
+    return dataset.to_table(columns=SUMMARY_COLUMNS).to_pandas()
+
+
+def _read_csv_range(path: str, start: int) -> pd.DataFrame:
+    """Reads the rows stored from byte ``start`` on, using the header of the file."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        appended = f.read()
+    return pd.read_csv(io.BytesIO(header + appended), usecols=SUMMARY_COLUMNS)
+
+
+def load_dataset_summary(previous: Optional[DatasetSummary] = None) -> DatasetSummary:
+    """
+    Summarises the trending ODS, reading only what was appended since ``previous`` when possible.
+
+    Any other change (a rewritten or deleted partition, a CSV that was rewritten rather than
+    appended to) falls back to summarising the whole table.
+    """
+    if os.path.isdir(TRENDING_PARQUET):
+        sources = _parquet_sources(TRENDING_PARQUET)
+        if previous is not None and all(sources.get(path) == state for path, state in previous.sources.items()):
+            added = [path for path in sources if path not in previous.sources]
+            if not added:
+                return previous
+            return previous.extend(_read_parquet_files(TRENDING_PARQUET, added), sources)
+        if not sources:
+            return DatasetSummary.from_frame(pd.DataFrame(columns=SUMMARY_COLUMNS), sources)
+        return DatasetSummary.from_frame(_read_parquet_files(TRENDING_PARQUET, sources), sources)
+
+    size, mtime = _file_state(TRENDING_CSV)
+    sources = {TRENDING_CSV: (size, mtime)}
+    tail_hash = _tail_hash(TRENDING_CSV, size)
+    previous_state = previous.sources.get(TRENDING_CSV) if previous is not None else None
+    if previous_state is not None and previous.csv_tail_hash is not None:
+        previous_size = previous_state[0]
+        if previous_state == (size, mtime):
+            return previous
+        if size > previous_size and _tail_hash(TRENDING_CSV, previous_size) == previous.csv_tail_hash:
+            return previous.extend(_read_csv_range(TRENDING_CSV, previous_size), sources, tail_hash)
+    return DatasetSummary.from_frame(pd.read_csv(TRENDING_CSV, usecols=SUMMARY_COLUMNS), sources, tail_hash)
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ViewHistoryIndex:
+    """
+    Daily view counts of every video in contiguous, day-sorted arrays.
+
+    ``offsets`` maps video id -> (start, length) into ``days``/``views``; looking a video up is a
+    dict access plus a zero-copy slice instead of a DataFrame filter.
+    """
+
+    def __init__(self, days: np.ndarray, views: np.ndarray, offsets: Dict[str, Tuple[int, int]]):
+        self.days = days
+        self.views = views
+        self.offsets = offsets
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ViewHistoryIndex":
+        """Builds the index from stats ODS rows (``video_id``, ``collection_day``, ``view_count``)."""
+        if df.empty:
+            return cls(np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.int64), {})
+
+        history = pd.DataFrame({
+            'video_id': df['video_id'].astype(str),
+            'day': pd.to_datetime(df['collection_day']),
+            'views': pd.to_numeric(df['view_count'], errors='coerce'),
+        }).dropna(subset=['views'])
+        # Older daily files stored one row per (video, country); keep one observation per day
+        history = (history.groupby(['video_id', 'day'], sort=True, as_index=False)['views'].max())
+
+        ids = history['video_id'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.array([], dtype=np.int64)
+        lengths = np.diff(np.r_[starts, len(ids)])
+        offsets = {ids[start]: (int(start), int(length)) for start, length in zip(starts, lengths)}
+        return cls(history['day'].to_numpy(), history['views'].to_numpy(dtype=np.int64), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self.offsets
+
+    def get(self, video_id: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Returns zero-copy (days, views) views for one video, or None if it has no history."""
+        span = self.offsets.get(video_id)
+        if span is None:
+            return None
+        start, length = span
+        return self.days[start:start + length], self.views[start:start + length]
+
+    def timeline(self, video_id: str) -> Optional[Dict[str, list]]:
+        """The API's ``timestamps``/``views`` lists for one video, or None if it has no history."""
+        history = self.get(video_id)
+        if history is None:
+            return None
+        days, views = history
+        return {
+            "timestamps": np.datetime_as_string(days, unit='D').tolist(),
+            "views": views.tolist(),
+        }
+
+    def history_frame(self, video_ids: Iterable[str]) -> pd.DataFrame:
+        """Long ``video_id``/``timestamp``/``views`` frame for the given ids, as the batch scorer expects."""
+        spans = [(video_id, self.offsets[video_id]) for video_id in dict.fromkeys(video_ids) if video_id in self.offsets]
+        if not spans:
+            return pd.DataFrame({'video_id': [], 'timestamp': [], 'views': []})
+
+        lengths = np.array([length for _, (_, length) in spans])
+        starts = np.array([start for _, (start, _) in spans])
+        positions = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+        return pd.DataFrame({
+            'video_id': np.repeat([video_id for video_id, _ in spans], lengths),
+            'timestamp': self.days[positions],
+            'views': self.views[positions],
+        })
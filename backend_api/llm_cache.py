@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from ods import BASE_DIR
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "db/cache/llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def completion_key(method: str, model: str, messages: List[Dict[str, str]], temperature: float,
+                   **params: Any) -> str:
+    """Content address of a completion request: identical inputs always map to the same key."""
+    payload = json.dumps({
+        "method": method,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "params": params,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of LLM completions keyed by ``completion_key``.
+
+    Entries expire ``ttl_seconds`` after they were written; beyond ``max_entries`` the least
+    recently read ones are evicted. Callers ``record`` each request as a hit or miss; the counters
+    and the tokens hits saved cover the life of this process.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS completions_last_access ON completions (last_access)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns ``{'content', 'total_tokens'}`` for a live entry, or None on a miss."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content, total_tokens, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self.conn.commit()
+                return None
+
+            self.conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            return {"content": row[0], "total_tokens": row[1]}
+
+    def record(self, hit: bool, tokens_saved: int = 0) -> None:
+        """Counts one request: a hit was answered without an upstream call and saved ``tokens_saved``."""
+        with self.lock:
+            if hit:
+                self.hits += 1
+                self.tokens_saved += tokens_saved
+            else:
+                self.misses += 1
+
+    def put(self, key: str, method: str, model: str, content: str, total_tokens: int) -> None:
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, method, model, content, total_tokens, now, now),
+            )
+            self.conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.conn.execute("""
+                DELETE FROM completions WHERE key IN (
+                    SELECT key FROM completions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,66 @@
+import os
+from typing import List, Optional
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRENDING_CSV = os.path.join(BASE_DIR, "db/ods/trending_videos.csv")
+VIDEO_STATS_CSV = os.path.join(BASE_DIR, "db/ods/merged_video_stats.csv")
+TRENDING_PARQUET = os.path.join(BASE_DIR, "db/ods/trending_videos")
+VIDEO_STATS_PARQUET = os.path.join(BASE_DIR, "db/ods/video_stats")
+VIDEO_INDEX_PATH = os.path.join(BASE_DIR, "db/ods/video_index.arrow")
+
+
+def _read_ods(parquet_root: str, csv_path: str, columns: Optional[List[str]] = None,
+              filters: Optional[list] = None) -> pd.DataFrame:
+    """Reads an ODS table from the Parquet dataset when present, falling back to the CSV export."""
+    if os.path.isdir(parquet_root):
+        df = pd.read_parquet(parquet_root, engine="pyarrow", columns=columns, filters=filters)
+        for column in df.columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(object)
+        return df
+
+    df = pd.read_csv(csv_path, usecols=columns)
+    for column, op, value in filters or []:
+        if op == ">=":
+            df = df[df[column] >= value]
+        elif op == "in":
+            df = df[df[column].isin(value)]
+        else:
+            raise ValueError(f"Unsupported filter operator for the CSV fallback: {op!r}")
+    return df
+
+
+def read_trending_frame(columns: Optional[List[str]] = None, filters: Optional[list] = None) -> pd.DataFrame:
+    return _read_ods(TRENDING_PARQUET, TRENDING_CSV, columns, filters)
+
+
+def read_stats_frame(columns: Optional[List[str]] = None, filters: Optional[list] = None) -> pd.DataFrame:
+    return _read_ods(VIDEO_STATS_PARQUET, VIDEO_STATS_CSV, columns, filters)
+
+
+def source_signature(parquet_root: str, csv_path: str) -> str:
+    """
+    Cheap fingerprint of an ODS table (file count, total size, newest mtime) without reading it.
+
+    Used to tell whether artifacts derived from the table are still current.
+    """
+    paths = []
+    if os.path.isdir(parquet_root):
+        for directory, _, filenames in os.walk(parquet_root):
+            paths.extend(os.path.join(directory, name) for name in filenames if name.endswith(".parquet"))
+    elif os.path.exists(csv_path):
+        paths.append(csv_path)
+
+    stats = [os.stat(path) for path in paths]
+    size = sum(stat.st_size for stat in stats)
+    mtime = max((stat.st_mtime_ns for stat in stats), default=0)
+    return f"{len(stats)}-{size}-{mtime}"
+
+
+def trending_signature() -> str:
+    return source_signature(TRENDING_PARQUET, TRENDING_CSV)
+
+
+def stats_signature() -> str:
+    return source_signature(VIDEO_STATS_PARQUET, VIDEO_STATS_CSV)
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from ai_analyzer import AI_BATCH_SIZE, AI_MAX_CONCURRENCY, AIVideoAnalyzer
+from ai_store import AI_STORE_PATH, PrecomputedAIStore
+from ods import read_trending_frame
+from video_index import load_history_index, load_video_index
+from video_records import build_video_records
+
+# Result field holding the text of each kind
+KIND_FIELDS = {"analysis": "analysis", "explanation": "explanation"}
+
+
+async def pregenerate(analyzer: AIVideoAnalyzer, store: PrecomputedAIStore, videos: List[Dict],
+                      kinds: List[str], concurrency: int = AI_MAX_CONCURRENCY,
+                      token_budget: Optional[int] = None, batch_size: int = AI_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Generates the AI texts of ``kinds`` for ``videos`` that the store has no current entry for.
+
+    Analyses go out in batches of ``batch_size`` videos, explanations one video per request, from
+    ``concurrency`` workers; the analyzer's own ``max_concurrency`` still caps the upstream calls.
+    Once ``token_budget`` tokens have been spent no new request is started, and the videos left
+    over are reported as skipped.
+    """
+    stats = {"current": 0, "generated": 0, "failed": 0, "skipped_budget": 0, "tokens_used": 0}
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for kind in kinds:
+        pending = [video for video in videos
+                   if store.get(video['videoId'], kind, analyzer.video_request_key(kind, video)) is None]
+        stats["current"] += len(videos) - len(pending)
+        size = max(batch_size, 1) if kind == "analysis" else 1
+        for i in range(0, len(pending), size):
+            queue.put_nowait((kind, pending[i:i + size]))
+
+    async def worker() -> None:
+        while not queue.empty():
+            kind, chunk = queue.get_nowait()
+            if token_budget is not None and stats["tokens_used"] >= token_budget:
+                stats["skipped_budget"] += len(chunk)
+                continue
+
+            if kind == "analysis":
+                results = await analyzer.analyze_videos_batch_async(chunk, batch_size=len(chunk))
+            else:
+                results = {chunk[0]['videoId']: await analyzer.explain_virality_score_async(chunk[0])}
+
+            for video in chunk:
+                result = results.get(video['videoId'], {})
+                stats["tokens_used"] += result.get('tokens_used', 0)
+                if not result.get('success'):
+                    stats["failed"] += 1
+                    continue
+                store.put(video['videoId'], kind, analyzer.video_request_key(kind, video),
+                          result[KIND_FIELDS[kind]], analyzer.model, result.get('tokens_used', 0))
+                stats["generated"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    return stats
+
+
+def load_served_videos(top_k: int) -> List[Dict]:
+    """
+    The API records of the ``top_k`` most recently trending videos, built the way the API builds its
+    video list so their request keys match the ones the API looks up.
+    """
+    video_index = load_video_index()
+    if video_index is not None:
+        return video_index.records(limit=top_k)
+    df = read_trending_frame()
+    df['collection_date'] = pd.to_datetime(df['collection_date'])
+    return build_video_records(df, top_k=top_k, history_index=load_history_index())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-generate AI analyses and score explanations for the videos the API serves."
+    )
+    parser.add_argument("--top-k", type=int, default=100,
+                        help="Most recently trending videos to cover; the API serves VIDEOS_TOP_K of them (default: 100).")
+    parser.add_argument("--kinds", nargs="+", choices=list(KIND_FIELDS), default=list(KIND_FIELDS),
+                        help="AI texts to generate (default: all).")
+    parser.add_argument("--concurrency", type=int, default=AI_MAX_CONCURRENCY,
+                        help=f"Maximum concurrent LLM requests (default: {AI_MAX_CONCURRENCY}).")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Stop starting new requests once this many tokens were spent (default: no limit).")
+    parser.add_argument("--batch-size", type=int, default=AI_BATCH_SIZE,
+                        help=f"Videos per batched analysis request (default: {AI_BATCH_SIZE}).")
+    args = parser.parse_args()
+
+    videos = load_served_videos(args.top_k)
+    analyzer = AIVideoAnalyzer(max_concurrency=args.concurrency)
+    stats = asyncio.run(pregenerate(analyzer, PrecomputedAIStore(), videos, args.kinds,
+                                    concurrency=args.concurrency, token_budget=args.token_budget,
+                                    batch_size=args.batch_size))
+    print(f"Pre-generated {stats['generated']} AI texts for {len(videos)} videos into {AI_STORE_PATH} "
+          f"({stats['current']} already current, {stats['failed']} failed, "
+          f"{stats['skipped_budget']} skipped by the token budget, {stats['tokens_used']:,} tokens)")
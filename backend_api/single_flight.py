@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in flight block until it
+    finishes and receive the same result (or exception). Once it finishes the key is forgotten, so
+    later calls run again. Thread-safe, so it works across FastAPI's threadpool workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns ``(result, shared)``; ``shared`` is True for callers that waited on another's call."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """
+    ``SingleFlight`` for coroutines running on one event loop.
+
+    The shared call runs as its own task, so a waiter being cancelled (its client disconnected)
+    does not cancel it for the others; it is cancelled only once every waiter has gone.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[Hashable, asyncio.Future] = {}
+        self.waiters: Dict[Hashable, int] = {}
+        self.shared = 0
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+            del self.waiters[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns ``(result, shared)``; ``shared`` is True for callers that joined another's call."""
+        task = self.tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self.tasks[key] = task
+            self.waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        self.waiters[key] += 1
+
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done():
+                self.waiters[key] -= 1
+                if self.waiters[key] == 0:
+                    task.cancel()
+            raise
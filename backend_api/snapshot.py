@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache holding at most ``maxsize`` entries."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class DataSnapshot:
+    """
+    Everything the API serves from one version of the ODS files.
+
+    A snapshot is fully built before it is published and never mutated afterwards, so a request
+    that grabbed it keeps a consistent view even while a newer one is being built.
+    """
+
+    def __init__(self, signature: str, cache_size: int = 16, **data: Any):
+        self.signature = signature
+        self.version = 0
+        self.built_at: Optional[str] = None
+        self.build_seconds = 0.0
+        self.cache = LRUCache(cache_size)
+        self.derived_values: Dict[str, Any] = {}
+        # One lock per name, so a slow factory only holds up requests for that same value; a
+        # factory may itself ask for another derived value of the same snapshot
+        self.derived_locks: Dict[str, threading.Lock] = {}
+        self.derived_locks_lock = threading.Lock()
+        for name, value in data.items():
+            setattr(self, name, value)
+
+    def derived(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Returns a value computed from this snapshot's data, calling ``factory`` only the first time.
+
+        Derived values die with the snapshot, so they never outlive the files they were built from.
+        """
+        if name not in self.derived_values:
+            with self.derived_locks_lock:
+                lock = self.derived_locks.setdefault(name, threading.Lock())
+            with lock:
+                if name not in self.derived_values:
+                    self.derived_values[name] = factory()
+        return self.derived_values[name]
+
+
+class SnapshotManager:
+    """
+    Rebuilds the data snapshot in the background when the watched files change.
+
+    A daemon thread polls ``signature_fn`` (a cheap fingerprint of the ODS files' sizes and mtimes)
+    every ``poll_seconds``; when it changes, ``builder`` produces a new snapshot from the previous
+    one and it is published with a single reference assignment. If the very first build fails,
+    the snapshot made by ``empty`` is published instead and only the watcher retries the build.
+    """
+
+    def __init__(self, builder: Callable[[str, Optional[DataSnapshot]], DataSnapshot],
+                 signature_fn: Callable[[], str], poll_seconds: float = 30.0,
+                 empty: Optional[Callable[[], DataSnapshot]] = None):
+        self.builder = builder
+        self.signature_fn = signature_fn
+        self.poll_seconds = poll_seconds
+        self.empty = empty
+        self.current: Optional[DataSnapshot] = None
+        self.last_error: Optional[str] = None
+        self.build_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Builds and publishes a new snapshot if the files changed; returns True if one was swapped in."""
+        with self.build_lock:
+            signature = self.signature_fn()
+            previous = self.current
+            if not force and previous is not None and previous.signature == signature:
+                return False
+
+            started = time.monotonic()
+            try:
+                snapshot = self.builder(signature, previous)
+            except Exception as e:
+                self.last_error = f"{datetime.now().isoformat()}: {e}"
+                print(f"[Snapshot] Rebuild failed, keeping version {previous.version if previous else 0}: {e}")
+                if previous is None and self.empty is not None:
+                    # Its signature never matches real files, so every poll retries the build
+                    self.current = self.empty()
+                    self.current.built_at = datetime.now().isoformat()
+                return False
+
+            snapshot.version = (previous.version if previous else 0) + 1
+            snapshot.built_at = datetime.now().isoformat()
+            snapshot.build_seconds = round(time.monotonic() - started, 3)
+            self.current = snapshot
+            self.last_error = None
+            print(f"[Snapshot] Version {snapshot.version} published after {snapshot.build_seconds}s")
+            return True
+
+    def get(self) -> Optional[DataSnapshot]:
+        """
+        Returns the published snapshot, building the first one synchronously if needed.
+
+        A failed build is only retried by the watcher, never by requests. Until one succeeds this
+        returns the ``empty`` snapshot, or None when there is no ``empty`` factory.
+        """
+        if self.current is None and self.last_error is None:
+            self.refresh()
+        return self.current
+
+    def _watch(self) -> None:
+        while not self.stop_event.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[Snapshot] Watcher error: {e}")
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._watch, name="ods-snapshot-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.thread = None
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self.current
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "built_at": snapshot.built_at if snapshot else None,
+            "build_seconds": snapshot.build_seconds if snapshot else None,
+            "signature": snapshot.signature if snapshot else None,
+            "poll_seconds": self.poll_seconds,
+            "cache": {
+                "entries": len(snapshot.cache) if snapshot else 0,
+                "hits": snapshot.cache.hits if snapshot else 0,
+                "misses": snapshot.cache.misses if snapshot else 0,
+            },
+            "last_error": self.last_error,
+        }
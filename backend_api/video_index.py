@@ -0,0 +1,118 @@
+import os
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from categories import CATEGORY_MATCHER, CATEGORY_SIGNATURE
+from history_index import ViewHistoryIndex
+from ods import VIDEO_INDEX_PATH, read_stats_frame, read_trending_frame, stats_signature, trending_signature
+from video_records import build_video_records
+
+HISTORY_COLUMNS = ['video_id', 'collection_day', 'view_count']
+
+
+def load_history_index() -> ViewHistoryIndex:
+    """Per-video view history from the stats ODS; empty when no stats have been merged yet."""
+    try:
+        return ViewHistoryIndex.from_frame(read_stats_frame(columns=HISTORY_COLUMNS))
+    except (OSError, ValueError) as e:
+        print(f"[Backend] No view history available: {e}")
+        return ViewHistoryIndex.from_frame(pd.DataFrame(columns=HISTORY_COLUMNS))
+
+
+def current_signature() -> str:
+    """The index depends on both ODS tables: trending rows and the view history used for growth."""
+    return f"{trending_signature()}|{stats_signature()}"
+
+INTERNAL_COLUMNS = ["collectionDates", "categoryMask"]
+
+
+def build_video_index(path: str = VIDEO_INDEX_PATH, top_k: Optional[int] = None) -> int:
+    """
+    Materialises the API video records (virality scores, collection-date lists, category masks)
+    into an uncompressed Arrow IPC file that the backend memory-maps at startup.
+
+    Run after ``trending_db.py``. The ODS signatures are stored in the file metadata so a stale
+    index is ignored.
+    """
+    signature = current_signature()
+    df = read_trending_frame()
+    df['collection_date'] = pd.to_datetime(df['collection_date'])
+    records = build_video_records(df, top_k=top_k, include_collection_dates=True,
+                                  history_index=load_history_index())
+
+    masks = CATEGORY_MATCHER.classify_all(records)
+    table = pa.Table.from_pylist(records).append_column("categoryMask", pa.array(masks, type=pa.uint32()))
+    table = table.replace_schema_metadata({
+        "source_signature": signature,
+        "category_signature": CATEGORY_SIGNATURE,
+        "built_at": datetime.now().isoformat(),
+    })
+
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return table.num_rows
+
+
+class VideoIndex:
+    """A memory-mapped, read-only view of the video index; rows are ordered by trending recency."""
+
+    def __init__(self, path: str = VIDEO_INDEX_PATH):
+        self.path = path
+        self.source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self.source).read_all()
+        metadata = self.table.schema.metadata or {}
+        self.source_signature = metadata.get(b"source_signature", b"").decode()
+        self.built_at = metadata.get(b"built_at", b"").decode()
+        self.category_signature = metadata.get(b"category_signature", b"").decode()
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def is_current(self) -> bool:
+        return self.source_signature == current_signature()
+
+    def records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Decodes the first ``limit`` API records; only those rows are touched in the mapping."""
+        table = self.table if limit is None else self.table.slice(0, limit)
+        columns = [name for name in table.column_names if name not in INTERNAL_COLUMNS]
+        return table.select(columns).to_pylist()
+
+    def category_masks(self, limit: Optional[int] = None) -> Optional[np.ndarray]:
+        """Stored category masks of the first ``limit`` rows, or None if the categories changed since the build."""
+        if self.category_signature != CATEGORY_SIGNATURE or "categoryMask" not in self.table.column_names:
+            return None
+        column = self.table.column("categoryMask")
+        if limit is not None:
+            column = column.slice(0, limit)
+        return column.to_numpy()
+
+
+def load_video_index(path: str = VIDEO_INDEX_PATH) -> Optional[VideoIndex]:
+    """Returns the memory-mapped index, or None when it is missing or older than the trending ODS."""
+    if not os.path.exists(path):
+        return None
+    try:
+        index = VideoIndex(path)
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"[Backend] Could not open video index {path}: {e}")
+        return None
+    if not index.is_current():
+        print(f"[Backend] Video index {path} is stale; falling back to the trending ODS")
+        return None
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed video index served by the API.")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Number of most recently trending videos to index (default: all).")
+    args = parser.parse_args()
+
+    rows = build_video_index(top_k=args.top_k)
+    print(f"Video index with {rows} videos saved to {VIDEO_INDEX_PATH}")
@@ -0,0 +1,97 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from categories import CATEGORY_MATCHER, category_counts
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Stands in for a missing or unparseable publish time; earlier than any cutoff, so never selected
+NO_PUBLISH_TIME = np.iinfo(np.int64).min
+
+
+def published_epoch(published_at: Any) -> Optional[int]:
+    """Unix seconds of an ISO ``publishedAt`` value (naive times are UTC), or None if it cannot be parsed."""
+    if not published_at or not isinstance(published_at, str):
+        return None
+    try:
+        if published_at.endswith('Z'):
+            published = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+        else:
+            published = datetime.fromisoformat(published_at)
+    except ValueError:
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return int(published.timestamp())
+
+
+def encode_json(value: Any) -> bytes:
+    """Compact UTF-8 JSON, as JSONResponse would render it; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class VideoList:
+    """
+    A served list of API video records together with per-record data derived from them.
+
+    Category masks come from the video index when it carries current ones, and are otherwise
+    classified on first use; either way only once per list. The same goes for each record's
+    encoded JSON, so a page body is a join of ready-made fragments. Publish times are kept as an epoch
+    array plus the order that sorts it, so a "published since" filter is a binary search.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], category_masks: Optional[np.ndarray] = None):
+        self.records = records
+        self._category_masks = category_masks
+        self._encoded: Optional[List[bytes]] = None
+        epochs = [record['publishedEpoch'] if 'publishedEpoch' in record else published_epoch(record.get('publishedAt'))
+                  for record in records]
+        self.published_epochs = np.array([NO_PUBLISH_TIME if epoch is None else epoch for epoch in epochs],
+                                         dtype=np.int64)
+        self.by_published = np.argsort(self.published_epochs, kind='stable')
+        self.sorted_published = self.published_epochs[self.by_published]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def category_masks(self) -> np.ndarray:
+        if self._category_masks is None:
+            self._category_masks = CATEGORY_MATCHER.classify_all(self.records)
+        return self._category_masks
+
+    def select(self, category: Optional[str] = None, published_since: Optional[float] = None) -> np.ndarray:
+        """
+        Positions, in list order, of the records in ``category`` (ignored when None or unknown)
+        that were published at or after the epoch ``published_since``.
+        """
+        selected = np.ones(len(self.records), dtype=bool)
+        bit = CATEGORY_MATCHER.bit(category) if category is not None else None
+        if bit is not None:
+            selected &= (self.category_masks & np.uint32(bit)) != 0
+        if published_since is not None:
+            start = int(np.searchsorted(self.sorted_published, published_since, side='left'))
+            published = np.zeros(len(self.records), dtype=bool)
+            published[self.by_published[start:]] = True
+            selected &= published
+        return np.flatnonzero(selected)
+
+    @property
+    def encoded(self) -> List[bytes]:
+        if self._encoded is None:
+            self._encoded = [encode_json(record) for record in self.records]
+        return self._encoded
+
+    def page_body(self, positions: np.ndarray) -> bytes:
+        """JSON array body of the records at ``positions``."""
+        encoded = self.encoded
+        return b"[" + b",".join(encoded[i] for i in positions) + b"]"
+
+    def category_counts(self) -> Dict[str, int]:
+        return category_counts(self.category_masks)
@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from history_index import ViewHistoryIndex
+from video_list import published_epoch
+from virality_calculator import ViralityCalculator
+
+
+def collection_dates_index(df: pd.DataFrame, video_ids: Optional[pd.Series] = None) -> pd.Series:
+    """
+    Maps video id -> sorted list of distinct ISO collection dates, built in one grouped pass.
+
+    Restricting to ``video_ids`` first keeps the pass proportional to the rows of those videos.
+    """
+    if video_ids is not None:
+        df = df[df['id'].isin(video_ids)]
+    spans = df[['id', 'collection_date']].drop_duplicates().sort_values('collection_date', kind='mergesort')
+    dates = spans['collection_date'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return dates.groupby(spans['id'], sort=False).agg(list)
+
+
+def build_video_records(df: pd.DataFrame, top_k: Optional[int] = 100, include_collection_dates: bool = False,
+                        history_index: Optional[ViewHistoryIndex] = None) -> List[Dict[str, Any]]:
+    """
+    Turns trending ODS rows into the API video records for the ``top_k`` most recently trending
+    videos (all of them when ``top_k`` is None). With a ``history_index`` growth velocity is
+    computed from each video's stored daily views instead of the 50.0 default.
+
+    ``df`` must have ``collection_date`` parsed to datetimes. With ``include_collection_dates`` each
+    record also carries the sorted ``collectionDates`` the score's trending duration was based on.
+    """
+    df_grouped = df.sort_values('collection_date', ascending=False).groupby('id').first().reset_index()
+    
+    df_grouped['viewCount'] = pd.to_numeric(df_grouped['viewCount'], errors='coerce').fillna(0)
+    
+    df_top = df_grouped.sort_values('collection_date', ascending=False)
+    if top_k is not None:
+        df_top = df_top.head(top_k)
+    
+    print(f"[Backend] Loading TOP {len(df_top):,} NEWEST TRENDING videos (from {len(df_grouped):,} unique videos)...")
+    if len(df_top) > 0:
+        print(f"[Backend] Most recent collection: {df_top.iloc[0]['collection_date']}")
+        print(f"[Backend] #1 trending: {df_top.iloc[0]['title']} - {df_top.iloc[0]['viewCount']:,.0f} views")
+
+    top_rows = df[df['id'].isin(df_top['id'])]
+    spans = top_rows.groupby('id')['collection_date'].agg(['min', 'max'])
+    scoring_input = pd.DataFrame({
+        'video_id': df_top['id'].to_numpy(),
+        'views': pd.to_numeric(df_top['viewCount'], errors='coerce').fillna(0).to_numpy(dtype='int64'),
+        'likes': pd.to_numeric(df_top['likeCount'], errors='coerce').fillna(0).to_numpy(dtype='int64'),
+        'comments': pd.to_numeric(df_top['commentCount'], errors='coerce').fillna(0).to_numpy(dtype='int64'),
+        'first_collection': df_top['id'].map(spans['min']).to_numpy(),
+        'last_collection': df_top['id'].map(spans['max']).to_numpy(),
+    })
+    view_history = history_index.history_frame(scoring_input['video_id']) if history_index is not None else None
+    scores = ViralityCalculator.calculate_virality_scores(scoring_input, view_history)
+    dates_by_id = collection_dates_index(top_rows) if include_collection_dates else None
+    
+    videos = []
+    for row, inputs, virality_result in zip(df_top.to_dict('records'), scoring_input.to_dict('records'),
+                                            scores.to_dict('records')):
+        published_at = row['publishedAt'].strftime('%Y-%m-%dT%H:%M:%SZ') if isinstance(row.get('publishedAt'), pd.Timestamp) else str(row.get('publishedAt', ''))
+        video = {
+            "videoId": str(row['id']),
+            "title": str(row['title']),
+            "channelTitle": str(row.get('channelTitle', '')),
+            "thumbnailUrl": str(row.get('thumbnail_url', '')),
+            "description": str(row.get('description', '')),
+            "categoryId": str(row.get('categoryId', '')).strip(),
+            "tags": row.get('tags'),
+            "views": inputs['views'],
+            "likes": inputs['likes'],
+            "comments": inputs['comments'],
+            "country": str(row.get('country_code', '')),
+            "publishedAt": published_at,
+            "publishedEpoch": published_epoch(published_at),
+            "viralityScore": virality_result['virality_score'],
+            "growthVelocity": virality_result['growth_velocity'],
+            "engagementRate": virality_result['engagement_rate'],
+            "trendingDuration": virality_result['trending_duration'],
+            "audienceReach": virality_result['audience_reach']
+        }
+        if include_collection_dates:
+            video["collectionDates"] = dates_by_id.get(row['id'], [])
+        videos.append(video)
+
+    return videos
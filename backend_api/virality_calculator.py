@@ -1,6 +1,6 @@
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
@@ -160,6 +160,187 @@ class ViralityCalculator:
             'audience_reach': audience_reach,
         }
 
+    # ------------------------------------------------------------------
+    # Batch (vectorised) scoring. Every formula mirrors the scalar methods
+    # above operation by operation so both paths return identical values.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _round_like_python(values: np.ndarray) -> np.ndarray:
+        """``round(x, 2)`` on Python floats is correctly rounded; ``np.round`` only differs near ties."""
+        rounded = np.round(values, 2)
+        scaled = values * 100
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        for i in np.flatnonzero(near_tie):
+            rounded[i] = round(float(values[i]), 2)
+        return rounded
+
+    @classmethod
+    def calculate_growth_velocities(
+        cls,
+        video_ids: np.ndarray,
+        view_history: Optional[pd.DataFrame] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Growth velocity for every id in ``video_ids`` from a long ``view_history`` frame with
+        ``video_id``, ``timestamp`` and ``views`` columns.
+
+        Returns the scores and a mask of the videos whose scalar score would be a NumPy float (real
+        history, not clipped to 0/100), which decides how their composite score is rounded.
+        """
+        n = len(video_ids)
+        scores = np.full(n, 50.0)
+        numpy_typed = np.zeros(n, dtype=bool)
+        if view_history is None or view_history.empty or n == 0:
+            return scores, numpy_typed
+
+        history = view_history[view_history['video_id'].isin(video_ids)]
+        history = history.sort_values(['video_id', 'timestamp'], kind='mergesort')
+        ids = history['video_id'].to_numpy()
+        views = history['views'].to_numpy(dtype=np.float64)
+
+        same_video = np.zeros(len(ids), dtype=bool)
+        same_video[1:] = ids[1:] == ids[:-1]
+        prev_views = np.empty_like(views)
+        prev_views[1:] = views[:-1]
+        valid = same_video.copy()
+        valid[1:] &= prev_views[1:] > 0
+
+        rate_ids = ids[valid]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = ((views[valid] - prev_views[valid]) / prev_views[valid]) * 100
+        if len(rates) == 0:
+            return scores, numpy_typed
+
+        # Rates of one video are contiguous; group them by count so each bucket is one 2-D mean,
+        # which sums in exactly the same order as np.mean over that video's list.
+        starts = np.flatnonzero(np.r_[True, rate_ids[1:] != rate_ids[:-1]])
+        counts = np.diff(np.r_[starts, len(rates)])
+        avg_growth = np.empty(len(starts))
+        recent_growth = np.empty(len(starts))
+        for count in np.unique(counts):
+            group = np.flatnonzero(counts == count)
+            block = rates[starts[group][:, None] + np.arange(count)]
+            avg_growth[group] = block.mean(axis=1)
+            recent_growth[group] = block[:, -3:].mean(axis=1) if count >= 3 else avg_growth[group]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            acceleration = recent_growth / (avg_growth + 1)
+            raw = 50 + (avg_growth * 2) + (acceleration * 10)
+        # min(100, max(0, raw)) including its NaN behaviour; clipped values are Python ints there
+        unclipped = (raw > 0) & (raw < 100)
+        clipped = np.where(raw > 0, raw, 0)
+        clipped = np.where(clipped < 100, clipped, 100)
+
+        group_of_video = pd.Index(rate_ids[starts]).get_indexer(video_ids)
+        scored = group_of_video >= 0
+        scores[scored] = np.round(clipped[group_of_video[scored]], 2)
+        numpy_typed[scored] = unclipped[group_of_video[scored]]
+        return scores, numpy_typed
+
+    @staticmethod
+    def calculate_engagement_rates(views: np.ndarray, likes: np.ndarray, comments: np.ndarray) -> np.ndarray:
+        views = np.asarray(views, dtype=np.int64)
+        engagements = np.asarray(likes, dtype=np.int64) + np.asarray(comments, dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = (engagements / views) * 100
+        score = np.select(
+            [rate < 3, rate < 6, rate < 10],
+            [(rate / 3) * 50, 50 + ((rate - 3) / 3) * 25, 75 + ((rate - 6) / 4) * 15],
+            90 + np.minimum(10, (rate - 10) / 2),
+        )
+        return ViralityCalculator._round_like_python(np.where(views == 0, 0.0, score))
+
+    @staticmethod
+    def calculate_trending_durations(first_dates: pd.Series, last_dates: pd.Series) -> np.ndarray:
+        """Vectorised ``calculate_trending_duration`` from each video's first and last collection date."""
+        first_dates = pd.to_datetime(first_dates, utc=True)
+        last_dates = pd.to_datetime(last_dates, utc=True)
+        has_dates = first_dates.notna().to_numpy()
+        days_trending = ((last_dates - first_dates).dt.days.fillna(0).to_numpy(dtype=np.int64)) + 1
+        score = np.select(
+            [days_trending < 7, days_trending < 14],
+            [30 + (days_trending / 7) * 30, 60 + ((days_trending - 7) / 7) * 20],
+            80 + np.minimum(20, ((days_trending - 14) / 30) * 20),
+        )
+        return ViralityCalculator._round_like_python(np.where(has_dates, score, 0.0))
+
+    @staticmethod
+    def calculate_audience_reaches(views: np.ndarray, subscribers: Optional[np.ndarray] = None,
+                                   channel_category: str = 'general') -> np.ndarray:
+        benchmark = {
+            'music': 0.15, 'gaming': 0.08, 'entertainment': 0.10,
+            'news': 0.05, 'education': 0.06, 'general': 0.07,
+        }.get(channel_category, 0.07)
+        views = np.asarray(views, dtype=np.int64)
+        if subscribers is None:
+            subscribers = np.zeros(len(views))
+        subscribers = np.nan_to_num(np.asarray(subscribers, dtype=np.float64), nan=0.0)
+        has_subscribers = subscribers > 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reach_ratio = views / subscribers
+            subscriber_score = (reach_ratio / benchmark) * 50
+            subscriber_score = np.where(
+                reach_ratio > 1.0, subscriber_score + np.minimum(30, (reach_ratio - 1.0) * 10), subscriber_score
+            )
+        views_score = np.select(
+            [views >= 1_000_000, views >= 100_000],
+            [80 + np.minimum(20, (views / 10_000_000) * 20), 60 + ((views - 100_000) / 900_000) * 20],
+            (views / 100_000) * 60,
+        )
+        score = np.minimum(100, np.where(has_subscribers, subscriber_score, views_score))
+        return ViralityCalculator._round_like_python(np.where(views == 0, 0.0, score))
+
+    @classmethod
+    def calculate_virality_scores(
+        cls,
+        videos: pd.DataFrame,
+        view_history: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Scores many videos at once; the batch counterpart of ``calculate_virality_score``.
+
+        ``videos`` has ``views``, ``likes``, ``comments`` and optionally ``subscribers``,
+        ``first_collection``/``last_collection`` (trending span) and ``video_id`` (required with
+        ``view_history``, a long frame of ``video_id``, ``timestamp``, ``views``). Returns one row per
+        video, aligned to ``videos.index``, with the same keys as the scalar result.
+        """
+        n = len(videos)
+        views = videos['views'].fillna(0).to_numpy(dtype=np.int64)
+        likes = videos['likes'].fillna(0).to_numpy(dtype=np.int64)
+        comments = videos['comments'].fillna(0).to_numpy(dtype=np.int64)
+        subscribers = videos['subscribers'].to_numpy(dtype=np.float64) if 'subscribers' in videos else None
+
+        if view_history is not None and 'video_id' in videos:
+            growth_velocity, numpy_typed = cls.calculate_growth_velocities(videos['video_id'].to_numpy(), view_history)
+        else:
+            growth_velocity, numpy_typed = np.full(n, 50.0), np.zeros(n, dtype=bool)
+
+        engagement_rate = cls.calculate_engagement_rates(views, likes, comments)
+        if 'first_collection' in videos and 'last_collection' in videos:
+            trending_duration = cls.calculate_trending_durations(videos['first_collection'], videos['last_collection'])
+        else:
+            trending_duration = np.zeros(n)
+        audience_reach = cls.calculate_audience_reaches(views, subscribers)
+
+        virality_score = (
+            growth_velocity * cls.WEIGHTS['growth_velocity'] +
+            engagement_rate * cls.WEIGHTS['engagement_rate'] +
+            trending_duration * cls.WEIGHTS['trending_duration'] +
+            audience_reach * cls.WEIGHTS['audience_reach']
+        )
+        # The scalar composite is a NumPy float (NumPy rounding) only when growth velocity was one
+        virality_score = np.where(numpy_typed, np.round(virality_score, 2), cls._round_like_python(virality_score))
+
+        return pd.DataFrame({
+            'virality_score': virality_score,
+            'growth_velocity': growth_velocity,
+            'engagement_rate': engagement_rate,
+            'trending_duration': trending_duration,
+            'audience_reach': audience_reach,
+        }, index=videos.index)
+
 
 def get_virality_level(score: float) -> str:
     if score >= 90:
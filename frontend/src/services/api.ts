@@ -1,4 +1,4 @@
-import type { Video, VideoHistory } from '../types';
+import type { CategoryCounts, Video, VideoHistory } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || '/data';
 const USE_SAMPLE_DATA = !import.meta.env.VITE_API_URL;
@@ -229,11 +229,10 @@ class ApiService {
         return filtered.slice(offset, offset + limit);
       }
 
-      const timestamp = Date.now();
+      // No cache-busting parameter: the backend answers unchanged pages with 304 via ETag
       const params = new URLSearchParams({
         limit: String(limit),
         offset: String(offset),
-        _t: String(timestamp),
       });
       if (category && category !== 'all') {
         params.append('category', category);
@@ -291,6 +290,40 @@ class ApiService {
     }
   }
 
+  async getCategoryCounts(): Promise<CategoryCounts> {
+    const countSample = async (): Promise<CategoryCounts> => {
+      const response = await fetch('/data/videos.json');
+      const data: Video[] = await response.json();
+      return {
+        total: data.length,
+        categories: Object.keys(CATEGORY_FILTERS).map((key) => ({
+          key,
+          count: this.filterVideosByCategory(data, key).length,
+        })),
+      };
+    };
+
+    try {
+      if (this.useSampleData) {
+        return await countSample();
+      }
+
+      const response = await fetch(`${this.baseUrl}/api/categories`);
+      if (!response.ok) {
+        throw new Error(`API error: ${response.status}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching category counts:', error);
+      try {
+        return await countSample();
+      } catch (fallbackError) {
+        console.error('Error loading fallback data:', fallbackError);
+        return { total: 0, categories: [] };
+      }
+    }
+  }
+
   private filterVideosByCategory(videos: Video[], category: string): Video[] {
     const normalized = (category || 'all').toLowerCase();
     if (normalized === 'all' || !CATEGORY_FILTERS[normalized]) {
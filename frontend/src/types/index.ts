@@ -23,6 +23,11 @@ export interface VideoHistory {
   views: number[];
 }
 
+export interface CategoryCounts {
+  total: number;
+  categories: { key: string; count: number }[];
+}
+
 export interface ApiResponse<T> {
   data: T;
   error?: string;
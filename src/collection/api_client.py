@@ -0,0 +1,37 @@
+import os
+import json
+import threading
+import httplib2
+from typing import Optional
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+_thread_local = threading.local()
+
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded", "dailyLimitExceeded"}
+DAILY_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+def build_youtube_client(api_key: str):
+    """Builds the YouTube Data API client. ``YOUTUBE_API_ENDPOINT`` points it at another server, e.g. a local fake."""
+    endpoint = os.getenv("YOUTUBE_API_ENDPOINT")
+    client_options = {"api_endpoint": endpoint} if endpoint else None
+    return build("youtube", "v3", developerKey=api_key, client_options=client_options)
+
+
+def thread_http() -> httplib2.Http:
+    """httplib2 connections are not thread-safe, so every worker thread executes requests on its own."""
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = httplib2.Http(timeout=30)
+    return _thread_local.http
+
+
+def rate_limit_reason(error: Exception) -> Optional[str]:
+    """Returns the API error reason if ``error`` is a 403/429 quota or rate-limit response."""
+    if not isinstance(error, HttpError) or error.resp.status not in (403, 429):
+        return None
+    try:
+        reason = json.loads(error.content)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        reason = "rateLimitExceeded" if error.resp.status == 429 else None
+    return reason if reason in RATE_LIMIT_REASONS else None
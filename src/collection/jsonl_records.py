@@ -0,0 +1,27 @@
+import json
+import os
+from typing import Any, Dict
+
+
+def read_jsonl(path: str, key: str, keep_key: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Reads an append-only JSON Lines file into ``{record[key]: record}``; later lines win.
+
+    Only JSON objects carrying a string ``key`` count as records. Anything else, such as a line
+    torn by an interrupted run (which may still parse as a number or a truncated object), is
+    skipped. With ``keep_key=False`` the key field is removed from the returned records.
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, mode="r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or not isinstance(entry.get(key), str):
+                continue
+            record_key = entry[key] if keep_key else entry.pop(key)
+            records[record_key] = entry
+    return records
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket used to pace YouTube Data API requests.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``; each request takes one
+    token and blocks until one is available, so concurrent workers share a single request budget.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until ``tokens`` are available and returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate: float) -> None:
+        """Changes the refill rate, e.g. to back off after quota errors."""
+        with self.lock:
+            self._refill()
+            self.rate = max(float(rate), 1e-3)
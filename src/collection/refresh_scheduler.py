@@ -0,0 +1,130 @@
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+IDS_PER_REQUEST = 50
+UNITS_PER_REQUEST = 1  # videos().list costs one quota unit per call
+
+
+class RefreshScheduler:
+    """
+    Decides which videos get their statistics refreshed within a daily quota budget.
+
+    Each video seen in the trending ODS is scored by how recently it trended, how fast its views
+    grew between the last two stats snapshots and how long ago it was last refreshed; the highest
+    scoring ids are packed into as many 50-id ``videos().list`` calls as the budget allows.
+    """
+
+    WEIGHTS = {
+        'recency': 0.45,
+        'growth': 0.35,
+        'staleness': 0.20,
+    }
+    RECENCY_HALF_LIFE_DAYS = 7
+    STALE_AFTER_DAYS = 7
+
+    def __init__(self, config_path: str, today: Optional[datetime] = None):
+        with open(config_path, mode="r", encoding="utf-8") as file:
+            self.config = json.load(file)
+        trending_dir = self.config.get("TRENDING_ODS_DIR")
+        stats_dir = self.config.get("VIDEO_STATS_ODS_DIR")
+        self.trending_parquet_path = os.path.join(trending_dir, "trending_videos")
+        self.trending_csv_path = os.path.join(trending_dir, "trending_videos.csv")
+        self.stats_parquet_path = os.path.join(stats_dir, "video_stats")
+        self.stats_csv_path = os.path.join(stats_dir, "merged_video_stats.csv")
+        self.today = pd.Timestamp(today or datetime.now()).normalize()
+
+    @staticmethod
+    def _read(parquet_path: str, csv_path: str, columns: list) -> pd.DataFrame:
+        if os.path.isdir(parquet_path):
+            df = pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+            return df.astype({column: object for column in df.select_dtypes("category").columns})
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, usecols=columns)
+        return pd.DataFrame(columns=columns)
+
+    def load_trending(self) -> pd.DataFrame:
+        """Last trending appearance and every trending country (most recent first) per video id."""
+        df = self._read(self.trending_parquet_path, self.trending_csv_path, ["id", "country_code", "collection_date"])
+        df["collection_date"] = pd.to_datetime(df["collection_date"])
+        df = df.sort_values("collection_date", ascending=False).drop_duplicates(["id", "country_code"])
+        grouped = df.groupby("id", sort=False)
+        trending = pd.DataFrame({
+            "country_codes": grouped["country_code"].agg(lambda codes: [str(code) for code in codes]),
+            "last_trending": grouped["collection_date"].max(),
+        })
+        trending.index.name = "video_id"
+        return trending
+
+    def load_history(self) -> pd.DataFrame:
+        """Last refresh date and latest daily relative view growth per video id."""
+        df = self._read(self.stats_parquet_path, self.stats_csv_path, ["video_id", "collection_day", "view_count"])
+        if df.empty:
+            return pd.DataFrame({"last_refresh": pd.Series(dtype="datetime64[ns]"),
+                                 "growth": pd.Series(dtype=float)})
+
+        df["collection_day"] = pd.to_datetime(df["collection_day"])
+        df["view_count"] = pd.to_numeric(df["view_count"], errors="coerce")
+        df = (df.groupby(["video_id", "collection_day"], as_index=False)["view_count"].max()
+                .sort_values(["video_id", "collection_day"]))
+
+        grouped = df.groupby("video_id")
+        prev_views = grouped["view_count"].shift()
+        prev_day = grouped["collection_day"].shift()
+        days = (df["collection_day"] - prev_day).dt.days.clip(lower=1)
+        df["growth"] = ((df["view_count"] - prev_views) / prev_views.clip(lower=1)) / days
+
+        latest = df.groupby("video_id").tail(1).set_index("video_id")
+        return latest.rename(columns={"collection_day": "last_refresh"})[["last_refresh", "growth"]]
+
+    def score(self) -> pd.DataFrame:
+        trending = self.load_trending()
+        history = self.load_history()
+        df = trending.join(history, how="left")
+
+        days_since_trending = (self.today - df["last_trending"]).dt.days.clip(lower=0)
+        recency = 0.5 ** (days_since_trending / self.RECENCY_HALF_LIFE_DAYS)
+
+        # Videos without at least two snapshots have unknown growth; treat it as high so they get a baseline
+        growth = df["growth"].fillna(1.0).clip(lower=0, upper=1)
+
+        days_since_refresh = (self.today - df["last_refresh"]).dt.days
+        staleness = (days_since_refresh / self.STALE_AFTER_DAYS).fillna(1.0).clip(lower=0, upper=1)
+
+        df["priority"] = (
+            recency * self.WEIGHTS['recency'] +
+            growth * self.WEIGHTS['growth'] +
+            staleness * self.WEIGHTS['staleness']
+        )
+        # Already refreshed today: nothing to gain from spending quota again
+        df.loc[days_since_refresh == 0, "priority"] = 0.0
+        return df.sort_values("priority", ascending=False, kind="mergesort")
+
+    def plan(self, quota_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Builds a refresh plan for ``fetch_video_details``.
+
+        Returns ``video_ids`` (the ``(video_id, [country_code, ...])`` list to fetch), the ``quota_units``
+        it will spend and how many candidate videos are left ``stale`` this run.
+        """
+        scored = self.score()
+        candidates = scored[scored["priority"] > 0]
+
+        if quota_budget is None:
+            selected = candidates
+        else:
+            capacity = max(0, int(quota_budget) // UNITS_PER_REQUEST) * IDS_PER_REQUEST
+            selected = candidates.head(capacity)
+
+        video_ids = list(zip(selected.index, selected["country_codes"]))
+        return {
+            "video_ids": video_ids,
+            "quota_units": math.ceil(len(video_ids) / IDS_PER_REQUEST) * UNITS_PER_REQUEST,
+            "candidates": len(candidates),
+            "stale": len(candidates) - len(video_ids),
+            "min_priority": float(selected["priority"].min()) if len(selected) else float(np.nan),
+        }
@@ -0,0 +1,62 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from jsonl_records import read_jsonl
+
+
+class RunJournal:
+    """
+    Append-only checkpoint journal for one collection run.
+
+    Each completed unit of work (a country, a batch of ids) is recorded as one JSON line with the
+    hash of the API response it produced. A restarted run loads the journal and skips every unit
+    already recorded, so no quota is spent twice on the same work.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.load()
+
+    @classmethod
+    def for_run(cls, checkpoint_dir: str, run_name: str, run_date: Optional[str] = None) -> "RunJournal":
+        run_date = run_date or datetime.now().strftime("%Y%m%d")
+        return cls(os.path.join(checkpoint_dir, f"{run_name}_{run_date}.jsonl"))
+
+    def load(self) -> None:
+        self.entries.update(read_jsonl(self.path, "key"))
+
+    @staticmethod
+    def response_hash(payload: Any) -> str:
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def batch_key(video_ids: Iterable[str]) -> str:
+        return "batch:" + hashlib.sha256(",".join(sorted(video_ids)).encode("utf-8")).hexdigest()[:16]
+
+    def is_done(self, key: str) -> bool:
+        return key in self.entries
+
+    def completed_ids(self) -> set:
+        """All video ids covered by completed batches."""
+        ids = set()
+        for entry in self.entries.values():
+            ids.update(entry.get("ids", []))
+        return ids
+
+    def record(self, key: str, payload: Any, **extra: Any) -> None:
+        entry = {"key": key, "sha256": self.response_hash(payload), "completed_at": datetime.now().isoformat()}
+        entry.update(extra)
+        with self.lock:
+            with open(self.path, mode="a", encoding="utf-8") as file:
+                # The leading newline isolates a torn line left by a crash; blank lines are skipped on load
+                file.write("\n" + json.dumps(entry, ensure_ascii=False) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.entries[key] = entry
@@ -1,22 +1,33 @@
 import os
 import json
 import time
+import argparse
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+from api_client import build_youtube_client, thread_http
+from rate_limiter import TokenBucket
+from run_journal import RunJournal
 
 load_dotenv()
 
+MAX_RESULTS_PER_PAGE = 50
+MAX_TRENDING_DEPTH = 200
+
+
 class YouTubeTrending:
 
-    def __init__(self, api_key: str, config_path: str, country_code: str):
+    def __init__(self, api_key: str, config_path: str, country_code: str,
+                 youtube: Any = None, config: Optional[Dict[str, Any]] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
         self.api_key = api_key
         self.country_code = country_code
-        self.config = self.load_config(config_path)
+        self.config = config if config is not None else self.load_config(config_path)
         base_dir = os.path.dirname(config_path)
         self.metadata_loc = os.path.join(base_dir, self.config.get("TRENDING_METADATA_LOC"))
-        self.youtube = build("youtube", "v3", developerKey=self.api_key)
+        self.youtube = youtube if youtube is not None else build_youtube_client(self.api_key)
+        self.rate_limiter = rate_limiter
 
         os.makedirs(self.metadata_loc, exist_ok=True)
 
@@ -24,20 +35,66 @@ class YouTubeTrending:
         with open(config_path, mode="r", encoding="utf-8") as file:
             return json.load(file)
 
-    def get_trending_videos(self) -> Dict[str, Any]:
+    def trending_depth(self) -> int:
+        """Number of trending videos to collect for this country (the chart itself stops at 200)."""
+        depth = self.config.get("TRENDING_DEPTH_BY_COUNTRY", {}).get(
+            self.country_code, self.config.get("TRENDING_DEPTH", MAX_RESULTS_PER_PAGE)
+        )
+        return max(1, min(int(depth), MAX_TRENDING_DEPTH))
+
+    def get_trending_page(self, max_results: int, page_token: Optional[str] = None) -> Dict[str, Any]:
         request = self.youtube.videos().list(
             part="snippet,statistics",
             chart="mostPopular",
             regionCode=self.country_code,
-            maxResults=50
+            maxResults=max_results,
+            pageToken=page_token
         )
-        response = request.execute()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return request.execute(http=thread_http())
+
+    def get_trending_videos(self, depth: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Walks ``nextPageToken`` until ``depth`` videos are collected and merges the pages into one
+        snapshot. Each item gets a ``trendingPosition`` so ranks stay continuous across pages.
+        """
+        depth = depth or self.trending_depth()
+        response: Dict[str, Any] = {}
+        items: List[Dict[str, Any]] = []
+        seen_ids = set()
+        page_token = None
+
+        while len(items) < depth:
+            page = self.get_trending_page(min(MAX_RESULTS_PER_PAGE, depth - len(items)), page_token)
+            if not response:
+                response = {key: value for key, value in page.items() if key not in ("items", "nextPageToken")}
+
+            for item in page.get("items", []):
+                if item.get("id") in seen_ids or len(items) >= depth:
+                    continue
+                seen_ids.add(item.get("id"))
+                item["trendingPosition"] = len(items) + 1
+                items.append(item)
+
+            page_token = page.get("nextPageToken")
+            if not page_token or not page.get("items"):
+                break
+
+        response["items"] = items
+        response["pageInfo"] = {
+            "totalResults": response.get("pageInfo", {}).get("totalResults", len(items)),
+            "resultsPerPage": len(items),
+        }
         return response
 
-    def save_to_json(self, data: Dict[str, Any], filename: str = "trending_videos.json") -> None:
+    def snapshot_path(self, filename: str = "trending_videos.json") -> str:
         date_str = datetime.now().strftime("_%Y%m%d")
         filename = os.path.splitext(filename)[0] + f"_{self.country_code}" + date_str + os.path.splitext(filename)[1]
-        filename = os.path.join(self.metadata_loc, filename)
+        return os.path.join(self.metadata_loc, filename)
+
+    def save_to_json(self, data: Dict[str, Any], filename: str = "trending_videos.json") -> None:
+        filename = self.snapshot_path(filename)
 
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, mode="w") as json_file:
@@ -46,40 +103,94 @@ class YouTubeTrending:
         print(f"Trending videos saved to {filename}")
 
 
+def collect_trending(api_key: str, config_path: str, country_codes: List[str],
+                     max_workers: int = 8, requests_per_second: float = 5.0) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches and saves trending videos for all countries with a bounded worker pool.
+
+    All workers share one API client and one token bucket, so the page requests of every country
+    are interleaved under the same request budget. Countries recorded in today's checkpoint
+    journal whose snapshot is still on disk are skipped. Returns per-country accounting:
+    ``{"ok": bool, "seconds": float, "items": int, "error": str | None, "resumed": bool}``.
+    """
+    with open(config_path, "r", encoding="utf-8") as config_file:
+        config = json.load(config_file)
+
+    youtube = build_youtube_client(api_key)
+    rate_limiter = TokenBucket(requests_per_second)
+    checkpoint_dir = os.path.join(os.path.dirname(config_path), config.get("CHECKPOINT_LOC", "assets/meta/checkpoints"))
+    journal = RunJournal.for_run(checkpoint_dir, "trending")
+
+    def collect_country(country_code: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            yt_trending = YouTubeTrending(api_key, config_path, country_code,
+                                          youtube=youtube, config=config, rate_limiter=rate_limiter)
+            key = f"country:{country_code}"
+            if journal.is_done(key) and os.path.exists(yt_trending.snapshot_path()):
+                return {"ok": True, "seconds": 0.0, "items": journal.entries[key].get("items", 0),
+                        "error": None, "resumed": True}
+
+            trending_videos = yt_trending.get_trending_videos()
+            yt_trending.save_to_json(trending_videos)
+            items = len(trending_videos.get("items", []))
+            journal.record(key, trending_videos, items=items)
+            return {"ok": True, "seconds": time.monotonic() - started, "items": items,
+                    "error": None, "resumed": False}
+        except Exception as e:
+            return {"ok": False, "seconds": time.monotonic() - started, "items": 0,
+                    "error": str(e), "resumed": False}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(collect_country, code): code for code in country_codes}
+        for future in as_completed(futures):
+            country_code = futures[future]
+            result = future.result()
+            results[country_code] = result
+            if result["resumed"]:
+                print(f"[SKIP] {country_code}: already collected today")
+            elif result["ok"]:
+                print(f"[OK] {country_code}: {result['items']} videos in {result['seconds']:.2f}s")
+            else:
+                print(f"[FAIL] ERROR for {country_code}: {result['error'][:80]}...")
+    return results
+
+
 if __name__ == "__main__":
     CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../config.json"))
 
+    with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
+        config = json.load(config_file)
+
+    parser = argparse.ArgumentParser(description="Collect trending videos for every configured country.")
+    parser.add_argument("--workers", type=int, default=config.get("TRENDING_MAX_WORKERS", 8),
+                        help="Number of countries fetched concurrently.")
+    parser.add_argument("--rate", type=float, default=config.get("YOUTUBE_REQUESTS_PER_SECOND", 5),
+                        help="Maximum YouTube API requests per second across all workers.")
+    args = parser.parse_args()
+
     api_key = os.getenv("YOUTUBE_API_KEY")
     if not api_key:
         print("Error: YOUTUBE_API_KEY environment variable not set.")
         exit(1)
 
-    with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
-        config = json.load(config_file)
-
     country_codes = config.get("TRENDING_COUNTRY_CODES", [])
 
-    success_count = 0
-    fail_count = 0
+    started = time.monotonic()
+    results = collect_trending(api_key, CONFIG_PATH, country_codes,
+                               max_workers=args.workers, requests_per_second=args.rate)
+    success_count = sum(1 for result in results.values() if result["ok"])
+    fail_count = len(results) - success_count
 
-    for country_code in country_codes:
-        print(f"Fetching trending videos for country: {country_code}")
-        try:
-            yt_trending = YouTubeTrending(api_key, CONFIG_PATH, country_code)
-            trending_videos = yt_trending.get_trending_videos()
-            yt_trending.save_to_json(trending_videos)
-            print(f"[OK] Saved trending videos for {country_code}\n")
-            success_count += 1
-            time.sleep(2)
-        except Exception as e:
-            print(f"[FAIL] ERROR for {country_code}: {str(e)[:80]}...")
-            print(f"       Skipping to next country.\n")
-            fail_count += 1
-            time.sleep(5)
-            continue
-    
     print(f"\n{'='*50}")
     print(f"COLLECTION SUMMARY:")
     print(f"  [OK] Success: {success_count}/{len(country_codes)} countries")
     print(f"  [FAIL] Failed: {fail_count}/{len(country_codes)} countries")
+    for country_code in country_codes:
+        result = results.get(country_code)
+        if result:
+            status = "OK" if result["ok"] else "FAIL"
+            print(f"    {country_code}: [{status}] {result['seconds']:.2f}s, {result['items']} videos")
+    print(f"  Total time: {time.monotonic() - started:.2f}s")
     print(f"{'='*50}\n")
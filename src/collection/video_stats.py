@@ -1,26 +1,41 @@
 import os
 import json
 import time
+import argparse
+import threading
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Tuple
-from googleapiclient.discovery import build
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from api_client import DAILY_QUOTA_REASONS, build_youtube_client, rate_limit_reason, thread_http
+from jsonl_records import read_jsonl
+from rate_limiter import TokenBucket
+from refresh_scheduler import RefreshScheduler
+from run_journal import RunJournal
 
 load_dotenv()
 
+BATCH_SIZE = 50
+
 
 class YouTubeStatsCollector:
     """
     A class to collect YouTube video statistics using the YouTube Data API.
     """
 
-    def __init__(self, api_key: str, config_path: str):
+    def __init__(self, api_key: str, config_path: str, requests_per_second: Optional[float] = None):
         self.api_key = api_key
         self.config = self.load_config(config_path)
         self.metadata_loc = self.config.get("VIDEO_STATS_METADATA_LOC")
         self.trending_csv_path = os.path.join(self.config.get("TRENDING_ODS_DIR"), "trending_videos.csv")
-        self.youtube = build("youtube", "v3", developerKey=api_key)
+        self.trending_parquet_path = os.path.join(self.config.get("TRENDING_ODS_DIR"), "trending_videos")
+        self.youtube = build_youtube_client(api_key)
+        self.requests_per_second = requests_per_second or self.config.get("YOUTUBE_REQUESTS_PER_SECOND", 5)
+        self.rate_limiter = TokenBucket(self.requests_per_second)
+        self.quota_units_used = 0
+        self.quota_lock = threading.Lock()  # batches run in worker threads
+        self.journal = RunJournal.for_run(self.config.get("CHECKPOINT_LOC", "assets/meta/checkpoints"), "video_stats")
 
         os.makedirs(self.metadata_loc, exist_ok=True)
 
@@ -29,124 +44,305 @@ class YouTubeStatsCollector:
         with open(config_path, mode="r", encoding="utf-8") as file:
             return json.load(file)
 
-    def fetch_video_details_batch(self, video_id_list: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
-        """Fetches video details from YouTube API in batches (max 50 at a time)."""
-        video_data = []
+    @staticmethod
+    def parse_video_item(item: Dict[str, Any], country_codes: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Flattens one ``videos().list`` item into a stats record."""
+        snippet = item.get("snippet", {})
+        statistics = item.get("statistics", {})
+        content_details = item.get("contentDetails", {})
+        status = item.get("status", {})
+        topic_details = item.get("topicDetails", {})
+
+        return {
+            "video_id": item["id"],
+            "channel_id": snippet.get("channelId"),
+            "title": snippet.get("title"),
+            "description": snippet.get("description"),
+            "published_at": snippet.get("publishedAt"),
+            "tags": ",".join(snippet.get("tags", [])),
+            "view_count": int(statistics.get("viewCount", 0)),
+            "like_count": int(statistics.get("likeCount", 0)),
+            "comment_count": int(statistics.get("commentCount", 0)),
+            "duration": content_details.get("duration"),
+            "dimension": content_details.get("dimension"),
+            "definition": content_details.get("definition"),
+            "caption": content_details.get("caption"),
+            "licensed_content": content_details.get("licensedContent"),
+            "projection": content_details.get("projection"),
+            "privacy_status": status.get("privacyStatus"),
+            "license": status.get("license"),
+            "embeddable": status.get("embeddable"),
+            "public_stats_viewable": status.get("publicStatsViewable"),
+            "topic_categories": topic_details.get("topicCategories", []),
+            "collection_day": datetime.now().strftime("%Y-%m-%d"),
+            "country_code": country_codes.get(item["id"], ["UNKNOWN"])[0],
+            "country_codes": country_codes.get(item["id"], ["UNKNOWN"]),
+        }
+
+    def request_batch(self, video_id_list: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fetches one batch (max 50 ids) and raises on API errors so callers can retry it.
+
+        Entries are ``(video_id, country_code)`` or ``(video_id, [country_code, ...])``.
+        """
         video_ids = ",".join([vid[0] for vid in video_id_list])
-        country_codes = {vid[0]: vid[1] for vid in video_id_list}  # Map video_id → country_code
+        country_codes = {  # Map video_id → country codes
+            vid[0]: [vid[1]] if isinstance(vid[1], str) else list(vid[1]) for vid in video_id_list
+        }
+
+        self.rate_limiter.acquire()
+        with self.quota_lock:
+            self.quota_units_used += 1  # one unit per videos().list call, counted even if it fails
+        request = self.youtube.videos().list(
+            part="snippet,statistics,contentDetails,status,topicDetails",
+            id=video_ids,
+        )
+        response = request.execute(http=thread_http())
+
+        if not response:  # Ensure response is valid
+            print("Warning: Empty API response.")
+            return []
+
+        return [self.parse_video_item(item, country_codes) for item in response.get("items", [])]
 
+    def fetch_video_details_batch(self, video_id_list: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetches video details from YouTube API in batches (max 50 at a time)."""
         try:
-            time.sleep(1.5)  # Delay to prevent rate limits
-            request = self.youtube.videos().list(
-                part="snippet,statistics,contentDetails,status,topicDetails",
-                id=video_ids,
-            )
-            response = request.execute()
-
-            if not response:  # Ensure response is valid
-                print("Warning: Empty API response.")
-                return []
-
-            for item in response.get("items", []):
-                snippet = item.get("snippet", {})
-                statistics = item.get("statistics", {})
-                content_details = item.get("contentDetails", {})
-                status = item.get("status", {})
-                topic_details = item.get("topicDetails", {})
-
-                video_data.append(
-                    {
-                        "video_id": item["id"],
-                        "channel_id": snippet.get("channelId"),
-                        "title": snippet.get("title"),
-                        "description": snippet.get("description"),
-                        "published_at": snippet.get("publishedAt"),
-                        "tags": ",".join(snippet.get("tags", [])),
-                        "view_count": int(statistics.get("viewCount", 0)),
-                        "like_count": int(statistics.get("likeCount", 0)),
-                        "comment_count": int(statistics.get("commentCount", 0)),
-                        "duration": content_details.get("duration"),
-                        "dimension": content_details.get("dimension"),
-                        "definition": content_details.get("definition"),
-                        "caption": content_details.get("caption"),
-                        "licensed_content": content_details.get("licensedContent"),
-                        "projection": content_details.get("projection"),
-                        "privacy_status": status.get("privacyStatus"),
-                        "license": status.get("license"),
-                        "embeddable": status.get("embeddable"),
-                        "public_stats_viewable": status.get("publicStatsViewable"),
-                        "topic_categories": topic_details.get("topicCategories", []),
-                        "collection_day": datetime.now().strftime("%Y-%m-%d"),
-                        "country_code": country_codes.get(item["id"], "UNKNOWN"),
-                    }
-                )
+            return self.request_batch(video_id_list)
         except Exception as e:
             print(f"Error fetching video details: {e}")
+            return []
 
-        return video_data
+    def fetch_video_details(
+        self,
+        video_id_list: List[Tuple[str, Any]],
+        max_in_flight: Optional[int] = None,
+        on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        max_retries: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches video details with up to ``max_in_flight`` concurrent batch requests.
 
-    def fetch_video_details(self, video_id_list: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
-        """Fetches video details sequentially from the YouTube API."""
+        Quota/rate-limit errors (403/429) halve the shared request rate, which then recovers on
+        success; only the batches that failed are retried, with exponential backoff between rounds.
+        Batches are submitted as earlier ones finish, so once the daily quota is exhausted no more
+        are sent.
+        When ``on_batch`` is given every batch is handed to it (on the calling thread) as soon as it
+        arrives and nothing is accumulated; otherwise all records are returned. Each persisted batch
+        is then checkpointed in the run journal together with the hash of its response.
+        """
+        max_in_flight = max_in_flight or self.config.get("VIDEO_STATS_MAX_IN_FLIGHT", 4)
+        pending = [video_id_list[i : i + BATCH_SIZE] for i in range(0, len(video_id_list), BATCH_SIZE)]
         video_data = []
+        fetched = 0
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                backoff = 2 ** attempt
+                print(f"Retrying {len(pending)} failed batches in {backoff}s (attempt {attempt}/{max_retries})")
+                time.sleep(backoff)
+
+            failed, daily_quota_hit = [], False
+            queued = iter(pending)
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                futures = {}
 
-        for i in range(0, len(video_id_list), 50):  # Process in batches of 50
-            batch = video_id_list[i : i + 50]
-            batch_data = self.fetch_video_details_batch(batch)  # Call batch fetcher
-            video_data.extend(batch_data)
-            time.sleep(1.5)  # Avoid hitting API rate limits
+                def submit_next() -> None:
+                    batch = next(queued, None)
+                    if batch is not None:
+                        futures[executor.submit(self.request_batch, batch)] = batch
 
+                for _ in range(max_in_flight):
+                    submit_next()
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch = futures.pop(future)
+                        try:
+                            batch_data = future.result()
+                        except Exception as e:
+                            failed.append(batch)
+                            reason = rate_limit_reason(e)
+                            if reason:
+                                daily_quota_hit = daily_quota_hit or reason in DAILY_QUOTA_REASONS
+                                self.rate_limiter.set_rate(self.rate_limiter.rate / 2)
+                                print(f"Rate limited ({reason}); slowing down to {self.rate_limiter.rate:.2f} req/s")
+                            else:
+                                print(f"Error fetching video details: {e}")
+                        else:
+                            if self.rate_limiter.rate < self.requests_per_second:
+                                self.rate_limiter.set_rate(min(self.requests_per_second,
+                                                               self.rate_limiter.rate + self.requests_per_second / 10))
+                            fetched += len(batch_data)
+                            batch_ids = [vid[0] for vid in batch]
+                            if on_batch is not None:
+                                on_batch(batch_data)
+                                self.journal.record(RunJournal.batch_key(batch_ids), batch_data, ids=batch_ids)
+                            else:
+                                video_data.extend(batch_data)
+
+                        # Further requests would only spend quota on the same error
+                        if not daily_quota_hit:
+                            submit_next()
+            failed.extend(queued)
+
+            pending = failed
+            if not pending:
+                break
+            if daily_quota_hit:
+                print("Daily quota exhausted; not retrying.")
+                break
+
+        if pending:
+            print(f"Gave up on {len(pending)} batches ({sum(len(batch) for batch in pending)} videos)")
+        print(f"Fetched details for {fetched} videos")
         return video_data
 
-    def save_to_json(self, video_data: List[Dict[str, Any]]) -> None:
-        """Saves the fetched video data to a JSON file."""
-        try:
-            run_date = datetime.now().strftime("%Y%m%d")
-            filename = os.path.join(self.metadata_loc, f"video_stats_{run_date}.json")
+    def daily_paths(self, run_date: Optional[str] = None) -> Tuple[str, str]:
+        """Returns the (compacted JSON, append-only JSON Lines) paths for a ``YYYYMMDD`` day."""
+        run_date = run_date or datetime.now().strftime("%Y%m%d")
+        stem = os.path.join(self.metadata_loc, f"video_stats_{run_date}")
+        return stem + ".json", stem + ".jsonl"
+
+    def append_to_jsonl(self, video_data: List[Dict[str, Any]]) -> None:
+        """
+        Appends one record per line to today's ``.jsonl`` file and fsyncs it.
+
+        Each batch costs O(batch) regardless of how much was already written today, and a crash
+        loses at most the batch being written (a torn last line is skipped by the readers).
+        """
+        _, jsonl_path = self.daily_paths()
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in video_data)
+        if os.path.exists(jsonl_path) and os.path.getsize(jsonl_path) > 0:
+            with open(jsonl_path, mode="rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    lines = "\n" + lines  # start after a torn line left by a crash
+        with open(jsonl_path, mode="a", encoding="utf-8") as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def load_day(self, run_date: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Merges the compacted JSON and the pending JSON Lines records of a day (later writes win)."""
+        json_path, jsonl_path = self.daily_paths(run_date)
+        data = {}
+        if os.path.exists(json_path):
+            with open(json_path, mode="r", encoding="utf-8") as file:
+                data = json.load(file)
+        data.update(read_jsonl(jsonl_path, "video_id", keep_key=False))
+        return data
+
+    def written_ids_today(self) -> set:
+        """Ids already collected today, so a restarted run can skip them."""
+        return set(self.load_day())
 
-            existing_data = {}
-            if os.path.exists(filename):
-                with open(filename, mode="r", encoding="utf-8") as file:
-                    existing_data = json.load(file)
+    def skip_collected_today(self, video_id_list: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+        """Drops the ids a restarted run already collected today."""
+        # Ids from completed batches include those the API no longer returns (deleted/private videos)
+        done_today = self.written_ids_today() | self.journal.completed_ids()
+        return [vid for vid in video_id_list if vid[0] not in done_today]
 
-            existing_data.update({entry.pop("video_id"): entry for entry in video_data})
+    def compact_day(self, run_date: Optional[str] = None) -> None:
+        """Folds the day's ``.jsonl`` into ``video_stats_YYYYMMDD.json`` via write-to-temp and atomic rename."""
+        json_path, jsonl_path = self.daily_paths(run_date)
+        if not os.path.exists(jsonl_path):
+            return
 
-            with open(filename, mode="w", encoding="utf-8") as file:
-                json.dump(existing_data, file, indent=4, ensure_ascii=False)
+        data = self.load_day(run_date)
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, json_path)
+        os.remove(jsonl_path)
+        print(f"Data saved to {json_path} ({len(data)} videos)")
 
-            print(f"Data saved to {filename}")
+    def save_to_json(self, video_data: List[Dict[str, Any]]) -> None:
+        """Saves the fetched video data to today's JSON file."""
+        try:
+            self.append_to_jsonl(video_data)
+            self.compact_day()
         except Exception as e:
             print(f"Error saving to JSON: {e}")
 
-    def get_unique_video_ids_from_csv(self) -> List[Tuple[str, str]]:
-        """Reads unique video IDs and country codes from the CSV file."""
+    def read_trending_ids(self, columns: List[str]) -> pd.DataFrame:
+        """Reads the given trending ODS columns (Parquet, else CSV); returns an empty frame on failure."""
+        if os.path.isdir(self.trending_parquet_path):
+            try:
+                df = pd.read_parquet(self.trending_parquet_path, engine="pyarrow", columns=columns)
+                df["country_code"] = df["country_code"].astype(str)
+                return df
+            except Exception as e:
+                print(f"Error reading Parquet ODS, falling back to CSV: {e}")
+
         if not os.path.exists(self.trending_csv_path):
             print(f"Error: CSV file {self.trending_csv_path} not found.")
-            return []
+            return pd.DataFrame(columns=columns)
 
         try:
-            df = pd.read_csv(self.trending_csv_path, usecols=["id", "country_code"])
-            df.drop_duplicates(inplace=True)  # Ensure unique video IDs
-            return list(df.itertuples(index=False, name=None))  # Convert to list of tuples (video_id, country_code)
+            return pd.read_csv(self.trending_csv_path, usecols=columns)
         except Exception as e:
             print(f"Error reading CSV: {e}")
+            return pd.DataFrame(columns=columns)
+
+    def get_unique_video_ids_from_csv(self) -> List[Tuple[str, str]]:
+        """Reads unique (video_id, country_code) pairs from the trending ODS."""
+        df = self.read_trending_ids(["id", "country_code"])
+        df.drop_duplicates(inplace=True)  # Ensure unique (video_id, country_code) pairs
+        return list(df.itertuples(index=False, name=None))  # Convert to list of tuples (video_id, country_code)
+
+    def get_video_work_list(self) -> List[Tuple[str, List[str]]]:
+        """
+        Returns one entry per video id with every country it trended in, most recent first.
+
+        A video trending in several countries is fetched once instead of once per country.
+        """
+        df = self.read_trending_ids(["id", "country_code", "collection_date"])
+        if df.empty:
             return []
+        df = df.sort_values("collection_date", ascending=False).drop_duplicates(["id", "country_code"])
+        countries = df.groupby("id", sort=False)["country_code"].agg(list)
+        return list(countries.items())
 
 
 if __name__ == "__main__":
     CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../config.json"))
 
+    parser = argparse.ArgumentParser(description="Collect statistics for every video seen in the trending ODS.")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Concurrent videos().list requests (default: VIDEO_STATS_MAX_IN_FLIGHT).")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Maximum API requests per second (default: YOUTUBE_REQUESTS_PER_SECOND).")
+    parser.add_argument("--quota-budget", type=int, default=None,
+                        help="Quota units to spend; ids are prioritised by RefreshScheduler "
+                             "(default: VIDEO_STATS_QUOTA_BUDGET, unset refreshes everything).")
+    args = parser.parse_args()
+
     api_key = os.getenv("YOUTUBE_API_KEY")
-    collector = YouTubeStatsCollector(api_key, CONFIG_PATH)
-    
-    video_id_list = collector.get_unique_video_ids_from_csv()
+    collector = YouTubeStatsCollector(api_key, CONFIG_PATH, requests_per_second=args.rate)
+    quota_budget = args.quota_budget if args.quota_budget is not None else collector.config.get("VIDEO_STATS_QUOTA_BUDGET")
+
+    if quota_budget is not None:
+        plan = RefreshScheduler(CONFIG_PATH).plan(quota_budget)
+        video_id_list = plan["video_ids"]
+        print(f"Refresh plan: {len(video_id_list)} videos for {plan['quota_units']} units "
+              f"({plan['stale']} of {plan['candidates']} candidates left stale)")
+    else:
+        video_id_list = collector.get_video_work_list()
+
+    remaining = collector.skip_collected_today(video_id_list)
+    if len(remaining) < len(video_id_list):
+        print(f"Resuming: {len(video_id_list) - len(remaining)} videos already collected today")
+    video_id_list = remaining
 
     if video_id_list:
         try:
-            video_data = collector.fetch_video_details(video_id_list)
-            if video_data:
-                collector.save_to_json(video_data)
-            else:
-                print("No video data found.")
+            collector.fetch_video_details(video_id_list, max_in_flight=args.max_in_flight,
+                                          on_batch=collector.append_to_jsonl)
+            print(f"Quota units spent: {collector.quota_units_used}")
+            collector.compact_day()
         except Exception as e:
             print(f"An error occurred: {e}")
     else:
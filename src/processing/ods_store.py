@@ -0,0 +1,113 @@
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+
+PARQUET_FILENAME = "part-0.parquet"
+
+TRENDING_PARTITION_COLS = ["collection_date", "country_code"]
+VIDEO_STATS_PARTITION_COLS = ["collection_day"]
+
+TRENDING_TYPES = {
+    "trending_position": "Int32",
+    "viewCount": "Int64",
+    "likeCount": "Int64",
+    "commentCount": "Int64",
+    "categoryId": "category",
+    "defaultAudioLanguage": "category",
+}
+
+VIDEO_STATS_TYPES = {
+    "view_count": "Int64",
+    "like_count": "Int64",
+    "comment_count": "Int64",
+    "licensed_content": "boolean",
+    "embeddable": "boolean",
+    "public_stats_viewable": "boolean",
+    "country_code": "category",
+    "dimension": "category",
+    "definition": "category",
+    "caption": "category",
+    "projection": "category",
+    "privacy_status": "category",
+    "license": "category",
+}
+
+
+def apply_types(df: pd.DataFrame, types: Dict[str, str], timestamp_cols: Sequence[str] = ()) -> pd.DataFrame:
+    """Coerces the ODS columns to their storage types once, at write time."""
+    df = df.copy()
+    for column, dtype in types.items():
+        if column not in df.columns:
+            continue
+        if dtype in ("Int32", "Int64"):
+            df[column] = pd.to_numeric(df[column], errors="coerce").round().astype(dtype)
+        elif dtype == "category":
+            df[column] = df[column].astype("string").astype("category")
+        else:
+            df[column] = df[column].astype(dtype)
+    for column in timestamp_cols:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce", utc=True)
+    return df
+
+
+def partition_path(root: str, partition_cols: List[str], values: Sequence) -> str:
+    parts = [f"{column}={value}" for column, value in zip(partition_cols, values)]
+    return os.path.join(root, *parts)
+
+
+def write_partitions(df: pd.DataFrame, root: str, partition_cols: List[str]) -> int:
+    """
+    Writes one Parquet file per partition in hive layout (``col=value/part-0.parquet``).
+
+    Existing partitions present in ``df`` are replaced atomically; other partitions are left
+    untouched, so callers can rewrite just the snapshots that changed.
+    """
+    written = 0
+    if df.empty:
+        return written
+
+    for values, group in df.groupby(partition_cols, observed=True, sort=False):
+        if not isinstance(values, tuple):
+            values = (values,)
+        directory = partition_path(root, partition_cols, values)
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, PARQUET_FILENAME)
+        tmp_target = target + ".tmp"
+        group.drop(columns=partition_cols).to_parquet(tmp_target, engine="pyarrow", index=False)
+        os.replace(tmp_target, target)
+        written += 1
+    return written
+
+
+def delete_partition(root: str, partition_cols: List[str], values: Sequence) -> None:
+    directory = partition_path(root, partition_cols, values)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+
+
+def replace_dataset(df: pd.DataFrame, root: str, partition_cols: List[str]) -> int:
+    """Rewrites the whole dataset next to ``root`` and swaps it into place."""
+    staging_root = root.rstrip(os.sep) + ".staging"
+    if os.path.isdir(staging_root):
+        shutil.rmtree(staging_root)
+    written = write_partitions(df, staging_root, partition_cols)
+
+    if os.path.isdir(root):
+        old_root = root.rstrip(os.sep) + ".old"
+        os.replace(root, old_root)
+        os.replace(staging_root, root)
+        shutil.rmtree(old_root)
+    elif os.path.isdir(staging_root):
+        os.replace(staging_root, root)
+    return written
+
+
+def read_dataset(root: str, columns: Optional[List[str]] = None, filters: Optional[list] = None) -> pd.DataFrame:
+    """
+    Reads a partitioned ODS dataset with column projection and partition predicates pushed down.
+
+    ``filters`` uses the pyarrow DNF syntax, e.g. ``[("collection_date", ">=", "2025-01-01")]``.
+    """
+    return pd.read_parquet(root, engine="pyarrow", columns=columns, filters=filters)
@@ -1,6 +1,21 @@
 import os
 import json
+import hashlib
+import argparse
 import pandas as pd
+from ods_store import (
+    TRENDING_PARTITION_COLS, TRENDING_TYPES, apply_types, delete_partition, replace_dataset, write_partitions
+)
+
+MANIFEST_FILENAME = "trending_manifest.json"
+TRENDING_CSV_FILENAME = "trending_videos.csv"
+TRENDING_PARQUET_DIRNAME = "trending_videos"
+
+TRENDING_COLUMNS = [
+    "id", "trending_position", "collection_date", "publishedAt", "country_code",
+    "channelId", "channelTitle", "title", "description", "categoryId",
+    "viewCount", "likeCount", "commentCount", "thumbnail_url", "defaultAudioLanguage",
+]
 
 
 class TrendingVideoProcessor:
@@ -11,6 +26,10 @@ class TrendingVideoProcessor:
         base_dir = os.path.dirname(config_path)
         self.metadata_dir = os.path.join(base_dir, self.config.get("TRENDING_METADATA_LOC"))
         self.output_dir = os.path.join(base_dir, self.config.get("TRENDING_ODS_DIR"))
+        self.output_path = os.path.join(self.output_dir, TRENDING_CSV_FILENAME)
+        self.parquet_root = os.path.join(self.output_dir, TRENDING_PARQUET_DIRNAME)
+        self.formats = self.config.get("ODS_FORMATS", ["parquet", "csv"])
+        self.manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
 
         if not os.path.isdir(self.metadata_dir):
             raise FileNotFoundError(f"Metadata directory '{self.metadata_dir}' does not exist")
@@ -21,10 +40,17 @@ class TrendingVideoProcessor:
         with open(self.config_path, "r", encoding="utf-8") as config_file:
             return json.load(config_file)
 
-    def extract_video_data(self, json_file: str, video_list: list):
-        country_code = os.path.basename(json_file).split('_')[2]
-        collection_date = os.path.basename(json_file).split('_')[3]
+    @staticmethod
+    def parse_snapshot_name(json_file: str):
+        """Returns (country_code, collection_date) encoded in a trending snapshot filename."""
+        parts = os.path.basename(json_file).split('_')
+        country_code = parts[2]
+        collection_date = parts[3]
         collection_date = f"{collection_date[:4]}-{collection_date[4:6]}-{collection_date[6:8]}"
+        return country_code, collection_date
+
+    def extract_video_data(self, json_file: str, video_list: list):
+        country_code, collection_date = self.parse_snapshot_name(json_file)
 
         with open(json_file, "r", encoding="utf-8") as file:
             data = json.load(file)
@@ -35,7 +61,7 @@ class TrendingVideoProcessor:
 
             video_info = {
                 "id": item.get("id"),
-                "trending_position": position,
+                "trending_position": item.get("trendingPosition", position),
                 "collection_date": collection_date,
                 "publishedAt": snippet.get("publishedAt"),
                 "country_code": country_code,
@@ -52,22 +78,133 @@ class TrendingVideoProcessor:
             }
             video_list.append(video_info)
 
-    def process_videos(self):
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                return json.load(file).get("files", {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read manifest {self.manifest_path}: {e}")
+            return {}
+
+    def save_manifest(self, manifest: dict):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"files": manifest}, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan_snapshots(self, manifest: dict):
+        """
+        Compares the metadata directory against the manifest.
+
+        Files whose size and mtime are unchanged are skipped without being read; otherwise the
+        content hash decides whether the snapshot really changed. Returns the updated manifest
+        together with the new, changed and removed filenames.
+        """
+        current = {}
+        new_files, changed_files = [], []
+
+        for filename in sorted(os.listdir(self.metadata_dir)):
+            if not filename.endswith(".json"):
+                continue
+            file_path = os.path.join(self.metadata_dir, filename)
+            stat = os.stat(file_path)
+            entry = manifest.get(filename)
+
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                current[filename] = entry
+                continue
+
+            content_hash = self.file_hash(file_path)
+            current[filename] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": content_hash}
+
+            if entry is None:
+                new_files.append(filename)
+            elif entry.get("sha256") != content_hash:
+                changed_files.append(filename)
+
+        removed_files = sorted(set(manifest) - set(current))
+        return current, new_files, changed_files, removed_files
+
+    def build_frame(self, filenames: list) -> pd.DataFrame:
         video_list = []
-        
-        for filename in os.listdir(self.metadata_dir):
-            if filename.endswith(".json"):
-                file_path = os.path.join(self.metadata_dir, filename)
-                self.extract_video_data(file_path, video_list)
+        for filename in filenames:
+            self.extract_video_data(os.path.join(self.metadata_dir, filename), video_list)
+        return pd.DataFrame(video_list, columns=TRENDING_COLUMNS)
+
+    def output_paths(self) -> list:
+        paths = []
+        if "csv" in self.formats:
+            paths.append(self.output_path)
+        if "parquet" in self.formats:
+            paths.append(self.parquet_root)
+        return paths
+
+    def update_csv(self, new_rows: pd.DataFrame, stale_keys: set, full_rebuild: bool):
+        if full_rebuild:
+            new_rows.to_csv(self.output_path, index=False)
+        elif not stale_keys:
+            # Only new snapshots: append without touching the existing rows
+            new_rows.to_csv(self.output_path, mode="a", header=False, index=False)
+        else:
+            existing = pd.read_csv(self.output_path, dtype=str, keep_default_na=False)
+            keys = list(zip(existing["country_code"], existing["collection_date"]))
+            existing = existing[[key not in stale_keys for key in keys]]
+            pd.concat([existing, new_rows], ignore_index=True).to_csv(self.output_path, index=False)
+
+    def update_parquet(self, new_rows: pd.DataFrame, removed_keys: set, full_rebuild: bool):
+        typed_rows = apply_types(new_rows, TRENDING_TYPES, timestamp_cols=["publishedAt"])
+        if full_rebuild:
+            replace_dataset(typed_rows, self.parquet_root, TRENDING_PARTITION_COLS)
+            return
+        # Every snapshot file maps to exactly one (collection_date, country_code) partition
+        write_partitions(typed_rows, self.parquet_root, TRENDING_PARTITION_COLS)
+        for country_code, collection_date in removed_keys:
+            delete_partition(self.parquet_root, TRENDING_PARTITION_COLS, (collection_date, country_code))
 
-        df = pd.DataFrame(video_list)
-        output_path = os.path.join(self.output_dir, "trending_videos.csv")
-        df.to_csv(output_path, index=False)
+    def process_videos(self, full_rebuild: bool = False):
+        full_rebuild = full_rebuild or not os.path.exists(self.manifest_path) or not all(
+            os.path.exists(path) for path in self.output_paths()
+        )
+        manifest = {} if full_rebuild else self.load_manifest()
+        manifest, new_files, changed_files, removed_files = self.scan_snapshots(manifest)
 
-        print(f"Trending videos merged file saved to {output_path}")
+        if not (new_files or changed_files or removed_files):
+            self.save_manifest(manifest)
+            print(f"Trending ODS in {self.output_dir} is up to date ({len(manifest)} snapshots)")
+            return
+
+        new_rows = self.build_frame(new_files + changed_files)
+        stale_keys = {self.parse_snapshot_name(name) for name in changed_files + removed_files}
+        removed_keys = {self.parse_snapshot_name(name) for name in removed_files}
+
+        if "parquet" in self.formats:
+            self.update_parquet(new_rows, removed_keys, full_rebuild)
+            print(f"Trending videos Parquet dataset saved to {self.parquet_root}")
+        if "csv" in self.formats:
+            self.update_csv(new_rows, stale_keys, full_rebuild)
+            print(f"Trending videos merged file saved to {self.output_path}")
+
+        self.save_manifest(manifest)
+
+        print(f"Processed {len(new_files)} new, {len(changed_files)} changed, {len(removed_files)} removed snapshots")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge daily trending snapshots into the trending ODS.")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Ignore the manifest and re-parse every snapshot.")
+    args = parser.parse_args()
+
     CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../config.json"))
     processor = TrendingVideoProcessor(CONFIG_PATH)
-    processor.process_videos()
+    processor.process_videos(full_rebuild=args.full_rebuild)
@@ -1,6 +1,12 @@
 import os
+import sys
 import json
 import pandas as pd
+from ods_store import VIDEO_STATS_PARTITION_COLS, VIDEO_STATS_TYPES, apply_types, replace_dataset
+
+# The daily stats files are written by the collector; read them with its JSON Lines reader
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "collection"))
+from jsonl_records import read_jsonl  # noqa: E402
 
 class VideoStatsProcessor:
     """Class to process YouTube video statistics from JSON files and merge them into a DataFrame."""
@@ -10,6 +16,8 @@ class VideoStatsProcessor:
         base_dir = os.path.dirname(config_path)  # Get base directory from config location
         self.json_dir = os.path.join(base_dir, self.config.get("VIDEO_STATS_METADATA_LOC"))
         self.output_dir = os.path.join(base_dir, self.config.get("VIDEO_STATS_ODS_DIR"))
+        self.parquet_root = os.path.join(self.output_dir, "video_stats")
+        self.formats = self.config.get("ODS_FORMATS", ["parquet", "csv"])
 
         if not os.path.exists(self.json_dir):
             raise FileNotFoundError(f"Error: Directory {self.json_dir} not found.")
@@ -21,20 +29,30 @@ class VideoStatsProcessor:
 
     def load_json_files(self) -> pd.DataFrame:
         all_data = []
-
-        for filename in os.listdir(self.json_dir):
-            if filename.endswith(".json"):
-                filepath = os.path.join(self.json_dir, filename)
-                try:
+        days = {}
+
+        # A day is either compacted (.json), still being appended (.jsonl), or both after an
+        # interrupted compaction; records from the .jsonl file are the most recent.
+        for filename in sorted(os.listdir(self.json_dir)):
+            stem, extension = os.path.splitext(filename)
+            if extension not in (".json", ".jsonl"):
+                continue
+            filepath = os.path.join(self.json_dir, filename)
+            try:
+                if extension == ".json":
                     with open(filepath, "r", encoding="utf-8") as file:
-                        data = json.load(file)
-
-                        for video_id, details in data.items():
-                            details["video_id"] = video_id  # Ensure video_id is included
-                            all_data.append(details)
-
-                except Exception as e:
-                    print(f"Error reading {filename}: {e}")
+                        days.setdefault(stem, {}).update(json.load(file))
+                else:
+                    days.setdefault(stem, {}).update(read_jsonl(filepath, "video_id", keep_key=False))
+            except Exception as e:
+                print(f"Error reading {filename}: {e}")
+
+        for data in days.values():
+            for video_id, details in data.items():
+                details["video_id"] = video_id  # Ensure video_id is included
+                # Older files only carry the single country the id was requested for
+                details.setdefault("country_codes", [details.get("country_code")])
+                all_data.append(details)
 
         return pd.DataFrame(all_data)
 
@@ -60,12 +78,34 @@ class VideoStatsProcessor:
         df.to_csv(output_path, index=False, encoding="utf-8")
         print(f"Merged data saved to {output_path}")
 
+    def save_to_parquet(self, df: pd.DataFrame):
+        if df.empty:
+            print("No data to save.")
+            return
+
+        typed = apply_types(df, VIDEO_STATS_TYPES, timestamp_cols=["published_at"])
+        for column in ("topic_categories", "country_codes"):
+            if column in typed.columns:
+                typed[column] = typed[column].apply(lambda x: x if isinstance(x, list) else [])
+        if "tags" in typed.columns:
+            typed["tags"] = typed["tags"].astype("string")
+
+        written = replace_dataset(typed, self.parquet_root, VIDEO_STATS_PARTITION_COLS)
+        print(f"Merged data saved to {self.parquet_root} ({written} partitions)")
+
+    def save(self, df: pd.DataFrame):
+        """Writes every ODS format enabled in the config."""
+        if "parquet" in self.formats:
+            self.save_to_parquet(df)
+        if "csv" in self.formats:
+            self.save_to_csv(df)
+
 if __name__ == "__main__":
     CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../config.json"))
 
     try:
         processor = VideoStatsProcessor(CONFIG_PATH)
         df = processor.process_data()
-        processor.save_to_csv(df)
+        processor.save(df)
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -0,0 +1,76 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class OpenAIStub:
+    """
+    Local OpenAI-compatible chat completions server; point ``OPENAI_BASE_URL`` at ``url``.
+
+    Every answer costs ``tokens`` tokens and arrives after ``delay`` seconds. Plain requests get a
+    reply naming the prompt; JSON-mode batch requests get one ``analysis`` per ``videoId`` listed
+    in the prompt. ``requests`` logs every request body.
+    """
+
+    def __init__(self, delay=0.0, tokens=100):
+        self.delay = delay
+        self.tokens = tokens
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub.lock:
+                    stub.requests.append(request)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                payload = json.dumps(stub.completion(request)).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up waiting
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reply(self, request):
+        prompt = request["messages"][-1]["content"]
+        if request.get("response_format", {}).get("type") == "json_object":
+            video_ids = re.findall(r'"videoId": "([^"]+)"', prompt)
+            return json.dumps({"results": [{"videoId": video_id, "analysis": f"batch analysis of {video_id}"}
+                                           for video_id in video_ids]})
+        with self.lock:
+            number = len(self.requests)
+        return f"reply #{number} to {prompt[:60]!r}"
+
+    def completion(self, request):
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.reply(request)}}],
+            "usage": {"prompt_tokens": self.tokens // 2, "completion_tokens": self.tokens - self.tokens // 2,
+                      "total_tokens": self.tokens},
+        }
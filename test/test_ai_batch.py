@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from ai_analyzer import AIVideoAnalyzer  # noqa: E402
+from llm_cache import LLMResponseCache  # noqa: E402
+from openai_stub import OpenAIStub  # noqa: E402
+
+
+def videos(count):
+    return [{'videoId': f'vid{i}', 'title': f'Video {i}', 'views': 1_000 * (i + 1), 'likes': 10, 'comments': 1,
+             'viralityScore': 50 + i % 40, 'country': 'US'} for i in range(count)]
+
+
+def is_batch(request):
+    return request.get("response_format", {}).get("type") == "json_object"
+
+
+class BatchAnalysisTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        environment = mock.patch.dict(os.environ, {})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def serve(self, stub):
+        stub.__enter__()
+        self.addCleanup(stub.__exit__)
+        os.environ["OPENAI_BASE_URL"] = stub.url
+        return stub
+
+    def analyzer(self, **kwargs):
+        cache = LLMResponseCache(os.path.join(self.tmp, "llm.sqlite"))
+        return AIVideoAnalyzer(api_key="test-key", cache=cache, **kwargs)
+
+    def run_batch(self, analyzer, batch, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(analyzer.analyze_videos_batch_async(batch, **kwargs))
+
+    def test_one_request_per_chunk(self):
+        stub = self.serve(OpenAIStub())
+        results = self.run_batch(self.analyzer(), videos(25), batch_size=10)
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertTrue(all(is_batch(request) for request in stub.requests))
+        self.assertEqual(results['vid7']['analysis'], 'batch analysis of vid7')
+        self.assertTrue(all(result['success'] and result['batched'] for result in results.values()))
+
+    def test_chunks_queued_for_a_slot_do_not_time_out(self):
+        # 10 chunks, 2 at a time, 0.3s each: the last ones wait ~1.2s for a slot, longer than the timeout
+        stub = self.serve(OpenAIStub(delay=0.3))
+        analyzer = self.analyzer(max_concurrency=2, timeout=1.0)
+        results = self.run_batch(analyzer, videos(40), batch_size=4)
+
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(result['success'] for result in results.values()))
+        self.assertEqual(len(stub.requests), 10)
+
+    def test_timed_out_chunk_is_not_retried_video_by_video(self):
+        stub = self.serve(OpenAIStub(delay=1.0))
+        analyzer = self.analyzer(max_concurrency=2, timeout=0.2)
+        results = self.run_batch(analyzer, videos(8), batch_size=4)
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(not result['success'] and 'timed out' in result['error'] for result in results.values()))
+        self.assertTrue(all(is_batch(request) for request in stub.requests))
+        self.assertEqual(analyzer.cache.stats()["entries"], 0)
+
+    def test_unparseable_answer_falls_back_to_single_calls(self):
+        class BrokenJsonStub(OpenAIStub):
+            def reply(self, request):
+                return "not json" if is_batch(request) else super().reply(request)
+
+        stub = self.serve(BrokenJsonStub())
+        results = self.run_batch(self.analyzer(), videos(3))
+
+        self.assertEqual(sum(is_batch(request) for request in stub.requests), 1)
+        self.assertEqual(len(stub.requests), 4)
+        self.assertTrue(all(result['success'] and 'batched' not in result for result in results.values()))
+
+    def test_videos_missing_from_the_answer_are_analyzed_singly(self):
+        class PartialStub(OpenAIStub):
+            def reply(self, request):
+                content = super().reply(request)
+                if not is_batch(request):
+                    return content
+                answer = json.loads(content)
+                answer['results'] = [entry for entry in answer['results'] if entry['videoId'] != 'vid1']
+                return json.dumps(answer)
+
+        stub = self.serve(PartialStub())
+        results = self.run_batch(self.analyzer(), videos(3))
+
+        self.assertEqual(len(stub.requests), 2)
+        self.assertTrue(results['vid0']['batched'])
+        self.assertNotIn('batched', results['vid1'])
+        self.assertTrue(results['vid1']['success'])
+
+    def test_batched_answers_fill_the_per_video_cache(self):
+        stub = self.serve(OpenAIStub())
+        analyzer = self.analyzer()
+        batch = videos(5)
+        self.run_batch(analyzer, batch)
+
+        single = analyzer.analyze_video(batch[2])
+        self.assertTrue(single['cached'])
+        self.assertEqual(single['analysis'], 'batch analysis of vid2')
+        again = self.run_batch(analyzer, batch)
+        self.assertTrue(all(result['cached'] for result in again.values()))
+        self.assertEqual(len(stub.requests), 1)
+
+    def test_sync_batch_matches_async(self):
+        stub = self.serve(OpenAIStub())
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = self.analyzer().analyze_videos_batch(videos(12), batch_size=5)
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(sorted(results), sorted(f'vid{i}' for i in range(12)))
+        self.assertTrue(all(result['success'] for result in results.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app as backend  # noqa: E402
+from ai_analyzer import AIVideoAnalyzer  # noqa: E402
+from llm_cache import LLMResponseCache  # noqa: E402
+from openai_stub import OpenAIStub  # noqa: E402
+from snapshot import DataSnapshot, SnapshotManager  # noqa: E402
+
+VIDEOS = [{'videoId': f'vid{i}', 'title': f'Video {i}', 'views': 1_000 * (i + 1), 'likes': 10, 'comments': 1,
+           'viralityScore': 60, 'country': 'US'} for i in range(3)]
+
+
+class InsightsRouteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = OpenAIStub()
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.scans = []
+        environment = mock.patch.dict(os.environ, {"OPENAI_BASE_URL": self.stub.url})
+        environment.start()
+        self.addCleanup(environment.stop)
+        snapshots = SnapshotManager(lambda signature, previous: DataSnapshot(signature, videos=VIDEOS),
+                                    lambda: "v1")
+        analyzer = AIVideoAnalyzer(api_key="test-key", cache=LLMResponseCache(":memory:"))
+        for patcher in (
+            mock.patch.object(backend, "snapshots", snapshots),
+            mock.patch.object(backend, "_ai_analyzer", analyzer),
+            mock.patch.object(backend, "load_dataset_summary", self.load_dataset_summary),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(backend.app)
+
+    def load_dataset_summary(self, previous=None):
+        try:
+            asyncio.get_running_loop()
+            self.scans.append("event loop")
+        except RuntimeError:
+            self.scans.append("worker thread")
+        return SimpleNamespace(total_videos=3, data_points=9, date_range=lambda: "Feb 2025 - Mar 2025")
+
+    def get_insights(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.get("/api/ai/insights")
+
+    def test_dataset_summary_is_scanned_off_the_event_loop(self):
+        response = self.get_insights()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.json()["dataset_summary"]["date_range"], "Feb 2025 - Mar 2025")
+        self.assertEqual(self.scans, ["worker thread"])
+
+    def test_summary_is_computed_once_per_snapshot(self):
+        self.get_insights()
+        self.get_insights()
+        self.assertEqual(len(self.scans), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
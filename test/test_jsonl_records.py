@@ -0,0 +1,89 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "collection"))
+sys.path.insert(0, os.path.join(ROOT, "src", "processing"))
+
+from jsonl_records import read_jsonl  # noqa: E402
+from run_journal import RunJournal  # noqa: E402
+from video_stats_db import VideoStatsProcessor  # noqa: E402
+
+DAMAGED_LINES = [
+    '{"video_id": "a", "view_count": 1}',
+    '{"video_id": "b", "view_count": 2}',
+    '{"view_count": 3}',
+    '{"video_id": 4, "view_count": 4}',
+    '["c", 5]',
+    '17',
+    'null',
+    '{"video_id": "d", "vie',
+    '',
+    '{"video_id": "a", "view_count": 6}',
+]
+
+
+class ReadJsonlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, lines):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines))
+        return path
+
+    def test_skips_lines_that_are_not_keyed_objects(self):
+        records = read_jsonl(self.write("day.jsonl", DAMAGED_LINES), "video_id")
+        self.assertEqual(records, {
+            "a": {"video_id": "a", "view_count": 6},
+            "b": {"video_id": "b", "view_count": 2},
+        })
+
+    def test_can_drop_the_key_field(self):
+        records = read_jsonl(self.write("day.jsonl", DAMAGED_LINES), "video_id", keep_key=False)
+        self.assertEqual(records["b"], {"view_count": 2})
+
+    def test_missing_file_is_empty(self):
+        self.assertEqual(read_jsonl(os.path.join(self.tmp, "missing.jsonl"), "video_id"), {})
+
+    def test_run_journal_survives_torn_lines(self):
+        journal = RunJournal(os.path.join(self.tmp, "checkpoints", "run.jsonl"))
+        journal.record("country:US", {"items": []}, items=50)
+        with open(journal.path, "a", encoding="utf-8") as file:
+            file.write('\n12\n{"sha256": "x"}\n{"key": "country:GB", "sha')
+
+        reloaded = RunJournal(journal.path)
+        self.assertEqual(list(reloaded.entries), ["country:US"])
+        self.assertEqual(reloaded.entries["country:US"]["items"], 50)
+
+    def test_damaged_line_keeps_the_rest_of_the_day(self):
+        json_dir = os.path.join(self.tmp, "assets/meta/video_stats")
+        os.makedirs(json_dir)
+        with open(os.path.join(json_dir, "video_stats_20250101.json"), "w", encoding="utf-8") as file:
+            json.dump({"z": {"view_count": 9, "country_code": "US"}}, file)
+        self.write("assets/meta/video_stats/video_stats_20250101.jsonl", DAMAGED_LINES)
+        config_path = os.path.join(self.tmp, "config.json")
+        with open(config_path, "w", encoding="utf-8") as file:
+            json.dump({"VIDEO_STATS_METADATA_LOC": "assets/meta/video_stats", "VIDEO_STATS_ODS_DIR": "db/ods"}, file)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            df = VideoStatsProcessor(config_path).load_json_files()
+
+        self.assertNotIn("Error reading", output.getvalue())
+        self.assertEqual(sorted(df["video_id"]), ["a", "b", "z"])
+        self.assertEqual(df.set_index("video_id").loc["a", "view_count"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from ai_analyzer import AIVideoAnalyzer  # noqa: E402
+from llm_cache import LLMResponseCache, completion_key  # noqa: E402
+from openai_stub import OpenAIStub  # noqa: E402
+
+VIDEO = {'videoId': 'abc', 'title': 'Test video', 'views': 1_000, 'likes': 50, 'comments': 5,
+         'viralityScore': 71.5, 'country': 'US'}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LLMResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "cache", "llm.sqlite")
+        self.clock = Clock()
+        patcher = mock.patch("llm_cache.time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_returns_stored_completions(self):
+        cache = LLMResponseCache(self.path)
+        cache.put("k1", "analyze_video", "model", "hello", 42)
+        self.assertEqual(cache.get("k1"), {"content": "hello", "total_tokens": 42})
+        self.assertIsNone(cache.get("k2"))
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = LLMResponseCache(self.path, ttl_seconds=60)
+        cache.put("k1", "analyze_video", "model", "hello", 42)
+        self.clock.now += 59
+        self.assertIsNotNone(cache.get("k1"))
+        # Reading does not extend the lifetime: the TTL counts from the write
+        self.clock.now += 2
+        self.assertIsNone(cache.get("k1"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_writes_drop_expired_entries(self):
+        cache = LLMResponseCache(self.path, ttl_seconds=60)
+        cache.put("old", "analyze_video", "model", "old", 1)
+        self.clock.now += 61
+        cache.put("new", "analyze_video", "model", "new", 1)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_evicts_the_least_recently_read_entries(self):
+        cache = LLMResponseCache(self.path, max_entries=2)
+        cache.put("a", "analyze_video", "model", "a", 1)
+        self.clock.now += 1
+        cache.put("b", "analyze_video", "model", "b", 1)
+        self.clock.now += 1
+        cache.get("a")
+        self.clock.now += 1
+        cache.put("c", "analyze_video", "model", "c", 1)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_survives_a_restart(self):
+        LLMResponseCache(self.path).put("k1", "analyze_video", "model", "hello", 42)
+        self.assertEqual(LLMResponseCache(self.path).get("k1")["content"], "hello")
+
+    def test_counts_hits_misses_and_saved_tokens(self):
+        cache = LLMResponseCache(self.path)
+        cache.record(hit=False)
+        cache.record(hit=True, tokens_saved=30)
+        cache.record(hit=True, tokens_saved=12)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["tokens_saved"]), (2, 1, 42))
+        self.assertEqual(stats["hit_rate"], round(2 / 3, 4))
+
+    def test_key_covers_every_request_input(self):
+        messages = [{"role": "user", "content": "hi"}]
+        key = completion_key("analyze_video", "model", messages, 0.7, max_tokens=200)
+        self.assertEqual(key, completion_key("analyze_video", "model", list(messages), 0.7, max_tokens=200))
+        self.assertNotEqual(key, completion_key("analyze_video", "model", messages, 0.8, max_tokens=200))
+        self.assertNotEqual(key, completion_key("analyze_video", "other", messages, 0.7, max_tokens=200))
+        self.assertNotEqual(key, completion_key("analyze_video", "model", messages, 0.7, max_tokens=300))
+
+
+class AnalyzerCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp, "llm.sqlite")
+        self.stub = OpenAIStub(tokens=120)
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+        environment = mock.patch.dict(os.environ, {"OPENAI_BASE_URL": self.stub.url})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def analyzer(self, **cache_options):
+        return AIVideoAnalyzer(api_key="test-key", cache=LLMResponseCache(self.cache_path, **cache_options))
+
+    def test_repeated_request_is_answered_from_the_cache(self):
+        analyzer = self.analyzer()
+        first = analyzer.analyze_video(VIDEO)
+        second = analyzer.analyze_video(VIDEO)
+
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertEqual((first['cached'], first['tokens_used']), (False, 120))
+        self.assertEqual((second['cached'], second['tokens_used']), (True, 0))
+        self.assertEqual(second['analysis'], first['analysis'])
+        stats = analyzer.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["tokens_saved"]), (1, 1, 120))
+
+    def test_different_inputs_miss(self):
+        analyzer = self.analyzer()
+        analyzer.analyze_video(VIDEO)
+        analyzer.analyze_video({**VIDEO, 'views': 2_000})
+        analyzer.explain_virality_score(VIDEO)
+
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(analyzer.cache.stats()["misses"], 3)
+
+    def test_cache_is_shared_with_a_restarted_analyzer(self):
+        self.analyzer().analyze_video(VIDEO)
+        restarted = self.analyzer()
+        self.assertTrue(restarted.analyze_video(VIDEO)['cached'])
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_expired_entry_is_requested_again(self):
+        clock = Clock()
+        with mock.patch("llm_cache.time.time", clock):
+            analyzer = self.analyzer(ttl_seconds=60)
+            analyzer.analyze_video(VIDEO)
+            clock.now += 61
+            result = analyzer.analyze_video(VIDEO)
+
+        self.assertFalse(result['cached'])
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_uncached_requests_bypass_the_cache(self):
+        analyzer = self.analyzer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.generate_title_suggestions("minecraft")
+            analyzer.generate_title_suggestions("minecraft")
+
+        self.assertEqual(len(self.stub.requests), 2)
+        stats = analyzer.cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"]), (0, 0, 0))
+
+    def test_async_path_uses_the_same_cache(self):
+        analyzer = self.analyzer()
+        analyzer.analyze_video(VIDEO)
+        result = asyncio.run(analyzer.analyze_video_async(VIDEO))
+
+        self.assertTrue(result['cached'])
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertEqual(analyzer.cache.stats()["tokens_saved"], 120)
+
+    def test_failed_requests_are_not_cached(self):
+        analyzer = self.analyzer()
+        analyzer.client = analyzer.client.with_options(base_url="http://127.0.0.1:9/v1", max_retries=0)
+        self.assertFalse(analyzer.analyze_video(VIDEO)['success'])
+        self.assertEqual(analyzer.cache.stats()["entries"], 0)
+
+        analyzer.client = analyzer.client.with_options(base_url=self.stub.url)
+        self.assertTrue(analyzer.analyze_video(VIDEO)['success'])
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_unparseable_json_answers_are_not_cached(self):
+        analyzer = self.analyzer()
+        truncated = mock.patch.object(self.stub, "reply", lambda request: '{"topics": [{"name": "Mus')
+        with truncated:
+            first = analyzer.extract_trending_topics([VIDEO])
+            second = asyncio.run(analyzer.extract_trending_topics_async([VIDEO]))
+
+        self.assertFalse(first['success'] or second['success'])
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(analyzer.cache.stats()["entries"], 0)
+
+        self.assertTrue(analyzer.extract_trending_topics([VIDEO])['success'])
+        self.assertTrue(analyzer.extract_trending_topics([VIDEO])['cached'])
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_unparseable_batch_answer_is_not_cached(self):
+        analyzer = self.analyzer()
+        reply = self.stub.reply
+        invalid = mock.patch.object(self.stub, "reply", lambda request: (
+            "[]" if request.get("response_format") else reply(request)))
+        with invalid, contextlib.redirect_stdout(io.StringIO()):
+            result = analyzer.analyze_videos_batch([VIDEO])
+
+        # Only the single-video fallback's answer is cached, not the batch answer
+        self.assertTrue(result['abc']['success'])
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(analyzer.cache.stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
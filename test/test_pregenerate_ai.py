@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app as backend  # noqa: E402
+from ai_analyzer import AIVideoAnalyzer  # noqa: E402
+from ai_store import PrecomputedAIStore  # noqa: E402
+from llm_cache import LLMResponseCache  # noqa: E402
+from openai_stub import OpenAIStub  # noqa: E402
+from pregenerate_ai import pregenerate  # noqa: E402
+
+
+def videos(count):
+    return [{'videoId': f'vid{i}', 'title': f'Video {i}', 'views': 1_000 * (i + 1), 'likes': 10, 'comments': 1,
+             'viralityScore': 50 + i % 40, 'country': 'US'} for i in range(count)]
+
+
+def is_batch(request):
+    return request.get("response_format", {}).get("type") == "json_object"
+
+
+class PregenerateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.stub = OpenAIStub(tokens=100)
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+        environment = mock.patch.dict(os.environ, {"OPENAI_BASE_URL": self.stub.url})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.store = PrecomputedAIStore(os.path.join(self.tmp, "ai_precomputed.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def analyzer(self, **kwargs):
+        cache = LLMResponseCache(os.path.join(self.tmp, "llm.sqlite"))
+        return AIVideoAnalyzer(api_key="test-key", cache=cache, **kwargs)
+
+    def run_pregenerate(self, analyzer, batch, kinds=("analysis", "explanation"), **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(pregenerate(analyzer, self.store, batch, list(kinds), **kwargs))
+
+    def test_generates_every_kind(self):
+        batch = videos(12)
+        stats = self.run_pregenerate(self.analyzer(), batch, batch_size=5)
+
+        self.assertEqual((stats["generated"], stats["failed"], stats["current"]), (24, 0, 0))
+        self.assertEqual(sum(is_batch(request) for request in self.stub.requests), 3)
+        self.assertEqual(len(self.stub.requests), 3 + 12)
+        self.assertEqual(len(self.store), 24)
+        entry = self.store.get('vid3', 'analysis', AIVideoAnalyzer.video_request_key('analysis', batch[3]))
+        self.assertEqual(entry['content'], 'batch analysis of vid3')
+
+    def test_current_entries_are_skipped(self):
+        batch = videos(6)
+        self.run_pregenerate(self.analyzer(), batch)
+        requests = len(self.stub.requests)
+        stats = self.run_pregenerate(self.analyzer(), batch)
+
+        self.assertEqual((stats["current"], stats["generated"]), (12, 0))
+        self.assertEqual(len(self.stub.requests), requests)
+
+    def test_changed_videos_are_regenerated(self):
+        batch = videos(4)
+        self.run_pregenerate(self.analyzer(), batch, kinds=["explanation"])
+        batch[2] = {**batch[2], 'views': 999_999}
+        stats = self.run_pregenerate(self.analyzer(), batch, kinds=["explanation"])
+
+        self.assertEqual((stats["current"], stats["generated"]), (3, 1))
+        self.assertIn("999,999", self.stub.requests[-1]["messages"][-1]["content"])
+
+    def test_token_budget_stops_new_requests(self):
+        stats = self.run_pregenerate(self.analyzer(), videos(10), kinds=["explanation"],
+                                     concurrency=1, token_budget=250)
+
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual((stats["generated"], stats["skipped_budget"], stats["tokens_used"]), (3, 7, 300))
+
+    def test_keeps_the_analyzers_concurrency_limit(self):
+        analyzer = self.analyzer(max_concurrency=2)
+        slots = analyzer.async_slots
+        self.run_pregenerate(analyzer, videos(4), kinds=["explanation"], concurrency=8)
+
+        self.assertIs(analyzer.async_slots, slots)
+        self.assertEqual(len(self.stub.requests), 4)
+
+
+class PrecomputedRoutesTest(unittest.TestCase):
+    """The AI routes serve pre-generated text even when no OpenAI key is configured."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.videos = videos(3)
+        self.store = PrecomputedAIStore(os.path.join(self.tmp, "ai_precomputed.sqlite"))
+        for patcher in (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}),
+            mock.patch.object(backend, "_ai_analyzer", None),
+            mock.patch.object(backend, "_ai_store", self.store),
+            mock.patch.object(backend, "load_videos_data", lambda days_filter=None: self.videos),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(backend.app)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def post(self, path, video_id):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.post(path, params={"video_id": video_id})
+
+    def test_precomputed_texts_are_served_without_a_key(self):
+        video = self.videos[1]
+        for kind, text in (("analysis", "stored analysis"), ("explanation", "stored explanation")):
+            self.store.put(video['videoId'], kind, AIVideoAnalyzer.video_request_key(kind, video), text, "model", 80)
+
+        analysis = self.post("/api/ai/analyze-video", "vid1")
+        explanation = self.post("/api/ai/explain-score", "vid1")
+
+        self.assertEqual(analysis.status_code, 200)
+        self.assertEqual(analysis.json()["analysis"], "stored analysis")
+        self.assertTrue(analysis.json()["precomputed"])
+        self.assertEqual(explanation.status_code, 200)
+        self.assertEqual(explanation.json()["explanation"], "stored explanation")
+
+    def test_missing_text_without_a_key_is_unavailable(self):
+        self.assertEqual(self.post("/api/ai/analyze-video", "vid0").status_code, 503)
+        self.assertEqual(self.post("/api/ai/analyze-video", "nope").status_code, 404)
+
+    def test_stale_text_is_not_served(self):
+        video = self.videos[0]
+        self.store.put('vid0', 'analysis', AIVideoAnalyzer.video_request_key('analysis', {**video, 'views': 1}),
+                       "old analysis", "model", 80)
+        self.assertEqual(self.post("/api/ai/analyze-video", "vid0").status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
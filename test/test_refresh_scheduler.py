@@ -0,0 +1,143 @@
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "collection"))
+
+from refresh_scheduler import RefreshScheduler  # noqa: E402
+
+TODAY = datetime(2025, 3, 10)
+FILLERS = [f"filler-{i:03d}" for i in range(120)]
+
+TRENDING = [
+    ("new", "US", "2025-03-08"),
+    ("fresh", "US", "2025-03-10"),
+    ("fresh", "GB", "2025-03-09"),
+    ("fresh", "US", "2025-03-01"),
+    ("old", "DE", "2025-02-10"),
+    ("stale", "FR", "2025-03-03"),
+    ("recently_refreshed", "FR", "2025-03-03"),
+    ("refreshed_today", "US", "2025-03-10"),
+] + [(video_id, "IN", "2025-02-01") for video_id in FILLERS]
+
+STATS = [
+    ("fresh", "2025-03-08", 1_000),
+    ("fresh", "2025-03-09", 1_500),
+    ("stale", "2025-02-19", 1_000),
+    ("stale", "2025-02-20", 1_010),
+    ("recently_refreshed", "2025-03-08", 1_000),
+    ("recently_refreshed", "2025-03-09", 1_010),
+    ("refreshed_today", "2025-03-09", 100),
+    ("refreshed_today", "2025-03-10", 200),
+] + [row for video_id in FILLERS for row in ((video_id, "2025-03-08", 500), (video_id, "2025-03-09", 500))]
+
+# Priority of the fillers: trended 37 days ago, refreshed yesterday, no growth
+FILLER_PRIORITY = 0.45 * 0.5 ** (37 / 7) + 0.20 / 7
+
+
+class RefreshSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.trending_dir = os.path.join(self.tmp, "db/ods")
+        self.stats_dir = os.path.join(self.tmp, "db/ods/stats")
+        os.makedirs(self.stats_dir)
+        self.config_path = os.path.join(self.tmp, "config.json")
+        with open(self.config_path, "w", encoding="utf-8") as file:
+            json.dump({"TRENDING_ODS_DIR": self.trending_dir, "VIDEO_STATS_ODS_DIR": self.stats_dir}, file)
+        self.trending = pd.DataFrame(TRENDING, columns=["id", "country_code", "collection_date"])
+        self.stats = pd.DataFrame(STATS, columns=["video_id", "collection_day", "view_count"])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_csv(self):
+        self.trending.to_csv(os.path.join(self.trending_dir, "trending_videos.csv"), index=False)
+        self.stats.to_csv(os.path.join(self.stats_dir, "merged_video_stats.csv"), index=False)
+
+    def write_parquet(self):
+        for frame, path in ((self.trending, os.path.join(self.trending_dir, "trending_videos")),
+                            (self.stats, os.path.join(self.stats_dir, "video_stats"))):
+            os.makedirs(path)
+            frame.to_parquet(os.path.join(path, "part-0.parquet"), index=False)
+
+    def plan(self, quota_budget=None):
+        return RefreshScheduler(self.config_path, today=TODAY).plan(quota_budget)
+
+    def test_ranks_by_recency_growth_and_staleness(self):
+        self.write_csv()
+        ranked = [video_id for video_id, _ in self.plan()["video_ids"]]
+
+        self.assertEqual(ranked[:5], ["new", "fresh", "old", "stale", "recently_refreshed"])
+        self.assertNotIn("refreshed_today", ranked)
+
+    def test_stale_ids_come_before_recently_refreshed_ones(self):
+        # Same trending day and growth; only the days since the last refresh differ
+        self.write_csv()
+        priorities = RefreshScheduler(self.config_path, today=TODAY).score()["priority"]
+
+        self.assertAlmostEqual(priorities["stale"] - priorities["recently_refreshed"], 0.20 * (1 - 1 / 7))
+        self.assertAlmostEqual(priorities["new"], 0.45 * 0.5 ** (2 / 7) + 0.35 + 0.20)
+        self.assertEqual(priorities["refreshed_today"], 0.0)
+
+    def test_budget_packs_full_requests(self):
+        self.write_csv()
+        plan = self.plan(quota_budget=2)
+
+        self.assertEqual(len(plan["video_ids"]), 100)
+        self.assertEqual(plan["quota_units"], 2)
+        self.assertEqual((plan["candidates"], plan["stale"]), (125, 25))
+        self.assertEqual([video_id for video_id, _ in plan["video_ids"][:5]],
+                         ["new", "fresh", "old", "stale", "recently_refreshed"])
+        self.assertAlmostEqual(plan["min_priority"], FILLER_PRIORITY)
+
+    def test_without_budget_every_candidate_is_planned(self):
+        self.write_csv()
+        plan = self.plan()
+
+        self.assertEqual(len(plan["video_ids"]), 125)
+        self.assertEqual((plan["quota_units"], plan["stale"]), (3, 0))
+
+    def test_zero_budget_plans_nothing(self):
+        self.write_csv()
+        plan = self.plan(quota_budget=0)
+
+        self.assertEqual((plan["video_ids"], plan["quota_units"], plan["stale"]), ([], 0, 125))
+        self.assertTrue(math.isnan(plan["min_priority"]))
+
+    def test_country_codes_most_recent_first(self):
+        self.write_csv()
+        codes = dict(self.plan()["video_ids"])
+
+        self.assertEqual(codes["fresh"], ["US", "GB"])
+        self.assertEqual(codes["stale"], ["FR"])
+
+    def test_parquet_ods_matches_csv(self):
+        self.write_csv()
+        from_csv = self.plan(quota_budget=2)
+        os.remove(os.path.join(self.trending_dir, "trending_videos.csv"))
+        os.remove(os.path.join(self.stats_dir, "merged_video_stats.csv"))
+        self.write_parquet()
+
+        self.assertEqual(self.plan(quota_budget=2), from_csv)
+
+    def test_without_stats_every_trending_video_is_a_candidate(self):
+        self.trending.to_csv(os.path.join(self.trending_dir, "trending_videos.csv"), index=False)
+        plan = self.plan(quota_budget=1)
+
+        self.assertEqual(plan["candidates"], 126)
+        self.assertEqual(len(plan["video_ids"]), 50)
+        # Nothing was refreshed yet, so both videos that trended today tie at the top
+        self.assertEqual({video_id for video_id, _ in plan["video_ids"][:2]}, {"fresh", "refreshed_today"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import contextlib
+import io
+import os
+import sys
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from snapshot import DataSnapshot, SnapshotManager  # noqa: E402
+
+
+class DerivedValuesTest(unittest.TestCase):
+
+    def test_factory_runs_once(self):
+        snapshot = DataSnapshot("v1")
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def factory():
+            calls.append(1)
+            return "value"
+
+        def worker():
+            barrier.wait()
+            snapshot.derived("name", factory)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(snapshot.derived("name", factory), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_slow_value_does_not_hold_up_other_names(self):
+        snapshot = DataSnapshot("v1")
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "history"
+
+        thread = threading.Thread(target=snapshot.derived, args=("history_index", slow))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        done = threading.Event()
+        threading.Thread(target=lambda: (snapshot.derived("stats", lambda: "stats"), done.set())).start()
+        try:
+            self.assertTrue(done.wait(1), "stats waited behind the history load")
+        finally:
+            release.set()
+            thread.join()
+
+    def test_factory_may_ask_for_another_value(self):
+        snapshot = DataSnapshot("v1")
+        value = snapshot.derived("stats", lambda: snapshot.derived("summary", lambda: 3) + 1)
+        self.assertEqual((value, snapshot.derived_values["summary"]), (4, 3))
+
+
+class SnapshotManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.signature = "v1"
+        self.fail = True
+        self.builds = 0
+
+    def build(self, signature, previous):
+        self.builds += 1
+        if self.fail:
+            raise FileNotFoundError("no ODS yet")
+        return DataSnapshot(signature, videos=["video"])
+
+    def manager(self, **kwargs):
+        return SnapshotManager(self.build, lambda: self.signature, poll_seconds=60, **kwargs)
+
+    def test_failed_first_build_publishes_the_empty_snapshot(self):
+        snapshots = self.manager(empty=lambda: DataSnapshot("", videos=[]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            snapshot = snapshots.get()
+            for _ in range(5):
+                self.assertIs(snapshots.get(), snapshot)
+
+        self.assertEqual(snapshot.videos, [])
+        self.assertEqual(snapshots.status()["version"], 0)
+        self.assertIn("no ODS yet", snapshots.status()["last_error"])
+        self.assertEqual(self.builds, 1)
+
+    def test_watcher_refresh_replaces_the_empty_snapshot(self):
+        snapshots = self.manager(empty=lambda: DataSnapshot("", videos=[]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            snapshots.get()
+            self.fail = False
+            self.assertTrue(snapshots.refresh())
+
+        self.assertEqual(snapshots.get().videos, ["video"])
+        self.assertEqual(snapshots.status()["version"], 1)
+        self.assertIsNone(snapshots.status()["last_error"])
+
+    def test_without_empty_factory_requests_do_not_retry(self):
+        snapshots = self.manager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(snapshots.get())
+            self.assertIsNone(snapshots.get())
+        self.assertEqual(self.builds, 1)
+
+    def test_unchanged_signature_is_not_rebuilt(self):
+        self.fail = False
+        snapshots = self.manager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = snapshots.get()
+            self.assertFalse(snapshots.refresh())
+            self.signature = "v2"
+            self.assertTrue(snapshots.refresh())
+
+        self.assertIsNot(snapshots.get(), first)
+        self.assertEqual(snapshots.get().version, 2)
+        self.assertEqual(self.builds, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "collection"))
+
+from rate_limiter import TokenBucket  # noqa: E402
+from trending import YouTubeTrending, collect_trending  # noqa: E402
+from youtube_stub import YouTubeStub  # noqa: E402
+
+
+class CollectTrendingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp, "config.json")
+        self.write_config()
+        self.previous_endpoint = os.environ.get("YOUTUBE_API_ENDPOINT")
+
+    def tearDown(self):
+        if self.previous_endpoint is None:
+            os.environ.pop("YOUTUBE_API_ENDPOINT", None)
+        else:
+            os.environ["YOUTUBE_API_ENDPOINT"] = self.previous_endpoint
+        shutil.rmtree(self.tmp)
+
+    def write_config(self, **overrides):
+        config = {
+            "TRENDING_METADATA_LOC": "assets/meta/trending",
+            "CHECKPOINT_LOC": "assets/meta/checkpoints",
+            "TRENDING_DEPTH": 50,
+        }
+        config.update(overrides)
+        with open(self.config_path, "w", encoding="utf-8") as file:
+            json.dump(config, file)
+
+    def collect(self, stub, country_codes, **kwargs):
+        os.environ["YOUTUBE_API_ENDPOINT"] = stub.url
+        kwargs.setdefault("requests_per_second", 100)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return collect_trending("test-key", self.config_path, country_codes, **kwargs)
+
+    def snapshot(self, country_code):
+        yt_trending = YouTubeTrending("test-key", self.config_path, country_code, youtube=object())
+        with open(yt_trending.snapshot_path(), encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_reports_each_country(self):
+        with YouTubeStub(chart_sizes={"US": 50, "GB": 30}) as stub:
+            results = self.collect(stub, ["US", "GB"])
+
+        self.assertEqual(set(results), {"US", "GB"})
+        self.assertTrue(all(result["ok"] and not result["resumed"] for result in results.values()))
+        self.assertEqual(results["US"]["items"], 50)
+        self.assertEqual(results["GB"]["items"], 30)
+        self.assertEqual(len(self.snapshot("GB")["items"]), 30)
+
+    def test_failed_country_does_not_stop_the_others(self):
+        def fail(query):
+            return (403, "forbidden") if query.get("regionCode") == "KR" else None
+
+        with YouTubeStub(fail=fail) as stub:
+            results = self.collect(stub, ["US", "KR", "GB"])
+
+        self.assertFalse(results["KR"]["ok"])
+        self.assertIn("forbidden", results["KR"]["error"])
+        self.assertEqual(results["KR"]["items"], 0)
+        self.assertTrue(results["US"]["ok"] and results["GB"]["ok"])
+        self.assertEqual(len(self.snapshot("US")["items"]), 50)
+
+    def test_requests_share_one_token_bucket(self):
+        country_codes = ["AR", "BR", "CA", "DE", "FR", "GB", "JP", "US"]
+        with YouTubeStub() as stub:
+            self.collect(stub, country_codes, max_workers=8, requests_per_second=4)
+            times = sorted(at for at, _ in stub.requests)
+
+        # 8 workers, but after the initial burst of 4 the bucket admits one request every 0.25s
+        self.assertEqual(len(times), len(country_codes))
+        self.assertGreaterEqual(times[-1] - times[0], (len(country_codes) - 4) / 4 * 0.8)
+
+    def test_pages_through_deeper_charts(self):
+        self.write_config(TRENDING_DEPTH=50, TRENDING_DEPTH_BY_COUNTRY={"US": 120})
+        with YouTubeStub(chart_sizes={"US": 200, "GB": 200}) as stub:
+            results = self.collect(stub, ["US", "GB"])
+            us_pages = stub.queries(regionCode="US")
+
+        self.assertEqual([query.get("pageToken") for query in us_pages], [None, "50", "100"])
+        self.assertEqual([query["maxResults"] for query in us_pages], ["50", "50", "20"])
+        self.assertEqual(results["US"]["items"], 120)
+        self.assertEqual(results["GB"]["items"], 50)
+
+        items = self.snapshot("US")["items"]
+        self.assertEqual([item["trendingPosition"] for item in items], list(range(1, 121)))
+        self.assertEqual(len({item["id"] for item in items}), 120)
+
+    def test_pagination_stops_at_the_end_of_the_chart(self):
+        self.write_config(TRENDING_DEPTH=200)
+        with YouTubeStub(chart_sizes={"US": 75}) as stub:
+            results = self.collect(stub, ["US"])
+            pages = stub.queries(regionCode="US")
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(results["US"]["items"], 75)
+
+    def test_repeated_videos_across_pages_keep_positions_continuous(self):
+        class RepeatingStub(YouTubeStub):
+            def respond(self, query):
+                status, body = super().respond(query)
+                if query.get("pageToken") == "50":
+                    body["items"].insert(0, self.video("US-49"))
+                return status, body
+
+        self.write_config(TRENDING_DEPTH=100)
+        with RepeatingStub(chart_sizes={"US": 100}) as stub:
+            self.collect(stub, ["US"])
+
+        items = self.snapshot("US")["items"]
+        self.assertEqual(len(items), 100)
+        self.assertEqual(len({item["id"] for item in items}), 100)
+        self.assertEqual(items[-1]["trendingPosition"], 100)
+
+    def test_restarted_run_skips_completed_countries(self):
+        with YouTubeStub() as stub:
+            self.collect(stub, ["US", "GB"])
+        with YouTubeStub() as stub:
+            results = self.collect(stub, ["US", "GB", "FR"])
+            requested = {query["regionCode"] for query in stub.queries()}
+
+        self.assertEqual(requested, {"FR"})
+        self.assertTrue(results["US"]["resumed"] and results["GB"]["resumed"])
+        self.assertEqual(results["US"]["items"], 50)
+        self.assertFalse(results["FR"]["resumed"])
+
+    def test_failed_country_is_retried_on_restart(self):
+        with YouTubeStub(fail=lambda query: (403, "forbidden") if query.get("regionCode") == "US" else None) as stub:
+            self.collect(stub, ["US", "GB"])
+        with YouTubeStub() as stub:
+            results = self.collect(stub, ["US", "GB"])
+            requested = {query["regionCode"] for query in stub.queries()}
+
+        self.assertEqual(requested, {"US"})
+        self.assertTrue(results["US"]["ok"] and not results["US"]["resumed"])
+
+    def test_missing_snapshot_is_collected_again(self):
+        with YouTubeStub() as stub:
+            self.collect(stub, ["US"])
+        yt_trending = YouTubeTrending("test-key", self.config_path, "US", youtube=object())
+        os.remove(yt_trending.snapshot_path())
+
+        with YouTubeStub() as stub:
+            results = self.collect(stub, ["US"])
+            self.assertEqual(len(stub.queries(regionCode="US")), 1)
+        self.assertFalse(results["US"]["resumed"])
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_blocks_once_the_burst_is_spent(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 4 / 20 * 0.9)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
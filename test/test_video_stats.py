@@ -0,0 +1,190 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "collection"))
+
+from run_journal import RunJournal  # noqa: E402
+from video_stats import YouTubeStatsCollector  # noqa: E402
+from youtube_stub import YouTubeStub  # noqa: E402
+
+
+def fail_times(times, status, reason, video_id=None):
+    """Fails the first ``times`` id lookups (only those containing ``video_id``, if given)."""
+    remaining = {"count": times}
+    lock = threading.Lock()
+
+    def fail(query):
+        if video_id is not None and video_id not in query.get("id", "").split(","):
+            return None
+        with lock:
+            if remaining["count"] == 0:
+                return None
+            remaining["count"] -= 1
+        return status, reason
+    return fail
+
+
+class FetchVideoDetailsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp, "config.json")
+        with open(self.config_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "VIDEO_STATS_METADATA_LOC": os.path.join(self.tmp, "assets/meta/video_stats"),
+                "TRENDING_ODS_DIR": os.path.join(self.tmp, "db/ods"),
+                "CHECKPOINT_LOC": os.path.join(self.tmp, "assets/meta/checkpoints"),
+                "YOUTUBE_REQUESTS_PER_SECOND": 100,
+                "VIDEO_STATS_MAX_IN_FLIGHT": 4,
+            }, file)
+        self.previous_endpoint = os.environ.get("YOUTUBE_API_ENDPOINT")
+        self.sleep = mock.patch("video_stats.time.sleep").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        if self.previous_endpoint is None:
+            os.environ.pop("YOUTUBE_API_ENDPOINT", None)
+        else:
+            os.environ["YOUTUBE_API_ENDPOINT"] = self.previous_endpoint
+        shutil.rmtree(self.tmp)
+
+    def collector(self, stub, **kwargs):
+        os.environ["YOUTUBE_API_ENDPOINT"] = stub.url
+        return YouTubeStatsCollector("test-key", self.config_path, **kwargs)
+
+    def fetch(self, collector, video_id_list, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return collector.fetch_video_details(video_id_list, **kwargs)
+
+    @staticmethod
+    def work_list(count):
+        return [(f"v-{i}", ["US", "GB"] if i % 2 else "US") for i in range(count)]
+
+    def test_fetches_every_batch(self):
+        with YouTubeStub() as stub:
+            collector = self.collector(stub)
+            records = self.fetch(collector, self.work_list(120))
+            lookups = stub.queries()
+
+        self.assertEqual([len(query["id"].split(",")) for query in lookups].count(50), 2)
+        self.assertEqual(len(lookups), 3)
+        self.assertEqual(collector.quota_units_used, 3)
+        self.assertEqual(sorted(record["video_id"] for record in records), sorted(f"v-{i}" for i in range(120)))
+        by_id = {record["video_id"]: record for record in records}
+        self.assertEqual(by_id["v-1"]["country_codes"], ["US", "GB"])
+        self.assertEqual(by_id["v-2"]["country_codes"], ["US"])
+        self.sleep.assert_not_called()
+
+    def test_only_failed_batches_are_retried(self):
+        with YouTubeStub(fail=fail_times(1, 500, "backendError", video_id="v-60")) as stub:
+            collector = self.collector(stub)
+            records = self.fetch(collector, self.work_list(120))
+            lookups = [query["id"].split(",") for query in stub.queries()]
+
+        self.assertEqual(len(lookups), 4)
+        self.assertIn("v-60", lookups[-1])
+        self.assertEqual(lookups.count(lookups[-1]), 2)
+        self.assertEqual(len(records), 120)
+        self.sleep.assert_called_once_with(2)
+
+    def test_rate_limit_halves_the_request_rate(self):
+        with YouTubeStub(fail=fail_times(1, 429, "rateLimitExceeded")) as stub:
+            collector = self.collector(stub, requests_per_second=10)
+            with mock.patch.object(collector.rate_limiter, "set_rate",
+                                   wraps=collector.rate_limiter.set_rate) as set_rate:
+                records = self.fetch(collector, self.work_list(50), max_in_flight=1)
+
+        self.assertEqual(len(records), 50)
+        # Halved after the 429, then recovering by a tenth of the configured rate per successful batch
+        self.assertEqual([call.args[0] for call in set_rate.call_args_list], [5.0, 6.0])
+        self.assertEqual(collector.rate_limiter.rate, 6.0)
+
+    def test_daily_quota_stops_retries(self):
+        with YouTubeStub(fail=lambda query: (403, "quotaExceeded")) as stub:
+            collector = self.collector(stub)
+            records = self.fetch(collector, self.work_list(120))
+            lookups = stub.queries()
+
+        self.assertEqual(records, [])
+        self.assertEqual(len(lookups), 3)
+        self.sleep.assert_not_called()
+
+    def test_daily_quota_cancels_queued_batches(self):
+        with YouTubeStub(fail=lambda query: (403, "quotaExceeded")) as stub:
+            collector = self.collector(stub)
+            records = self.fetch(collector, self.work_list(500), max_in_flight=1)
+            lookups = stub.queries()
+
+        self.assertEqual(records, [])
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(collector.quota_units_used, 1)
+
+    def test_quota_units_are_counted_across_threads(self):
+        with YouTubeStub() as stub:
+            collector = self.collector(stub)
+            self.fetch(collector, self.work_list(50 * 40), max_in_flight=8)
+            lookups = stub.queries()
+
+        self.assertEqual(len(lookups), 40)
+        self.assertEqual(collector.quota_units_used, 40)
+
+    def test_gives_up_after_max_retries(self):
+        with YouTubeStub(fail=lambda query: (500, "backendError")) as stub:
+            collector = self.collector(stub)
+            self.fetch(collector, self.work_list(10), max_retries=2)
+            lookups = stub.queries()
+
+        self.assertEqual(len(lookups), 3)
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [2, 4])
+
+    def test_streams_batches_and_checkpoints_them(self):
+        streamed = []
+        with YouTubeStub() as stub:
+            collector = self.collector(stub)
+
+            def on_batch(batch_data):
+                streamed.append(len(batch_data))
+                collector.append_to_jsonl(batch_data)
+
+            records = self.fetch(collector, self.work_list(120), on_batch=on_batch)
+
+        self.assertEqual(records, [])
+        self.assertEqual(sorted(streamed), [20, 50, 50])
+        _, jsonl_path = collector.daily_paths()
+        with open(jsonl_path, encoding="utf-8") as file:
+            self.assertEqual(sum(1 for line in file if line.strip()), 120)
+        batch_keys = [key for key in collector.journal.entries if key.startswith("batch:")]
+        self.assertEqual(len(batch_keys), 3)
+
+    def test_restarted_run_skips_collected_ids(self):
+        class DeletedVideoStub(YouTubeStub):
+            def respond(self, query):
+                status, body = super().respond(query)
+                body["items"] = [item for item in body.get("items", []) if item["id"] != "v-7"]
+                return status, body
+
+        with DeletedVideoStub(fail=fail_times(1, 500, "backendError", video_id="v-100")) as stub:
+            collector = self.collector(stub)
+            self.fetch(collector, self.work_list(120), on_batch=collector.append_to_jsonl, max_retries=0)
+
+        with YouTubeStub() as stub:
+            restarted = self.collector(stub)
+            remaining = restarted.skip_collected_today(self.work_list(120))
+
+        # v-7 was never returned by the API, but its batch completed, so it is not fetched again
+        self.assertEqual([vid[0] for vid in remaining], [f"v-{i}" for i in range(100, 120)])
+        journal = RunJournal.for_run(os.path.join(self.tmp, "assets/meta/checkpoints"), "video_stats")
+        self.assertIn("v-7", journal.completed_ids())
+
+
+if __name__ == "__main__":
+    unittest.main()
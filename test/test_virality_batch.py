@@ -0,0 +1,122 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend_api"))
+
+from virality_calculator import ViralityCalculator  # noqa: E402
+
+SCORE_KEYS = ['virality_score', 'growth_velocity', 'engagement_rate', 'trending_duration', 'audience_reach']
+
+
+def day(offset):
+    return (pd.Timestamp('2025-02-01') + pd.Timedelta(days=int(offset))).strftime('%Y-%m-%dT00:00:00Z')
+
+
+class BatchScoringTest(unittest.TestCase):
+    """``calculate_virality_scores`` must return exactly what ``calculate_virality_score`` returns per video."""
+
+    def assert_matches_scalar(self, videos, histories, dates):
+        history_rows = [
+            {'video_id': video_id, 'timestamp': point['timestamp'], 'views': point['views']}
+            for video_id, points in histories.items() for point in points
+        ]
+        view_history = pd.DataFrame(history_rows, columns=['video_id', 'timestamp', 'views'])
+        frame = videos.copy()
+        frame['first_collection'] = [min(dates[v]) if dates[v] else None for v in frame['video_id']]
+        frame['last_collection'] = [max(dates[v]) if dates[v] else None for v in frame['video_id']]
+
+        batch = ViralityCalculator.calculate_virality_scores(frame, view_history)
+
+        self.assertEqual(list(batch.index), list(videos.index))
+        for index, row in videos.iterrows():
+            video_data = {key: row[key] for key in ('views', 'likes', 'comments', 'subscribers') if key in row}
+            expected = ViralityCalculator.calculate_virality_score(
+                video_data, view_history=histories[row['video_id']], collection_dates=dates[row['video_id']]
+            )
+            actual = batch.loc[index]
+            for key in SCORE_KEYS:
+                self.assertEqual(actual[key], expected[key], f"{key} differs for {row['video_id']}: {dict(row)}")
+
+    def test_random_videos(self):
+        rng = np.random.default_rng(20251025)
+        n = 3000
+        views = rng.integers(0, 50_000_000, n)
+        views[rng.random(n) < 0.05] = 0
+        views = np.where(rng.random(n) < 0.1, rng.integers(0, 200_000, n), views)
+        subscribers = rng.integers(0, 20_000_000, n).astype(float)
+        subscribers[rng.random(n) < 0.15] = np.nan
+        subscribers[rng.random(n) < 0.05] = 0
+        videos = pd.DataFrame({
+            'video_id': [f'v{i}' for i in range(n)],
+            'views': views,
+            'likes': (views * rng.random(n) * 0.2).astype(np.int64),
+            'comments': (views * rng.random(n) * 0.02).astype(np.int64),
+            'subscribers': subscribers,
+        }, index=rng.permutation(n) + 1000)
+
+        histories, dates = {}, {}
+        for video_id in videos['video_id']:
+            length = int(rng.integers(0, 9))
+            days = np.sort(rng.choice(120, size=length, replace=False))
+            kind = rng.random()
+            if kind < 0.1:
+                points = np.zeros(length, dtype=np.int64)
+            elif kind < 0.3:
+                points = np.cumprod(rng.uniform(1.0, 6.0, length)) * 1000  # clips at 100
+            elif kind < 0.4:
+                points = np.cumprod(rng.uniform(0.05, 0.6, length)) * 1_000_000  # clips at 0
+            else:
+                points = rng.integers(0, 2_000_000, length)
+            histories[video_id] = [{'timestamp': day(d), 'views': int(v)} for d, v in zip(days, points)]
+            dates[video_id] = [day(d) for d in np.sort(rng.choice(90, size=int(rng.integers(0, 5)), replace=False))]
+
+        self.assert_matches_scalar(videos, histories, dates)
+
+    def test_edge_cases(self):
+        videos = pd.DataFrame({
+            'video_id': ['zero_views', 'zero_prev', 'nan_subs', 'single_date', 'clip_high', 'clip_low',
+                         'no_history', 'tie'],
+            'views': [0, 5_000, 250_000, 1_000_000, 80_000, 3_000, 100_000, 1_000],
+            'likes': [0, 100, 10_000, 50_000, 4_000, 10, 2_000, 15],
+            'comments': [0, 5, 500, 1_000, 100, 0, 50, 0],
+            'subscribers': [100.0, 0.0, np.nan, 2_000_000.0, np.nan, 50_000.0, 10_000.0, np.nan],
+        })
+        histories = {
+            'zero_views': [{'timestamp': day(0), 'views': 0}, {'timestamp': day(1), 'views': 0}],
+            'zero_prev': [{'timestamp': day(0), 'views': 0}, {'timestamp': day(1), 'views': 2_000},
+                          {'timestamp': day(2), 'views': 5_000}],
+            'nan_subs': [{'timestamp': day(0), 'views': 200_000}, {'timestamp': day(3), 'views': 250_000}],
+            'single_date': [{'timestamp': day(5), 'views': 1_000_000}],
+            'clip_high': [{'timestamp': day(d), 'views': 10 ** (d + 1)} for d in range(5)],
+            'clip_low': [{'timestamp': day(d), 'views': 100_000 // (10 ** d)} for d in range(5)],
+            'no_history': [],
+            'tie': [{'timestamp': day(0), 'views': 1_000}, {'timestamp': day(1), 'views': 1_000}],
+        }
+        dates = {
+            'zero_views': [day(0)],
+            'zero_prev': [day(0), day(2)],
+            'nan_subs': [day(0), day(20)],
+            'single_date': [day(5)],
+            'clip_high': [day(d) for d in range(5)],
+            'clip_low': [],
+            'no_history': [day(0), day(40)],
+            'tie': [day(0), day(9)],
+        }
+        self.assert_matches_scalar(videos, histories, dates)
+
+    def test_without_history_or_dates(self):
+        videos = pd.DataFrame({'views': [0, 10, 2_000_000], 'likes': [0, 1, 90_000], 'comments': [0, 0, 300]})
+        batch = ViralityCalculator.calculate_virality_scores(videos)
+        for index, row in videos.iterrows():
+            expected = ViralityCalculator.calculate_virality_score(dict(row))
+            for key in SCORE_KEYS:
+                self.assertEqual(batch.loc[index, key], expected[key])
+
+
+if __name__ == "__main__":
+    unittest.main()
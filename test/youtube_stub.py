@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class YouTubeStub:
+    """
+    Local stand-in for the YouTube Data API ``videos().list`` endpoint.
+
+    Point ``YOUTUBE_API_ENDPOINT`` at ``url`` to use it. Trending charts serve ``chart_sizes[region]``
+    videos (default 50) with offset page tokens; id lookups echo every requested id. ``fail`` may
+    return ``(status, reason)`` for a request to answer it with an API error instead. Every request
+    is logged as ``(monotonic time, query)``.
+    """
+
+    def __init__(self, chart_sizes=None, fail=None, delay=0.0):
+        self.chart_sizes = chart_sizes or {}
+        self.fail = fail
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                with stub.lock:
+                    stub.requests.append((time.monotonic(), query))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status, body = stub.respond(query)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def queries(self, **match):
+        with self.lock:
+            return [query for _, query in self.requests
+                    if all(query.get(key) == value for key, value in match.items())]
+
+    def respond(self, query):
+        failure = self.fail(query) if self.fail else None
+        if failure:
+            status, reason = failure
+            return status, {"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}}
+
+        if query.get("chart") == "mostPopular":
+            region = query["regionCode"]
+            size = self.chart_sizes.get(region, 50)
+            start = int(query.get("pageToken") or 0)
+            end = min(size, start + int(query.get("maxResults", 5)))
+            body = {"kind": "youtube#videoListResponse", "pageInfo": {"totalResults": size},
+                    "items": [self.video(f"{region}-{i}") for i in range(start, end)]}
+            if end < size:
+                body["nextPageToken"] = str(end)
+            return 200, body
+
+        ids = [video_id for video_id in query.get("id", "").split(",") if video_id]
+        return 200, {"kind": "youtube#videoListResponse", "items": [self.video(video_id) for video_id in ids]}
+
+    @staticmethod
+    def video(video_id):
+        return {
+            "id": video_id,
+            "snippet": {"title": f"Video {video_id}", "channelId": "channel", "publishedAt": "2025-01-01T00:00:00Z"},
+            "statistics": {"viewCount": "1000", "likeCount": "10", "commentCount": "1"},
+        }